@@ -0,0 +1,359 @@
+"""
+Dash or Die como ambiente de aprendizado por reforço.
+
+Ambiente segue a API do Gymnasium (reset(seed) -> (observação, info) e
+step(ação) -> (observação, recompensa, terminou, truncou, info)) sem depender
+dele; com o gymnasium instalado, action_space e observation_space também
+existem. AmbientesVetorizados faz o mesmo para N mundos avançados juntos
+(Mundos), e AmbientesParalelos divide os N mundos entre processos que
+escrevem em arrays de memória compartilhada.
+
+Ação: a bitmask de entrada de World.step (CIMA | BAIXO | ESQUERDA | DIREITA |
+DASH), um inteiro de 0 a 31.
+Observação (float32): o jogador (x / W, y / H, dash e invencibilidade
+restantes, de 0 a 1) e os `vizinhos` inimigos mais próximos, do mais perto
+ao mais longe, cada um com (dx / W, dy / H, r / RAIO_MAX_INIMIGO, 1)
+relativos ao jogador; posições sem inimigo ficam em zero.
+Recompensa: recompensa_frame por frame sobrevivido, recompensa_abate por
+inimigo abatido no dash e penalidade_morte ao morrer.
+
+Uso (vazão com ações aleatórias):
+    python ambiente.py --mundos 1024 --processos 2 --segundos 10
+"""
+import multiprocessing
+import random
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+try:
+    import gymnasium
+except ImportError: # Sem o gymnasium os ambientes funcionam igual, só sem os espaços
+    gymnasium = None
+
+from mundos import Mundos
+from world import W, H, RAIO_MAX_INIMIGO, World
+
+ACOES = 32 # Bitmasks possíveis de entrada
+DASH_MAX = 12 # Duração do dash e da invencibilidade, como em Jogador.usar_dash
+INV_MAX = 15
+FRAMES_MAX = 3 * 60 * 60 # Partida truncada depois de 3 minutos a 60 frames/s
+
+
+def tamanho_observacao(vizinhos):
+    return 4 + 4 * vizinhos
+
+
+def observar(jx, jy, dash, inv, x, y, r, ativos, vizinhos, saida):
+    """
+    Observações de N mundos em `saida` (N, tamanho_observacao(vizinhos)):
+    jogadores em arrays (N,) e inimigos em arrays (N, C) com a máscara dos
+    ativos. Os mais próximos de cada mundo saem de argpartition, e só
+    esses são ordenados.
+    """
+    dx = x - jx[:, None]
+    dy = y - jy[:, None]
+    d2 = np.where(ativos, dx * dx + dy * dy, np.inf)
+    c = d2.shape[1]
+    if c > vizinhos:
+        perto = np.argpartition(d2, vizinhos - 1, axis=1)[:, :vizinhos]
+    else:
+        perto = np.broadcast_to(np.arange(c), (len(d2), c))
+    ordem = np.take_along_axis(perto, np.argsort(np.take_along_axis(d2, perto, 1), axis=1), 1)
+    presente = np.isfinite(np.take_along_axis(d2, ordem, 1))
+
+    saida[:, 0] = jx / W
+    saida[:, 1] = jy / H
+    saida[:, 2] = dash / DASH_MAX
+    saida[:, 3] = inv / INV_MAX
+    inimigos = saida[:, 4:].reshape(len(saida), vizinhos, 4)
+    inimigos[:] = 0
+    k = ordem.shape[1]
+    inimigos[:, :k, 0] = np.where(presente, np.take_along_axis(dx, ordem, 1) / W, 0)
+    inimigos[:, :k, 1] = np.where(presente, np.take_along_axis(dy, ordem, 1) / H, 0)
+    inimigos[:, :k, 2] = np.where(presente, np.take_along_axis(r, ordem, 1) / RAIO_MAX_INIMIGO, 0)
+    inimigos[:, :k, 3] = presente
+    return saida
+
+
+def _espacos(vizinhos):
+    """(action_space, observation_space) do gymnasium, ou (None, None) sem ele."""
+    if gymnasium is None:
+        return None, None
+    from gymnasium import spaces
+    return (spaces.Discrete(ACOES),
+            spaces.Box(-np.inf, np.inf, shape=(tamanho_observacao(vizinhos),), dtype=np.float32))
+
+
+class Ambiente:
+    """Uma partida (World) como ambiente no estilo do Gymnasium."""
+    def __init__(self, vizinhos=8, vetorizado=False, separacao=False, max_frames=FRAMES_MAX,
+                 recompensa_frame=0.01, recompensa_abate=1.0, penalidade_morte=-1.0):
+        """
+        vizinhos: inimigos mais próximos na observação.
+        vetorizado, separacao: como em World.
+        max_frames: frames até a partida ser truncada.
+        """
+        self.vizinhos = vizinhos
+        self.vetorizado = vetorizado
+        self.separacao = separacao
+        self.max_frames = max_frames
+        self.recompensa_frame = recompensa_frame
+        self.recompensa_abate = recompensa_abate
+        self.penalidade_morte = penalidade_morte
+        self.action_space, self.observation_space = _espacos(vizinhos)
+        self.mundo = None
+        self._saida = np.zeros((1, tamanho_observacao(vizinhos)), dtype=np.float32)
+
+    def _observacao(self):
+        mundo = self.mundo
+        j = mundo.jogador
+        circulos = np.array(list(mundo.circulos_inimigos()), dtype=float).reshape(1, -1, 3)
+        ativos = np.ones(circulos.shape[:2], dtype=bool)
+        observar(np.array([j.x]), np.array([j.y]), j.dash, j.inv, circulos[..., 0], circulos[..., 1],
+                 circulos[..., 2], ativos, self.vizinhos, self._saida)
+        return self._saida[0].copy()
+
+    def _info(self):
+        return {"score": self.mundo.score, "frame": self.mundo.frame}
+
+    def reset(self, seed=None, options=None):
+        """Começa uma partida; seed é a semente do World (None = sorteada)."""
+        self.mundo = World(self.vetorizado, seed, self.separacao)
+        return self._observacao(), self._info()
+
+    def step(self, acao):
+        mundo = self.mundo
+        score = mundo.score
+        vivo = mundo.step(int(acao))
+        if vivo:
+            recompensa = self.recompensa_frame + self.recompensa_abate * (mundo.score - score)
+        else:
+            recompensa = self.penalidade_morte
+        truncou = vivo and mundo.frame >= self.max_frames
+        return self._observacao(), recompensa, not vivo, truncou, self._info()
+
+
+class AmbientesVetorizados:
+    """
+    N mundos (Mundos) avançados juntos, com observações, recompensas e fins
+    em arrays de N. Um mundo que termina ou é truncado recomeça no mesmo
+    step, com uma semente nova tirada da semente do reset; a observação em
+    que ele terminou fica em info["observacao_final"] e o placar, em
+    info["score"]. Os arrays devolvidos são reescritos no step seguinte:
+    copie o que precisar guardar.
+    """
+    def __init__(self, n, vizinhos=8, separacao=False, max_frames=FRAMES_MAX,
+                 recompensa_frame=0.01, recompensa_abate=1.0, penalidade_morte=-1.0, saidas=None):
+        """
+        saidas: arrays onde escrever os resultados ({"observacoes", "recompensas",
+        "terminou", "truncou", "score", "observacao_final"}), como os de memória
+        compartilhada de AmbientesParalelos; None = alocados aqui.
+        """
+        self.n = n
+        self.vizinhos = vizinhos
+        self.max_frames = max_frames
+        self.recompensa_frame = recompensa_frame
+        self.recompensa_abate = recompensa_abate
+        self.penalidade_morte = penalidade_morte
+        self.single_action_space, self.single_observation_space = _espacos(vizinhos)
+        self.mundos = Mundos(n, [0] * n, separacao)
+        self.sorteio = random.Random()
+        self.saidas = saidas or alocar_saidas(n, vizinhos)
+        self.observacoes = self.saidas["observacoes"]
+        self.info = {"score": self.saidas["score"], "observacao_final": self.saidas["observacao_final"]}
+
+    def _observar(self):
+        m = self.mundos
+        return observar(m.jx, m.jy, m.dash, m.inv, m.x, m.y, m.r, m.ativos(), self.vizinhos, self.observacoes)
+
+    def _sementes(self, k):
+        return [self.sorteio.getrandbits(64) for _ in range(k)]
+
+    def reset(self, seed=None, options=None):
+        """Recomeça todos os mundos; as sementes de cada um saem de `seed` (None = sorteadas)."""
+        self.sorteio = random.Random(seed)
+        self.mundos.reiniciar(range(self.n), self._sementes(self.n))
+        return self._observar(), {}
+
+    def step(self, acoes):
+        s = self.saidas
+        mundos = self.mundos
+        abatidos, morreram = mundos.step(acoes)
+        recompensas = s["recompensas"]
+        recompensas[:] = self.recompensa_frame + self.recompensa_abate * abatidos
+        recompensas[morreram] = self.penalidade_morte
+        terminou = s["terminou"]
+        truncou = s["truncou"]
+        terminou[:] = morreram
+        truncou[:] = ~morreram & (mundos.frame >= self.max_frames)
+        fim = np.flatnonzero(terminou | truncou)
+        s["score"][:] = mundos.score
+        self._observar()
+        if len(fim):
+            s["observacao_final"][fim] = self.observacoes[fim]
+            mundos.reiniciar(fim.tolist(), self._sementes(len(fim)))
+            self._observar()
+        return self.observacoes, recompensas, terminou, truncou, self.info
+
+    def fechar(self):
+        """Nada a encerrar; existe pela mesma interface de AmbientesParalelos."""
+
+
+def _campos_saidas(n, vizinhos):
+    """Nome, forma e tipo de cada array de saída."""
+    d = tamanho_observacao(vizinhos)
+    return [("observacoes", (n, d), np.float32), ("recompensas", (n,), np.float32),
+            ("terminou", (n,), bool), ("truncou", (n,), bool), ("score", (n,), np.int64),
+            ("observacao_final", (n, d), np.float32)]
+
+
+def alocar_saidas(n, vizinhos):
+    return {nome: np.zeros(forma, dtype=tipo) for nome, forma, tipo in _campos_saidas(n, vizinhos)}
+
+
+def _trabalhador(conexao, nomes, inicio, fim, n, vizinhos, opcoes):
+    """Processo de AmbientesParalelos: os mundos [inicio, fim), escrevendo direto na memória compartilhada."""
+    blocos = {nome: shared_memory.SharedMemory(nome_bloco) for nome, nome_bloco in nomes.items()}
+    saidas = {}
+    for nome, forma, tipo in _campos_saidas(n, vizinhos) + [("acoes", (n,), np.int64)]:
+        saidas[nome] = np.ndarray(forma, dtype=tipo, buffer=blocos[nome].buf)[inicio:fim]
+    acoes = saidas.pop("acoes")
+    ambientes = AmbientesVetorizados(fim - inicio, vizinhos, saidas=saidas, **opcoes)
+    try:
+        while True:
+            comando, argumento = conexao.recv()
+            if comando == "step":
+                ambientes.step(acoes)
+            elif comando == "reset":
+                ambientes.reset(argumento)
+            else:
+                break
+            conexao.send(None)
+    finally:
+        del saidas, acoes, ambientes
+        for bloco in blocos.values():
+            bloco.close()
+
+
+class AmbientesParalelos:
+    """
+    Os N mundos de AmbientesVetorizados divididos entre `processos`
+    sub-ambientes, cada um num processo. Ações, observações, recompensas e
+    fins ficam em memória compartilhada: o processo principal só escreve as
+    ações e espera cada processo avisar que terminou o seu pedaço, sem copiar
+    arrays entre processos. Mesma interface de AmbientesVetorizados; chame
+    fechar() (ou use com `with`) para encerrar os processos.
+    """
+    def __init__(self, n, processos=None, vizinhos=8, **opcoes):
+        processos = min(n, processos or multiprocessing.cpu_count())
+        self.n = n
+        self.vizinhos = vizinhos
+        self.single_action_space, self.single_observation_space = _espacos(vizinhos)
+        self.blocos = {}
+        self.saidas = {}
+        for nome, forma, tipo in _campos_saidas(n, vizinhos) + [("acoes", (n,), np.int64)]:
+            bytes_ = max(1, int(np.prod(forma)) * np.dtype(tipo).itemsize)
+            bloco = self.blocos[nome] = shared_memory.SharedMemory(create=True, size=bytes_)
+            self.saidas[nome] = np.ndarray(forma, dtype=tipo, buffer=bloco.buf)
+        self.acoes = self.saidas.pop("acoes")
+        self.observacoes = self.saidas["observacoes"]
+        self.info = {"score": self.saidas["score"], "observacao_final": self.saidas["observacao_final"]}
+
+        nomes = {nome: bloco.name for nome, bloco in self.blocos.items()}
+        cortes = np.linspace(0, n, processos + 1).astype(int).tolist()
+        self.conexoes = []
+        self.processos = []
+        for inicio, fim in zip(cortes, cortes[1:]):
+            nossa, deles = multiprocessing.Pipe()
+            processo = multiprocessing.Process(target=_trabalhador, daemon=True,
+                                               args=(deles, nomes, inicio, fim, n, vizinhos, opcoes))
+            processo.start()
+            self.conexoes.append(nossa)
+            self.processos.append(processo)
+
+    def _todos(self, comando, argumentos):
+        for conexao, argumento in zip(self.conexoes, argumentos):
+            conexao.send((comando, argumento))
+        for conexao in self.conexoes:
+            conexao.recv()
+
+    def reset(self, seed=None, options=None):
+        """Cada processo recomeça os seus mundos com uma semente tirada de `seed`."""
+        sorteio = random.Random(seed)
+        self._todos("reset", [sorteio.getrandbits(64) for _ in self.conexoes])
+        return self.observacoes, {}
+
+    def step(self, acoes):
+        s = self.saidas
+        self.acoes[:] = acoes
+        self._todos("step", [None] * len(self.conexoes))
+        return self.observacoes, s["recompensas"], s["terminou"], s["truncou"], self.info
+
+    def fechar(self):
+        for conexao in self.conexoes:
+            try:
+                conexao.send(("fim", None))
+            except OSError:
+                pass
+        for processo in self.processos:
+            processo.join(timeout=5)
+        self.conexoes = []
+        self.processos = []
+        self.saidas = self.acoes = self.observacoes = self.info = None
+        for bloco in self.blocos.values():
+            bloco.unlink()
+            try:
+                bloco.close()
+            except BufferError:
+                pass # Arrays devolvidos ainda em uso: a memória sai quando eles forem coletados
+        self.blocos = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Vazão dos ambientes de Dash or Die, com ações aleatórias")
+    parser.add_argument("--mundos", type=int, default=1024, help="Mundos avançados juntos (1 = Ambiente)")
+    parser.add_argument("--processos", type=int, default=1,
+                        help="Processos dos sub-ambientes (1 = AmbientesVetorizados no próprio processo)")
+    parser.add_argument("--vizinhos", type=int, default=8, help="Inimigos mais próximos na observação")
+    parser.add_argument("--separacao", action="store_true", help="Inimigos se afastam uns dos outros")
+    parser.add_argument("--segundos", type=float, default=10.0, help="Duração da medição")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    separacao = args.separacao
+    rng = np.random.default_rng(args.semente)
+    if args.mundos == 1:
+        ambiente = Ambiente(args.vizinhos, vetorizado=False, separacao=separacao)
+        ambiente.reset(args.semente)
+        sortear = lambda: int(rng.integers(ACOES))
+    elif args.processos > 1:
+        ambiente = AmbientesParalelos(args.mundos, args.processos, args.vizinhos, separacao=separacao)
+        sortear = lambda: rng.integers(ACOES, size=args.mundos)
+    else:
+        ambiente = AmbientesVetorizados(args.mundos, args.vizinhos, separacao)
+        sortear = lambda: rng.integers(ACOES, size=args.mundos)
+    if args.mundos > 1:
+        ambiente.reset(args.semente)
+    passos = fins = 0
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < args.segundos:
+        _, _, terminou, truncou, _ = ambiente.step(sortear())
+        passos += 1
+        fins += int(np.count_nonzero(terminou | truncou))
+        if args.mundos == 1 and (terminou or truncou):
+            ambiente.reset()
+    segundos = time.perf_counter() - inicio
+    if args.mundos > 1:
+        ambiente.fechar()
+    por_hora = passos * args.mundos / segundos * 3600
+    print(f"{passos * args.mundos} passos de ambiente em {segundos:.1f} s ({passos} lotes de {args.mundos}): "
+          f"{por_hora / 1e6:.1f} milhões por hora, {fins} partidas terminadas")
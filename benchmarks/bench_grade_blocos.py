@@ -0,0 +1,59 @@
+"""
+Benchmark da grade em blocos (O Jardineiro do Tempo).
+
+Mostra que o custo de um tick acompanha o número de tiles plantados e não
+a área do jardim: primeiro com a mesma plantação em jardins de tamanhos
+diferentes, depois com plantações crescentes num jardim de 1024x1024.
+
+Uso: python benchmarks/bench_grade_blocos.py
+"""
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from grade_vetorizada import SEMENTE, GradeEmBlocos, GradeVetorizada
+
+TICKS = 50
+
+
+def plantar(grade, quantidade):
+    """Planta um quadrado de cerca de `quantidade` tiles no canto, como um jogador faria."""
+    lado = math.isqrt(quantidade)
+    if lado:
+        grade.estado[:lado, :lado] = SEMENTE
+        grade.tempo[:lado, :lado] = 1
+        grade.marcar_area(0, 0, lado, lado)
+    return lado * lado
+
+
+def medir(classe, lado, plantados):
+    """Retorna (tiles plantados, ms por tick)."""
+    grade = classe(lado, lado)
+    plantados = plantar(grade, plantados)
+    inicio = time.perf_counter()
+    for _ in range(TICKS):
+        grade.atualizar()
+    return plantados, (time.perf_counter() - inicio) / TICKS * 1000
+
+
+def linha(classe, lado, plantados):
+    plantados, ms = medir(classe, lado, plantados)
+    print(f"{classe.__name__:<16} {lado:>6} {plantados:>10} {ms:>9.3f}")
+
+
+def main():
+    print(f"{'grade':<16} {'lado':>6} {'plantados':>10} {'ms/tick':>9}")
+    for lado in (256, 1024, 2048, 4096):
+        for classe in (GradeVetorizada, GradeEmBlocos):
+            linha(classe, lado, 4096)
+    print()
+    for plantados in (0, 1024, 16384, 131072, 1048576):
+        for classe in (GradeVetorizada, GradeEmBlocos):
+            linha(classe, 1024, plantados)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Suíte de benchmarks dos dois jogos (Dash or Die e O Jardineiro do Tempo).
+
+Casos:
+- dash/...: World.step (Inimigo.update e colisão) com 10 a 10k inimigos, no
+  PoolInimigos e no Enxame, sem e com separação entre inimigos
+  (dash/.../separacao/...). O jogador fica invulnerável e cada abatido é
+  reposto, então a quantidade não muda durante a medição.
+- dash/ambientes/...: um step de AmbientesVetorizados (ambiente.py) com 1 a
+  1024 mundos e ações aleatórias; cada tick é um lote, então os passos de
+  ambiente por segundo são os ticks/s vezes o número de mundos.
+- jardim/atualizar/...: Jogo.atualizar em jardins de vários tamanhos, em
+  cada armazenamento de grade, e com quantidades crescentes de pragas.
+- .../desenhar/...: desenho de um quadro dos dois jogos, com o driver de vídeo
+  dummy do SDL (nenhuma janela é aberta).
+
+Para cada caso: ticks/s (pelo tempo mediano, que uma pausa isolada do
+coletor ou do sistema não distorce), tempos p50/p99 por tick e a alocação de
+pico por tick (bytes acima do que já estava alocado, medida pelo tracemalloc
+numa passada à parte para não distorcer os tempos).
+
+Os resultados podem ser salvos como base em JSON e comparados depois; a
+comparação falha (código de saída 1) se algum caso perder mais que a
+tolerância em ticks/s. Bases só são comparáveis na mesma máquina.
+
+Uso:
+    python benchmarks/bench_jogos.py --salvar base.json
+    python benchmarks/bench_jogos.py --comparar base.json --tolerancia 0.15
+    python benchmarks/bench_jogos.py --filtro dash/pool
+"""
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "src"))
+
+import pygame
+
+try:
+    import numpy
+except ImportError: # Sem NumPy ficam de fora os casos do Enxame e das grades em arrays
+    numpy = None
+
+from world import World
+
+
+def _carregar(nome, caminho):
+    """Importa um dos dois main.py com outro nome (os dois se chamam main)."""
+    spec = importlib.util.spec_from_file_location(nome, os.path.join(RAIZ, caminho))
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+dash = _carregar("dash", "main.py")
+jardim = _carregar("jardim", os.path.join("src", "main.py"))
+
+# preparar() monta o caso e retorna (passo, entre): passo é o tick medido e
+# entre (ou None) roda fora da medição, antes de cada passo
+Caso = namedtuple("Caso", "nome preparar")
+
+
+def caso_dash(vetorizado, quantidade, separacao=False):
+    def preparar():
+        mundo = World(vetorizado, semente=0, separacao=separacao)
+        for _ in range(quantidade):
+            mundo.inimigos.novo()
+        jogador = mundo.jogador
+
+        def entre():
+            jogador.inv = 2 # Colisões abatem o inimigo em vez de encerrar a partida
+            for _ in range(quantidade - len(mundo.inimigos)):
+                mundo.inimigos.novo()
+
+        return lambda: mundo.step(0), entre
+    return Caso(f"dash/{'enxame' if vetorizado else 'pool'}/{'separacao/' if separacao else ''}{quantidade}", preparar)
+
+
+def caso_dash_ambientes(mundos):
+    def preparar():
+        from ambiente import ACOES, AmbientesVetorizados
+        ambientes = AmbientesVetorizados(mundos)
+        ambientes.reset(seed=0)
+        sorteio = numpy.random.default_rng(0)
+        return lambda: ambientes.step(sorteio.integers(ACOES, size=mundos)), None
+    return Caso(f"dash/ambientes/{mundos}", preparar)
+
+
+def caso_dash_desenhar(quantidade):
+    def preparar():
+        dash.abrir_janela()
+        mundo = World(semente=0)
+        for _ in range(quantidade):
+            mundo.inimigos.novo()
+        jogador = mundo.jogador
+
+        def entre():
+            jogador.inv = 2
+            mundo.step(0)
+            for _ in range(quantidade - len(mundo.inimigos)):
+                mundo.inimigos.novo()
+
+        def passo():
+            dash.desenhar(mundo, 0, 1.0)
+            pygame.display.flip()
+
+        return passo, entre
+    return Caso(f"dash/desenhar/{quantidade}", preparar)
+
+
+def _jardim(tipo, lado, pragas, pragas_vetorizadas=False, atlas=None):
+    """Jogo com metade dos tiles plantados, em estágios variados, e `pragas` pragas imortais."""
+    jogo = jardim.Jogo(tipo, lado, lado, atlas, pragas_vetorizadas=pragas_vetorizadas)
+    jogo.limite_praga = 10 ** 9 # Sem pragas novas durante a medição
+    for y in range(lado):
+        linha = jogo.grid[y]
+        for x in range(0, lado, 2):
+            tile = linha[x]
+            tile.estado = "semente"
+            tile.tempo_crescimento = 1 + (7 * x + 13 * y) % jardim.TEMPO_MAX_CRESCIMENTO
+    posicoes = [((37 * k) % lado, (101 * k) % lado) for k in range(pragas)]
+    if pragas_vetorizadas:
+        jogo.pragas.adicionar_varias([x for x, y in posicoes], [y for x, y in posicoes], 10 ** 9)
+    else:
+        for k, (x, y) in enumerate(posicoes):
+            praga = jardim.Praga(x, y, k)
+            praga.tempo_vida = 10 ** 9
+            jogo.pragas.add(praga)
+    return jogo
+
+
+def caso_jardim(tipo, lado, pragas=0, pragas_vetorizadas=False):
+    def preparar():
+        jogo = _jardim(tipo, lado, pragas, pragas_vetorizadas)
+
+        def entre():
+            jogo.medidor_beleza = 50.0 # Sem game over
+            jogo.game_over = False
+
+        return jogo.atualizar, entre
+    sufixo = f"/{pragas}{'v' if pragas_vetorizadas else ''}pragas" if pragas else ""
+    return Caso(f"jardim/atualizar/{tipo}/{lado}{sufixo}", preparar)
+
+
+def caso_jardim_desenhar(modo):
+    def preparar():
+        jardim.abrir_janela()
+        jogo = _jardim("objetos", jardim.GRID_LARGURA, 8, atlas=jardim.AtlasTiles() if modo == "atlas" else None)
+        renderizador = jardim.RenderizadorRetangulos(jogo) if modo == "retangulos" else jogo
+
+        def entre():
+            jogo.medidor_beleza = 50.0
+            jogo.atualizar()
+
+        def passo():
+            renderizador.desenhar(1.0)
+            renderizador.apresentar()
+
+        return passo, entre
+    return Caso(f"jardim/desenhar/{modo}", preparar)
+
+
+def casos():
+    lista = []
+    for quantidade in (10, 100, 1000, 10000):
+        lista.append(caso_dash(False, quantidade))
+        if numpy is not None:
+            lista.append(caso_dash(True, quantidade))
+    for quantidade in (10, 100, 1000):
+        lista.append(caso_dash(False, quantidade, separacao=True))
+        if numpy is not None:
+            lista.append(caso_dash(True, quantidade, separacao=True))
+    if numpy is not None:
+        for mundos in (1, 64, 1024):
+            lista.append(caso_dash_ambientes(mundos))
+    lista.append(caso_dash_desenhar(100))
+
+    tipos = ["objetos", "agendada"] + (["vetorizada", "blocos"] if numpy is not None else [])
+    for lado in (16, 64, 256):
+        for tipo in tipos:
+            lista.append(caso_jardim(tipo, lado))
+    for pragas in (10, 100, 1000):
+        lista.append(caso_jardim("objetos", 64, pragas))
+        if numpy is not None:
+            lista.append(caso_jardim("vetorizada", 64, pragas, pragas_vetorizadas=True))
+    for modo in ("direto", "atlas", "retangulos"):
+        lista.append(caso_jardim_desenhar(modo))
+    return lista
+
+
+def percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(p * len(ordenados)))]
+
+
+def medir(caso, ticks, segundos, aquecimento=20, ticks_memoria=5):
+    """Roda o caso e retorna o dicionário das métricas."""
+    passo, entre = caso.preparar()
+    entre = entre or (lambda: None)
+    for _ in range(aquecimento):
+        entre()
+        passo()
+
+    tempos = []
+    limite = time.perf_counter() + segundos
+    while len(tempos) < ticks and (len(tempos) < 10 or time.perf_counter() < limite):
+        entre()
+        inicio = time.perf_counter_ns()
+        passo()
+        tempos.append(time.perf_counter_ns() - inicio)
+
+    picos = []
+    tracemalloc.start()
+    for _ in range(ticks_memoria):
+        entre()
+        atual, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        passo()
+        picos.append(tracemalloc.get_traced_memory()[1] - atual)
+    tracemalloc.stop()
+
+    tempos.sort()
+    return {
+        "ticks_s": round(1e9 / percentil(tempos, 0.50), 1),
+        "p50_ms": round(percentil(tempos, 0.50) / 1e6, 4),
+        "p99_ms": round(percentil(tempos, 0.99) / 1e6, 4),
+        "bytes_tick": sorted(picos)[len(picos) // 2],
+        "ticks": len(tempos),
+    }
+
+
+def comparar(resultados, base, tolerancia):
+    """Imprime a variação de ticks/s em relação à base; retorna os casos que regrediram."""
+    regrediram = []
+    print(f"\n{'caso':<44} {'base':>10} {'agora':>10} {'variação':>9}")
+    for nome, atual in resultados.items():
+        anterior = base.get(nome)
+        if anterior is None:
+            continue
+        variacao = atual["ticks_s"] / anterior["ticks_s"] - 1
+        marca = ""
+        if variacao < -tolerancia:
+            regrediram.append(nome)
+            marca = "  REGRESSÃO"
+        print(f"{nome:<44} {anterior['ticks_s']:>10,.0f} {atual['ticks_s']:>10,.0f} {variacao:>+9.1%}{marca}")
+    return regrediram
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks do Dash or Die e de O Jardineiro do Tempo")
+    parser.add_argument("--filtro", action="append", metavar="TEXTO",
+                        help="Roda só os casos cujo nome contém TEXTO (pode repetir)")
+    parser.add_argument("--listar", action="store_true", help="Lista os casos e sai")
+    parser.add_argument("--ticks", type=int, default=300, help="Máximo de ticks medidos por caso (padrão: 300)")
+    parser.add_argument("--segundos", type=float, default=1.0,
+                        help="Tempo máximo por caso; ao menos 10 ticks são medidos (padrão: 1)")
+    parser.add_argument("--salvar", metavar="ARQ", help="Salva os resultados como base em JSON")
+    parser.add_argument("--comparar", metavar="ARQ", help="Compara com uma base salva e falha se houver regressão")
+    parser.add_argument("--tolerancia", type=float, default=0.10,
+                        help="Queda máxima de ticks/s aceita na comparação (padrão: 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    selecionados = [caso for caso in casos() if not args.filtro or any(f in caso.nome for f in args.filtro)]
+    if args.listar:
+        for caso in selecionados:
+            print(caso.nome)
+        return
+
+    resultados = {}
+    print(f"{'caso':<44} {'ticks/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'KiB/tick':>9}")
+    for caso in selecionados:
+        # As mensagens dos jogos ("Praga comeu a planta!") ficam fora da saída
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            r = medir(caso, args.ticks, args.segundos)
+        resultados[caso.nome] = r
+        print(f"{caso.nome:<44} {r['ticks_s']:>10,.0f} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} "
+              f"{r['bytes_tick'] / 1024:>9.1f}", flush=True)
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as arquivo:
+            json.dump({"python": platform.python_version(), "plataforma": platform.platform(),
+                       "casos": resultados}, arquivo, indent=2)
+        print(f"\nBase salva em {args.salvar}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)["casos"]
+        regrediram = comparar(resultados, base, args.tolerancia)
+        if regrediram:
+            print(f"\n{len(regrediram)} caso(s) abaixo da base por mais de {args.tolerancia:.0%}: "
+                  f"{', '.join(regrediram)}")
+            sys.exit(1)
+        print(f"\nNenhuma regressão acima de {args.tolerancia:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark das pragas vetorizadas (O Jardineiro do Tempo).
+
+Mede o custo de um tick do EnxamePragas com quantidades crescentes de
+pragas num jardim de 256x256 com metade dos tiles plantados, ao longo de
+um ciclo completo de movimento (velocidade_movimento ticks). Com as fases
+sincronizadas todas as pragas andam no mesmo tick (o pico); com as fases
+em rodízio cada tick move só uma fração delas. Nenhuma praga morre durante
+a medição. O orçamento de 60 ticks/s é de 16,7 ms por tick.
+
+Uso: python benchmarks/bench_pragas.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import numpy as np
+
+from grade_vetorizada import SEMENTE, GradeVetorizada
+from pragas_vetorizadas import EnxamePragas
+
+LADO = 256
+
+
+def medir(quantidade, sincronizadas):
+    """Retorna (ms médio, ms máximo) por tick com `quantidade` pragas."""
+    grade = GradeVetorizada(LADO, LADO)
+    rng = np.random.default_rng(0)
+    pragas = EnxamePragas(semente=0)
+    fase = 0 if sincronizadas else None
+    pragas.adicionar_varias(rng.integers(0, LADO, quantidade), rng.integers(0, LADO, quantidade), 10 ** 6, fase)
+    tempos = []
+    for tick in range(pragas.velocidade_movimento):
+        grade.estado[:, ::2] = SEMENTE # Replanta o que foi comido
+        inicio = time.perf_counter()
+        pragas.atualizar(grade, tick)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return sum(tempos) / len(tempos), max(tempos)
+
+
+def main():
+    print(f"{'pragas':>9} {'fases':>12} {'ms/tick':>9} {'ms máx':>9}")
+    for quantidade in (1000, 10000, 100000, 1000000):
+        for sincronizadas in (True, False):
+            media, maximo = medir(quantidade, sincronizadas)
+            nome = "sincronizadas" if sincronizadas else "em rodízio"
+            print(f"{quantidade:>9} {nome:>12} {media:>9.3f} {maximo:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
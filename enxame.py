@@ -0,0 +1,245 @@
+import random
+
+import numpy as np
+
+from grade_espacial import VIZINHAS
+from world import CELULA, FORCA_SEPARACAO, RAIO_MAX_INIMIGO, Inimigo
+
+
+def ordenar_celulas(x, y, celula):
+    """
+    Grade uniforme de lado `celula` dos pontos (x, y), em arrays: cada célula
+    (cx, cy) vira a chave (cy - y0) * largura + (cx - x0), com uma coluna de
+    folga de cada lado para cx - 1 e cx + 1 não caírem em outra linha.
+    Retorna (x0, y0, largura, ordem, chaves): a ordem que deixa as chaves
+    crescentes e as chaves nessa ordem, então os pontos de uma faixa de
+    células de uma linha são uma fatia de `ordem` achada com searchsorted.
+    """
+    cx = np.floor(x / celula).astype(np.int64)
+    cy = np.floor(y / celula).astype(np.int64)
+    x0 = int(cx.min()) - 1
+    y0 = int(cy.min())
+    largura = int(cx.max()) - x0 + 2
+    chave = (cy - y0) * largura + (cx - x0)
+    ordem = np.argsort(chave, kind="stable")
+    return x0, y0, largura, ordem, chave[ordem]
+
+def pares_vizinhos(x, y, celula):
+    """
+    Índices (a, b) dos pares de pontos em células iguais ou vizinhas de uma
+    grade uniforme de lado `celula`, cada par uma vez: a versão em arrays da
+    GradeEspacial.pares(). A grade é refeita a cada chamada (ordenar_celulas);
+    as faixas de cada célula vizinha saem de searchsorted, e os pares, de
+    repeat, sem laço em Python por ponto.
+    """
+    n = len(x)
+    _, _, largura, ordem, chaves = ordenar_celulas(x, y, celula)
+    posicoes = np.arange(n)
+
+    # Na própria célula, cada ponto forma par com os que vêm depois dele
+    faixas = [(posicoes + 1, np.searchsorted(chaves, chaves, "right"))]
+    for dx, dy in VIZINHAS:
+        alvo = chaves + (dy * largura + dx)
+        faixas.append((np.searchsorted(chaves, alvo, "left"), np.searchsorted(chaves, alvo, "right")))
+
+    a, b = [], []
+    for inicio, fim in faixas:
+        contagem = fim - inicio
+        total = int(contagem.sum())
+        if total == 0:
+            continue
+        deslocamento = np.arange(total) - np.repeat(np.cumsum(contagem) - contagem, contagem)
+        a.append(ordem[np.repeat(posicoes, contagem)])
+        b.append(ordem[np.repeat(inicio, contagem) + deslocamento])
+    if not a:
+        vazio = np.empty(0, dtype=np.int64)
+        return vazio, vazio
+    return np.concatenate(a), np.concatenate(b)
+
+def afastar_pares(x, y, r, a, b, forca=FORCA_SEPARACAO):
+    """
+    Dos pares candidatos (a, b), afasta os círculos que se sobrepõem: cada um
+    anda forca / 2 da sobreposição ao longo da linha entre os centros, e os
+    empurrões de todos os pares são somados (bincount) e aplicados juntos em
+    x e y, no lugar.
+    """
+    n = len(x)
+    dx = x[b] - x[a]
+    dy = y[b] - y[a]
+    soma = r[a] + r[b]
+    d2 = dx * dx + dy * dy
+    toca = d2 < soma * soma
+    if not toca.any():
+        return
+    a = a[toca]
+    b = b[toca]
+    dx = dx[toca]
+    dy = dy[toca]
+    soma = soma[toca]
+    d = np.sqrt(d2[toca]) # Raiz só para os pares que se tocam
+    zero = d == 0
+    if zero.any(): # Centros iguais: separa no eixo x
+        dx[zero] = 1.0
+        divisor = np.where(zero, 1.0, d)
+    else:
+        divisor = d
+    s = (soma - d) * (forca / 2)
+    px = s * (dx / divisor)
+    py = s * (dy / divisor)
+    x += np.bincount(b, px, n) - np.bincount(a, px, n)
+    y += np.bincount(b, py, n) - np.bincount(a, py, n)
+
+class Enxame:
+    """Inimigos guardados em arrays contíguos do NumPy (x, y, r, vel).
+
+    Substitui o PoolInimigos no World: o movimento e a colisão com o
+    jogador são feitos para todos os inimigos de uma vez, e os abatidos
+    saem por compactação com máscara em vez de list.remove.
+    """
+    def __init__(self, capacidade=64, rng=random):
+        self.n = 0
+        self.x = np.empty(capacidade)
+        self.y = np.empty(capacidade)
+        self.xa = np.empty(capacidade)
+        self.ya = np.empty(capacidade)
+        self.r = np.empty(capacidade)
+        self.vel = np.empty(capacidade)
+        self._molde = None
+        self.reciclados = 0
+        self.rng = rng
+        self._celulas = None # ordenar_celulas das posições atuais, refeito na primeira consulta depois de mudarem
+
+    def __len__(self):
+        return self.n
+
+    def _crescer(self):
+        cap = 2 * len(self.x)
+        for nome in ("x", "y", "xa", "ya", "r", "vel"):
+            antigo = getattr(self, nome)
+            novo = np.empty(cap)
+            novo[:self.n] = antigo[:self.n]
+            setattr(self, nome, novo)
+
+    def append(self, inimigo):
+        """Copia um Inimigo recém-criado para o fim dos arrays."""
+        if self.n == len(self.x):
+            self._crescer()
+        k = self.n
+        self.x[k] = self.xa[k] = inimigo.x
+        self.y[k] = self.ya[k] = inimigo.y
+        self.r[k] = inimigo.r
+        self.vel[k] = inimigo.vel
+        self.n += 1
+        self._celulas = None
+
+    def novo(self):
+        """Sorteia um inimigo num Inimigo de rascunho reaproveitado e o copia."""
+        if self._molde is None:
+            self._molde = Inimigo(self.rng)
+        else:
+            self._molde.reiniciar(self.rng)
+            self.reciclados += 1
+        self.append(self._molde)
+
+    def circulos(self, alpha=1.0):
+        n = self.n
+        xa = self.xa[:n]
+        ya = self.ya[:n]
+        x = xa + (self.x[:n] - xa) * alpha
+        y = ya + (self.y[:n] - ya) * alpha
+        return zip(x.tolist(), y.tolist(), self.r[:n].astype(int).tolist())
+
+    def perto(self, x, y, raio, celula=CELULA):
+        """
+        (x, y, r) dos inimigos que encostam no círculo (x, y, raio). Como em
+        GradeEspacial.perto, só os inimigos das células que o quadrado de
+        meio-lado raio + RAIO_MAX_INIMIGO toca são testados: a grade das
+        posições (ordenar_celulas) é montada na primeira consulta depois que
+        os inimigos se movem e serve às outras, e cada linha de células é uma
+        fatia achada com searchsorted.
+        """
+        n = self.n
+        if n == 0:
+            return []
+        if self._celulas is None:
+            self._celulas = ordenar_celulas(self.x[:n], self.y[:n], celula)
+        x0, y0, largura, ordem, chaves = self._celulas
+        alcance = raio + RAIO_MAX_INIMIGO
+        cx0 = max(int((x - alcance) // celula) - x0, 0)
+        cx1 = min(int((x + alcance) // celula) - x0, largura - 1)
+        cy0 = max(int((y - alcance) // celula) - y0, 0)
+        cy1 = min(int((y + alcance) // celula) - y0, int(chaves[-1]) // largura)
+        if cx0 > cx1 or cy0 > cy1:
+            return []
+        linhas = np.arange(cy0, cy1 + 1) * largura
+        inicios = np.searchsorted(chaves, linhas + cx0, "left").tolist()
+        fins = np.searchsorted(chaves, linhas + cx1, "right").tolist()
+        k = np.sort(np.concatenate([ordem[i:f] for i, f in zip(inicios, fins)]))
+        dx = self.x[k] - x
+        dy = self.y[k] - y
+        soma = self.r[k] + raio
+        k = k[dx * dx + dy * dy < soma * soma]
+        return list(zip(self.x[k].tolist(), self.y[k].tolist(), self.r[k].astype(int).tolist()))
+
+    def separar(self, celula=CELULA, forca=FORCA_SEPARACAO):
+        """
+        Afasta os pares de inimigos que se sobrepõem, com a mesma regra de
+        World._separar (veja afastar_pares).
+        """
+        n = self.n
+        if n < 2:
+            return
+        x = self.x[:n]
+        y = self.y[:n]
+        a, b = pares_vizinhos(x, y, celula)
+        afastar_pares(x, y, self.r[:n], a, b, forca)
+        self._celulas = None
+
+    def update(self, j, separacao=False):
+        """Move o enxame em direção ao jogador e resolve as colisões.
+
+        Retorna (abatidos, morreu), com o mesmo resultado do laço escalar
+        do World: sem invencibilidade qualquer toque mata; com ela, todo
+        inimigo que toca o jogador é removido. Com separacao, os inimigos
+        se afastam uns dos outros antes do teste de toque.
+        """
+        n = self.n
+        if n == 0:
+            return 0, False
+        self._celulas = None
+        x = self.x[:n]
+        y = self.y[:n]
+        vel = self.vel[:n]
+        self.xa[:n] = x
+        self.ya[:n] = y
+
+        # Direção normalizada no lugar de atan2 + cos + sin. Quando a
+        # distância é zero, atan2(0, 0) == 0, ou seja, o passo vai para +x.
+        dx = j.x - x
+        dy = j.y - y
+        dist = np.hypot(dx, dy)
+        parado = dist == 0
+        dist[parado] = 1.0
+        dx[parado] = 1.0
+        x += dx / dist * vel
+        y += dy / dist * vel
+
+        if separacao:
+            self.separar()
+
+        dx = x - j.x
+        dy = y - j.y
+        soma = self.r[:n] + j.r
+        toca = dx * dx + dy * dy < soma * soma
+        abatidos = int(np.count_nonzero(toca))
+        if abatidos == 0:
+            return 0, False
+        if j.inv == 0:
+            return 0, True
+
+        fica = ~toca
+        m = n - abatidos
+        for arr in (self.x, self.y, self.xa, self.ya, self.r, self.vel):
+            arr[:m] = arr[:n][fica]
+        self.n = m
+        return abatidos, False
@@ -0,0 +1,82 @@
+"""
+Grade uniforme (hash espacial) para a fase larga das colisões do Dash or Die.
+
+O plano é dividido em células quadradas de lado `celula`, e cada item fica
+no balde da célula do seu centro. Um item que se move só troca de balde
+quando muda de célula, então manter a grade a cada frame custa uma conta
+por item. perto() olha só as células que um raio alcança, e pares() entrega
+uma vez cada par de itens em células iguais ou vizinhas. A fase estreita
+(distância ao quadrado, sem raiz) fica com quem pergunta.
+"""
+
+# Vizinhas "para a frente" de uma célula: junto com a própria célula, cada
+# par de células vizinhas aparece uma única vez em pares()
+VIZINHAS = ((1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+class GradeEspacial:
+    """Baldes de itens por célula, com a célula atual de cada item."""
+    def __init__(self, celula):
+        """
+        celula: lado das células; pares() só encontra itens a menos de `celula`
+        um do outro, então deve ser a maior distância de interação.
+        """
+        self.celula = celula
+        self.baldes = {} # (cx, cy) -> itens com o centro nessa célula
+        self.onde = {} # item -> (cx, cy)
+
+    def __len__(self):
+        return len(self.onde)
+
+    def mover(self, item, x, y):
+        """Põe o item (novo ou não) na célula de (x, y); só troca de balde se a célula mudou."""
+        c = self.celula
+        chave = (int(x // c), int(y // c))
+        antiga = self.onde.get(item)
+        if antiga == chave:
+            return
+        if antiga is not None:
+            self._tirar(item, antiga)
+        self.onde[item] = chave
+        balde = self.baldes.get(chave)
+        if balde is None:
+            self.baldes[chave] = [item]
+        else:
+            balde.append(item)
+
+    def remover(self, item):
+        chave = self.onde.pop(item, None)
+        if chave is not None:
+            self._tirar(item, chave)
+
+    def _tirar(self, item, chave):
+        balde = self.baldes[chave]
+        balde.remove(item)
+        if not balde:
+            del self.baldes[chave] # Só células ocupadas ficam no dicionário
+
+    def perto(self, x, y, alcance):
+        """Itens nas células que o quadrado de meio-lado `alcance` em volta de (x, y) toca."""
+        c = self.celula
+        baldes = self.baldes
+        for cy in range(int((y - alcance) // c), int((y + alcance) // c) + 1):
+            for cx in range(int((x - alcance) // c), int((x + alcance) // c) + 1):
+                balde = baldes.get((cx, cy))
+                if balde:
+                    yield from balde
+
+    def pares(self):
+        """Cada par de itens na mesma célula ou em células vizinhas, uma vez."""
+        baldes = self.baldes
+        for (cx, cy), balde in baldes.items():
+            n = len(balde)
+            for a in range(n - 1):
+                item = balde[a]
+                for b in range(a + 1, n):
+                    yield item, balde[b]
+            for dx, dy in VIZINHAS:
+                outro = baldes.get((cx + dx, cy + dy))
+                if outro:
+                    for item in balde:
+                        for vizinho in outro:
+                            yield item, vizinho
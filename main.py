@@ -1,129 +1,174 @@
+import time
+INICIO = time.perf_counter() # Começo da importação, para o relatório de partida a frio
+
+import os
 import pygame
-import random
-import math
 import sys
 
-pygame.init()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from cache_texto import CacheTexto
+from perfil import Perfilador, despejo_jsonl
+from replay import Gravacao
+import subsistemas
+from subsistemas import Fontes, TempoPartida
+from world import W, H, CIMA, BAIXO, ESQUERDA, DIREITA, DASH, World
 
-W, H = 900, 600
-TELA = pygame.display.set_mode((W, H))
-pygame.display.set_caption("Dash or Die")
+TITULO = "Dash or Die"
+TELA = None # Aberta por abrir_janela(): importar o módulo não cria janela
 
 FPS = 60
 CLOCK = pygame.time.Clock()
 
+# Simulação em passo fixo, independente da taxa de desenho
+TPS = 60
+PASSO_MS = 1000 / TPS
+MAX_SUBPASSOS = 5
+
 PRETO = (15, 15, 15)
 BRANCO = (230, 230, 230)
 AZUL = (80, 140, 255)
 VERMELHO = (220, 60, 60)
 AMARELO = (240, 200, 80)
 
-FONTE = pygame.font.SysFont("arial", 24)
-
-class Jogador:
-    def __init__(self):
-        self.x = W//2
-        self.y = H//2
-        self.r = 15
-        self.vel = 4
-        self.dash = 0
-        self.inv = 0
-
-    def mover(self, t):
-        dx = dy = 0
-        if t[pygame.K_w]: dy -= 1
-        if t[pygame.K_s]: dy += 1
-        if t[pygame.K_a]: dx -= 1
-        if t[pygame.K_d]: dx += 1
-
-        mag = math.hypot(dx, dy)
-        if mag != 0:
-            dx /= mag
-            dy /= mag
-
-        speed = 10 if self.dash > 0 else self.vel
-        self.x += dx * speed
-        self.y += dy * speed
-
-        self.x = max(self.r, min(W - self.r, self.x))
-        self.y = max(self.r, min(H - self.r, self.y))
-
-    def usar_dash(self):
-        if self.dash == 0:
-            self.dash = 12
-            self.inv = 15
-
-    def update(self):
-        if self.dash > 0:
-            self.dash -= 1
-        if self.inv > 0:
-            self.inv -= 1
-
-    def draw(self):
-        cor = AMARELO if self.inv > 0 else AZUL
-        pygame.draw.circle(TELA, cor, (int(self.x), int(self.y)), self.r)
-
-class Inimigo:
-    def __init__(self):
-        lado = random.choice(["t","b","l","r"])
-        if lado == "t": self.x, self.y = random.randint(0,W), -20
-        if lado == "b": self.x, self.y = random.randint(0,W), H+20
-        if lado == "l": self.x, self.y = -20, random.randint(0,H)
-        if lado == "r": self.x, self.y = W+20, random.randint(0,H)
-        self.r = random.randint(12,18)
-        self.vel = random.uniform(1.5, 3)
-
-    def update(self, j):
-        ang = math.atan2(j.y - self.y, j.x - self.x)
-        self.x += math.cos(ang) * self.vel
-        self.y += math.sin(ang) * self.vel
-
-    def draw(self):
-        pygame.draw.circle(TELA, VERMELHO, (int(self.x), int(self.y)), self.r)
-
-def main():
-    j = Jogador()
-    inimigos = []
-    spawn = 0
-    score = 0
+# A fonte abre no primeiro uso ou ao fundo, durante o primeiro quadro
+FONTES = Fontes({"hud": ("arial", 24)})
+TEXTOS = CacheTexto()
+
+def abrir_janela():
+    global TELA
+    TELA = subsistemas.janela((W, H), TITULO)
+    return TELA
+
+def ler_entrada(dash):
+    t = pygame.key.get_pressed()
+    entrada = DASH if dash else 0
+    if t[pygame.K_w]: entrada |= CIMA
+    if t[pygame.K_s]: entrada |= BAIXO
+    if t[pygame.K_a]: entrada |= ESQUERDA
+    if t[pygame.K_d]: entrada |= DIREITA
+    return entrada
+
+def desenhar(mundo, reciclados_s, alpha):
+    TELA.fill(PRETO)
+
+    for x, y, r in mundo.circulos_inimigos(alpha):
+        pygame.draw.circle(TELA, VERMELHO, (int(x), int(y)), r)
+
+    j = mundo.jogador
+    cor = AMARELO if j.inv > 0 else AZUL
+    x = j.xa + (j.x - j.xa) * alpha
+    y = j.ya + (j.y - j.ya) * alpha
+    pygame.draw.circle(TELA, cor, (int(x), int(y)), j.r)
+
+    fonte = FONTES.pronta("hud")
+    if fonte:
+        TELA.blit(TEXTOS.composto(fonte, f"Score: {mundo.score}", BRANCO), (20, 20))
+        TELA.blit(TEXTOS.composto(fonte, f"Reciclados/s: {reciclados_s}", BRANCO), (20, 50))
+
+def sair(gravacao=None, arquivo=None, perfil=None):
+    if perfil:
+        print(perfil.relatorio())
+    if gravacao:
+        gravacao.salvar(arquivo)
+        print(f"Partida gravada em {arquivo} (semente {gravacao.mundo.semente}, {len(gravacao.entradas)} frames)")
+    print(TEXTOS.relatorio())
+    pygame.quit()
+    sys.exit()
+
+def main(vetorizado=False, semente=None, gravar=None, perfil=None, separacao=False, partida=None):
+    """
+    gravar: arquivo onde salvar a semente e as entradas da partida, para replay.py.
+    perfil: Perfilador das fases do loop (None = sem medição); F3 mostra a sobreposição.
+    separacao: inimigos se afastam uns dos outros em vez de se sobrepor.
+    partida: TempoPartida que recebe a marca do primeiro quadro e é concluído.
+    """
+    abrir_janela()
+    if partida:
+        partida.marcar("janela")
+    FONTES.carregar_ao_fundo(partida and (lambda: partida.marcar("fontes")))
+    mundo = World(vetorizado, semente, separacao)
+    gravacao = Gravacao(mundo) if gravar else None
+    reciclados_s = 0
+    marca = (time.perf_counter(), 0) # Sem pygame.init, pygame.time.get_ticks fica em 0
+    acumulado = 0.0
+    dash = False
 
     while True:
-        CLOCK.tick(FPS)
-        TELA.fill(PRETO)
+        acumulado += CLOCK.tick(FPS)
+        if perfil:
+            perfil.comecar()
 
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                sair(gravacao, gravar, perfil)
             if e.type == pygame.KEYDOWN:
                 if e.key == pygame.K_LSHIFT:
-                    j.usar_dash()
-
-        t = pygame.key.get_pressed()
-        j.mover(t)
-        j.update()
-
-        spawn += 1
-        if spawn > max(20, 90 - score//10):
-            inimigos.append(Inimigo())
-            spawn = 0
-
-        for i in inimigos[:]:
-            i.update(j)
-            i.draw()
-            if math.hypot(i.x - j.x, i.y - j.y) < i.r + j.r:
-                if j.inv == 0:
-                    pygame.quit()
-                    sys.exit()
-                else:
-                    inimigos.remove(i)
-                    score += 1
-
-        j.draw()
-
-        txt = FONTE.render(f"Score: {score}", True, BRANCO)
-        TELA.blit(txt, (20, 20))
-
+                    dash = True
+                if e.key == pygame.K_F3 and perfil:
+                    perfil.visivel = not perfil.visivel
+        if perfil:
+            perfil.marcar("eventos")
+
+        # Sob carga roda até MAX_SUBPASSOS passos por frame e descarta o
+        # resto, para não entrar em espiral tentando recuperar o atraso.
+        entrada = ler_entrada(dash)
+        passos = 0
+        while acumulado >= PASSO_MS and passos < MAX_SUBPASSOS:
+            if gravacao:
+                gravacao.registrar(entrada)
+            if not mundo.step(entrada):
+                sair(gravacao, gravar, perfil)
+            entrada &= ~DASH
+            dash = False
+            acumulado -= PASSO_MS
+            passos += 1
+        if acumulado >= PASSO_MS:
+            acumulado %= PASSO_MS
+        if perfil:
+            perfil.marcar("step")
+
+        agora = time.perf_counter()
+        if agora - marca[0] >= 1:
+            reciclados_s = int((mundo.reciclados - marca[1]) / (agora - marca[0]))
+            marca = (agora, mundo.reciclados)
+
+        desenhar(mundo, reciclados_s, acumulado / PASSO_MS)
+        if perfil:
+            if perfil.visivel:
+                perfil.desenhar(TELA, FONTES.obter("hud"), (20, 90))
+            perfil.marcar("desenhar")
         pygame.display.flip()
-
-main()
+        if perfil:
+            perfil.terminar("flip")
+        if partida:
+            partida.marcar("primeiro quadro")
+            partida.concluir()
+            partida = None
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description=TITULO)
+    parser.add_argument("--enxame", action="store_true", help="Inimigos em arrays do NumPy")
+    parser.add_argument("--semente", type=int, help="Semente do sorteio dos inimigos (padrão: aleatória)")
+    parser.add_argument("--separacao", action="store_true",
+                        help="Inimigos se afastam uns dos outros em vez de se sobrepor")
+    parser.add_argument("--gravar", metavar="ARQUIVO", help="Grava a partida para rever com replay.py")
+    parser.add_argument("--perfil", action="store_true",
+                        help="Mede o tempo de cada fase do quadro (F3 mostra médias e p99)")
+    parser.add_argument("--orcamento", type=float, default=1000 / FPS, metavar="MS",
+                        help="Com --perfil, duração máxima de um quadro (padrão: 1000/FPS)")
+    parser.add_argument("--despejo", default="perfil.jsonl", metavar="ARQ",
+                        help="Com --perfil, onde gravar os últimos quadros quando um passa do orçamento")
+    parser.add_argument("--tempo-partida", metavar="ARQ", nargs="?", const="",
+                        help="Mostra quanto a partida a frio levou até o primeiro quadro "
+                             "(importação, janela, fontes); com ARQ, acrescenta o resultado em JSONL")
+    args = parser.parse_args()
+    partida = TempoPartida(INICIO, TITULO, args.tempo_partida or None) if args.tempo_partida is not None else None
+    if partida:
+        partida.marcar("importação")
+    perfil = None
+    if args.perfil:
+        perfil = Perfilador(("eventos", "step", "desenhar", "flip"), orcamento_ms=args.orcamento,
+                            ao_estourar=despejo_jsonl(args.despejo))
+    main(args.enxame, args.semente, args.gravar, perfil, args.separacao, partida)
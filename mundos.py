@@ -0,0 +1,204 @@
+import math
+import random
+import struct
+import zlib
+
+import numpy as np
+
+from enxame import afastar_pares, pares_vizinhos
+from world import W, H, CIMA, BAIXO, ESQUERDA, DIREITA, DASH, CELULA, Inimigo, Jogador
+
+# Na busca de pares da separação, cada mundo é deslocado em y por uma faixa
+# desta altura (múltiplo de CELULA, então as células não mudam), larga o
+# bastante para que células de mundos diferentes nunca sejam vizinhas
+FAIXA = CELULA * math.ceil(4 * H / CELULA)
+
+class Mundos:
+    """N partidas independentes avançadas juntas, em arrays do NumPy.
+
+    O jogador de cada mundo ocupa uma posição dos arrays de tamanho N
+    (jx, jy, dash, inv, ...) e os inimigos, uma linha dos arrays
+    (N, capacidade) x, y, r, vel, com os ativos no começo da linha
+    (quantos[m] deles). step() avança todos os mundos um frame com uma
+    entrada por mundo: o movimento e a colisão de todos os inimigos de
+    todos os mundos são uma conta só, e só os sorteios de quem nasce
+    passam por Python.
+
+    As regras são as de World com Enxame, e cada mundo tem o seu gerador,
+    criado com a sua semente. Sem separação (o padrão) cada mundo reproduz
+    exatamente World(vetorizado=True) com a mesma semente e as mesmas
+    entradas; com separação os pares saem de uma busca só para todos os
+    mundos, e a soma dos empurrões pode diferir no arredondamento.
+    """
+    def __init__(self, n, sementes=None, separacao=False, capacidade=64):
+        """sementes: uma por mundo (None = sorteadas, como em World)."""
+        self.n = n
+        self.separacao = separacao
+        modelo = Jogador()
+        self.r_jogador = modelo.r
+        self.vel_jogador = modelo.vel
+        self._molde = Inimigo.__new__(Inimigo) # Rascunho dos sorteios, como em Enxame.novo
+
+        self.jx = np.empty(n)
+        self.jy = np.empty(n)
+        self.jxa = np.empty(n)
+        self.jya = np.empty(n)
+        self.dash = np.zeros(n, dtype=np.int64)
+        self.inv = np.zeros(n, dtype=np.int64)
+        self.spawn = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.vivo = np.ones(n, dtype=bool)
+
+        self.quantos = np.zeros(n, dtype=np.int64)
+        self.x = np.zeros((n, capacidade))
+        self.y = np.zeros((n, capacidade))
+        self.xa = np.zeros((n, capacidade))
+        self.ya = np.zeros((n, capacidade))
+        self.r = np.zeros((n, capacidade))
+        self.vel = np.zeros((n, capacidade))
+        self.sementes = [None] * n
+        self.rngs = [None] * n
+        self.reiniciar(range(n), sementes)
+
+    @property
+    def capacidade(self):
+        return self.x.shape[1]
+
+    def reiniciar(self, mundos, sementes=None):
+        """Começa uma partida nova em cada mundo da lista, com a semente dada ou sorteada."""
+        for k, m in enumerate(mundos):
+            semente = sementes[k] if sementes is not None else random.getrandbits(64)
+            self.sementes[m] = semente
+            self.rngs[m] = random.Random(semente)
+        mundos = list(mundos)
+        self.jx[mundos] = self.jxa[mundos] = W // 2
+        self.jy[mundos] = self.jya[mundos] = H // 2
+        for arr in (self.dash, self.inv, self.spawn, self.score, self.frame, self.quantos):
+            arr[mundos] = 0
+        self.vivo[mundos] = True
+
+    def _crescer(self):
+        cap = 2 * self.capacidade
+        for nome in ("x", "y", "xa", "ya", "r", "vel"):
+            antigo = getattr(self, nome)
+            novo = np.zeros((self.n, cap))
+            novo[:, :antigo.shape[1]] = antigo
+            setattr(self, nome, novo)
+
+    def _novo(self, m):
+        """Sorteia um inimigo com o gerador do mundo m e o põe no fim da sua linha."""
+        if self.quantos[m] == self.capacidade:
+            self._crescer()
+        molde = self._molde
+        molde.reiniciar(self.rngs[m])
+        k = self.quantos[m]
+        self.x[m, k] = self.xa[m, k] = molde.x
+        self.y[m, k] = self.ya[m, k] = molde.y
+        self.r[m, k] = molde.r
+        self.vel[m, k] = molde.vel
+        self.quantos[m] = k + 1
+
+    def assinatura(self, m):
+        """World.assinatura do mundo m, para conferir contra World ou um replay."""
+        n = self.quantos[m]
+        xa = self.xa[m, :n]
+        ya = self.ya[m, :n]
+        x = xa + (self.x[m, :n] - xa) * 1.0 # Como Enxame.circulos com alpha = 1
+        y = ya + (self.y[m, :n] - ya) * 1.0
+        circulos = np.stack([x, y, self.r[m, :n].astype(int)], axis=1).ravel().tolist()
+        dados = [self.jx[m], self.jy[m], self.dash[m], self.inv[m], self.spawn[m], self.score[m],
+                 self.frame[m], self.vivo[m], *circulos]
+        return zlib.crc32(struct.pack(f"<{len(dados)}d", *dados))
+
+    def ativos(self):
+        """Máscara (N, capacidade) dos inimigos ativos."""
+        return np.arange(self.capacidade) < self.quantos[:, None]
+
+    def _mover_jogadores(self, entradas, vivo):
+        """Jogador.usar_dash, mover e update em todos os mundos vivos."""
+        usa = vivo & (entradas & DASH != 0) & (self.dash == 0)
+        self.dash[usa] = 12
+        self.inv[usa] = 15
+
+        dx = (entradas & DIREITA != 0).astype(float) - (entradas & ESQUERDA != 0)
+        dy = (entradas & BAIXO != 0).astype(float) - (entradas & CIMA != 0)
+        mag = np.hypot(dx, dy)
+        anda = vivo & (mag != 0)
+        mag[~anda] = 1.0
+        velocidade = np.where(self.dash > 0, 10, self.vel_jogador)
+        r = self.r_jogador
+        self.jxa[vivo] = self.jx[vivo]
+        self.jya[vivo] = self.jy[vivo]
+        self.jx[anda] = np.clip(self.jx + dx / mag * velocidade, r, W - r)[anda]
+        self.jy[anda] = np.clip(self.jy + dy / mag * velocidade, r, H - r)[anda]
+
+        self.dash -= vivo & (self.dash > 0)
+        self.inv -= vivo & (self.inv > 0)
+
+    def _separar(self, ativos):
+        """Enxame.separar em todos os mundos, com uma busca de pares só (cada mundo na sua faixa)."""
+        indices = np.flatnonzero(ativos)
+        if len(indices) < 2:
+            return
+        x = self.x.reshape(-1)
+        y = self.y.reshape(-1)
+        xs = x[indices]
+        ys = y[indices]
+        a, b = pares_vizinhos(xs, ys + (indices // self.capacidade) * FAIXA, CELULA)
+        afastar_pares(xs, ys, self.r.reshape(-1)[indices], a, b)
+        x[indices] = xs
+        y[indices] = ys
+
+    def step(self, entradas):
+        """
+        Avança um frame em todos os mundos, com a bitmask de entrada de cada um
+        (array de N inteiros). Mundos mortos não mudam.
+        Retorna (abatidos, morreram): inimigos abatidos em cada mundo e a
+        máscara dos mundos em que o jogador morreu neste frame.
+        """
+        entradas = np.asarray(entradas)
+        vivo = self.vivo.copy()
+        self._mover_jogadores(entradas, vivo)
+
+        self.spawn += vivo
+        for m in np.flatnonzero(vivo & (self.spawn > np.maximum(20, 90 - self.score // 10))).tolist():
+            self._novo(m)
+            self.spawn[m] = 0
+
+        # Enxame.update em todas as linhas; mundos mortos andam 0
+        x, y = self.x, self.y
+        self.xa[:] = x
+        self.ya[:] = y
+        dx = self.jx[:, None] - x
+        dy = self.jy[:, None] - y
+        dist = np.hypot(dx, dy)
+        parado = dist == 0
+        dist[parado] = 1.0
+        dx[parado] = 1.0
+        passo = self.vel * vivo[:, None]
+        x += dx / dist * passo
+        y += dy / dist * passo
+
+        ativos = self.ativos() & vivo[:, None]
+        if self.separacao:
+            self._separar(ativos)
+
+        dx = x - self.jx[:, None]
+        dy = y - self.jy[:, None]
+        soma = self.r + self.r_jogador
+        toca = (dx * dx + dy * dy < soma * soma) & ativos
+        abatidos = np.count_nonzero(toca, axis=1)
+        morreram = (abatidos > 0) & (self.inv == 0)
+        self.vivo[morreram] = False
+        abatidos[morreram] = 0
+        for m in np.flatnonzero(abatidos).tolist():
+            n = self.quantos[m]
+            fica = ~toca[m, :n]
+            k = n - abatidos[m]
+            for arr in (self.x, self.y, self.xa, self.ya, self.r, self.vel):
+                arr[m, :k] = arr[m, :n][fica]
+            self.quantos[m] = k
+        self.score += abatidos
+        self.frame += self.vivo & vivo
+        return abatidos, morreram
@@ -0,0 +1,115 @@
+"""
+Gravação e replay de partidas do Dash or Die.
+
+Uma partida é reproduzível a partir da semente do World e da entrada de cada
+frame. O arquivo tem um cabeçalho fixo seguido de um byte por frame com a
+bitmask de teclas (W/A/S/D/LSHIFT = CIMA/BAIXO/ESQUERDA/DIREITA/DASH).
+O replay roda sem pygame nem janela, tão rápido quanto a CPU permitir.
+
+Uso: python replay.py partida.dash [--ate FRAME]
+"""
+import argparse
+import math
+import struct
+import sys
+import time
+from collections import namedtuple
+
+from world import World
+
+MAGICO = b"DASH"
+VERSAO = 2
+INICIO = struct.Struct("<4sB") # Mágico e versão, iguais em todas as versões
+# Mágico, versão, vetorizado, semente, frames gravados e o resultado da
+# gravação: score, vivo e assinatura do estado final; desde a versão 2, se
+# os inimigos se separam (a versão 1 é de antes da separação)
+CABECALHOS = {
+    1: struct.Struct("<4sBBQIIBI"),
+    2: struct.Struct("<4sBBQIIBIB"),
+}
+
+Replay = namedtuple("Replay", "vetorizado semente entradas score vivo assinatura separacao")
+
+
+class Gravacao:
+    """Entradas de uma partida em andamento, um byte por chamada a World.step."""
+    def __init__(self, mundo):
+        self.mundo = mundo
+        self.entradas = bytearray()
+
+    def registrar(self, entrada):
+        self.entradas.append(entrada)
+
+    def salvar(self, caminho):
+        mundo = self.mundo
+        with open(caminho, "wb") as f:
+            f.write(CABECALHOS[VERSAO].pack(MAGICO, VERSAO, mundo.vetorizado, mundo.semente, len(self.entradas),
+                                            mundo.score, mundo.vivo, mundo.assinatura(), mundo.separacao))
+            f.write(self.entradas)
+
+
+def carregar(caminho):
+    """Lê um arquivo de replay."""
+    with open(caminho, "rb") as f:
+        dados = f.read()
+    if len(dados) < INICIO.size:
+        raise ValueError(f"{caminho}: arquivo curto demais para um replay")
+    magico, versao = INICIO.unpack_from(dados)
+    if magico != MAGICO:
+        raise ValueError(f"{caminho}: não é um replay do Dash or Die")
+    if versao not in CABECALHOS:
+        raise ValueError(f"{caminho}: versão de replay {versao} não suportada")
+    cabecalho = CABECALHOS[versao]
+    if len(dados) < cabecalho.size:
+        raise ValueError(f"{caminho}: arquivo curto demais para um replay")
+    campos = cabecalho.unpack_from(dados)
+    _, _, vetorizado, semente, frames, score, vivo, assinatura = campos[:8]
+    separacao = bool(campos[8]) if versao >= 2 else False
+    entradas = dados[cabecalho.size:]
+    if len(entradas) != frames:
+        raise ValueError(f"{caminho}: {frames} frames no cabeçalho, {len(entradas)} no arquivo")
+    return Replay(bool(vetorizado), semente, entradas, score, bool(vivo), assinatura, separacao)
+
+
+def reproduzir(replay, ate=None):
+    """Simula o replay do início até o frame `ate` (ou até o fim); retorna o World."""
+    mundo = World(replay.vetorizado, replay.semente, replay.separacao)
+    for entrada in replay.entradas[:ate]:
+        mundo.step(entrada)
+    return mundo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-simula uma partida gravada do Dash or Die")
+    parser.add_argument("arquivo")
+    parser.add_argument("--ate", type=int, metavar="FRAME",
+                        help="Para no frame dado e mostra o estado, sem conferir o resultado")
+    args = parser.parse_args()
+
+    replay = carregar(args.arquivo)
+    inicio = time.perf_counter()
+    mundo = reproduzir(replay, args.ate)
+    segundos = time.perf_counter() - inicio
+    frames = len(replay.entradas[:args.ate])
+    print(f"{frames} frames em {segundos:.3f} s ({frames / max(segundos, 1e-9):,.0f} frames/s)")
+
+    j = mundo.jogador
+    print(f"frame {mundo.frame}: score {mundo.score}, {'vivo' if mundo.vivo else 'morto'}, "
+          f"jogador em ({j.x:.1f}, {j.y:.1f}) dash {j.dash} inv {j.inv}, {len(mundo.inimigos)} inimigos")
+    if args.ate is not None:
+        # Os inimigos mais próximos, com a folga até encostar no jogador
+        folgas = sorted((math.hypot(x - j.x, y - j.y) - r - j.r, x, y) for x, y, r in mundo.circulos_inimigos())
+        for folga, x, y in folgas[:5]:
+            print(f"  inimigo em ({x:.1f}, {y:.1f}), folga {folga:.1f}")
+        return
+
+    confere = (mundo.score, mundo.vivo, mundo.assinatura()) == (replay.score, replay.vivo, replay.assinatura)
+    if not confere:
+        print(f"DIVERGIU: gravado score {replay.score}, {'vivo' if replay.vivo else 'morto'}, "
+              f"assinatura {replay.assinatura:08x}; simulado assinatura {mundo.assinatura():08x}")
+        sys.exit(1)
+    print("OK: resultado igual ao gravado")
+
+
+if __name__ == "__main__":
+    main()
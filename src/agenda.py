@@ -0,0 +1,209 @@
+"""
+Grade do jardim dirigida por eventos.
+
+Em vez de somar 1 aos contadores de cada tile a cada tick só para perceber
+quando passam de um limite, cada célula guarda o valor do contador num tick
+de referência (o valor atual é calculado na leitura) e agenda o tick exato
+da próxima transição: maturidade, murchamento ou surgimento de erva daninha.
+A cada tick só as células com evento vencido são processadas.
+"""
+from collections import defaultdict
+
+VAZIO, SEMENTE, CRESCENDO, MADURO, MURCHO = "vazio", "semente", "crescendo", "maduro", "murcho"
+
+# Tipos de evento
+AMADURECER = 0
+MURCHAR = 1
+ERVA_DANINHA = 2
+
+
+class Agenda:
+    """Roda de temporização: um balde de eventos por tick, agendar e vencer são O(1)."""
+    def __init__(self):
+        self.baldes = defaultdict(list)
+
+    def agendar(self, tick, evento):
+        self.baldes[tick].append(evento)
+
+    def vencidos(self, tick):
+        """Remove e retorna os eventos do tick."""
+        return self.baldes.pop(tick, ())
+
+    def __len__(self):
+        return sum(len(balde) for balde in self.baldes.values())
+
+
+def classe_beleza(estado, erva):
+    """-1 se o tile tira beleza, 1 se dá, 0 se é neutro (mesma regra do Jogo)."""
+    if estado == MURCHO or erva:
+        return -1
+    if estado == MADURO:
+        return 1
+    return 0
+
+
+class CelulaAgendada:
+    """
+    Célula com os mesmos atributos do Tile, mas com contadores preguiçosos:
+    tempo_crescimento e contador_erva_daninha valem o valor de referência mais
+    os ticks passados desde então, enquanto estiverem correndo.
+    Toda escrita fixa o valor atual e reagenda as próximas transições.
+    """
+    def __init__(self, grade, x, y):
+        self.grade = grade
+        self.grid_x = x
+        self.grid_y = y
+        self.tempo_max_crescimento = grade.tempo_max_crescimento
+        self.tempo_murchar = grade.tempo_murchar
+        self.limite_erva_daninha = grade.limite_erva_daninha
+        self._estado = VAZIO
+        self._erva = False
+        self._tempo = 0 # tempo_crescimento no tick _tick_tempo
+        self._tick_tempo = 0
+        self._contador = 0 # contador_erva_daninha no tick _tick_contador
+        self._tick_contador = 0
+        self._versao_crescimento = 0 # Eventos de versões antigas são ignorados
+        self._versao_erva = 0
+
+    def _tempo_correndo(self):
+        return self._estado in (SEMENTE, CRESCENDO, MADURO)
+
+    def _contador_correndo(self):
+        return self._estado != VAZIO and not self._erva
+
+    # --- Atributos compatíveis com Tile ---
+
+    @property
+    def estado(self):
+        return self._estado
+
+    @estado.setter
+    def estado(self, valor):
+        self._fixar()
+        self._mudar(valor, self._erva)
+        self._agendar_crescimento()
+        self._agendar_erva()
+
+    @property
+    def tem_erva_daninha(self):
+        return self._erva
+
+    @tem_erva_daninha.setter
+    def tem_erva_daninha(self, valor):
+        self._fixar()
+        self._mudar(self._estado, valor)
+        self._agendar_erva()
+
+    @property
+    def tempo_crescimento(self):
+        if self._tempo_correndo():
+            return self._tempo + self.grade.agora - self._tick_tempo
+        return self._tempo
+
+    @tempo_crescimento.setter
+    def tempo_crescimento(self, valor):
+        self._fixar()
+        self._tempo = valor
+        self._agendar_crescimento()
+
+    @property
+    def contador_erva_daninha(self):
+        if self._contador_correndo():
+            return self._contador + self.grade.agora - self._tick_contador
+        return self._contador
+
+    @contador_erva_daninha.setter
+    def contador_erva_daninha(self, valor):
+        self._fixar()
+        self._contador = valor
+        self._agendar_erva()
+
+    # --- Agendamento ---
+
+    def _fixar(self):
+        """Materializa os contadores no tick atual."""
+        self._tempo = self.tempo_crescimento
+        self._contador = self.contador_erva_daninha
+        self._tick_tempo = self._tick_contador = self.grade.agora
+
+    def _mudar(self, estado, erva):
+        grade = self.grade
+        antes = classe_beleza(self._estado, self._erva)
+        depois = classe_beleza(estado, erva)
+        if antes != depois:
+            grade.contagem[antes] -= 1
+            grade.contagem[depois] += 1
+        if estado != VAZIO or erva:
+            grade.ocupados.add(self)
+        else:
+            grade.ocupados.discard(self)
+        self._estado = estado
+        self._erva = erva
+
+    def _agendar_crescimento(self):
+        self._versao_crescimento += 1
+        agora = self.grade.agora
+        if self._estado in (SEMENTE, CRESCENDO):
+            # Tile.update: amadurece no tick em que o tempo chega ao máximo
+            ticks = max(1, self.tempo_max_crescimento - self._tempo)
+            self.grade.agenda.agendar(agora + ticks, (self, AMADURECER, self._versao_crescimento))
+        elif self._estado == MADURO:
+            # ...e murcha no tick em que passa de tempo_murchar
+            ticks = max(1, self.tempo_murchar - self._tempo + 1)
+            self.grade.agenda.agendar(agora + ticks, (self, MURCHAR, self._versao_crescimento))
+
+    def _agendar_erva(self):
+        self._versao_erva += 1
+        if self._contador_correndo():
+            ticks = max(1, self.limite_erva_daninha - self._contador + 1)
+            self.grade.agenda.agendar(self.grade.agora + ticks, (self, ERVA_DANINHA, self._versao_erva))
+
+    def _disparar(self, tipo, versao):
+        """Aplica a transição vencida, se o agendamento ainda vale."""
+        if tipo == ERVA_DANINHA:
+            if versao != self._versao_erva:
+                return
+            self._fixar()
+            self._mudar(self._estado, True)
+            self._contador = 0 # Reset para espalhar
+            self._agendar_erva()
+            return
+
+        if versao != self._versao_crescimento:
+            return
+        self._fixar()
+        if tipo == AMADURECER:
+            self._mudar(MADURO, self._erva)
+            self._tempo = self.tempo_max_crescimento
+        else:
+            self._mudar(MURCHO, self._erva)
+        self._agendar_crescimento()
+
+
+class GradeAgendada(list):
+    """
+    Matriz de células agendadas (grade[y][x]), com o tick atual, a agenda de
+    transições, a contagem de tiles por efeito na beleza e as células
+    plantadas ou com erva daninha (`ocupados`, como em GradeTiles).
+    """
+    def __init__(self, largura, altura, tempo_max_crescimento=100, tempo_murchar=150,
+                 limite_erva_daninha=300, classe_celula=CelulaAgendada):
+        super().__init__()
+        self.largura = largura
+        self.altura = altura
+        self.tempo_max_crescimento = tempo_max_crescimento
+        self.tempo_murchar = tempo_murchar
+        self.limite_erva_daninha = limite_erva_daninha
+        self.agora = 0 # Ticks já simulados
+        self.agenda = Agenda()
+        self.contagem = {-1: 0, 0: largura * altura, 1: 0}
+        self.ocupados = set()
+        for y in range(altura):
+            self.append([classe_celula(self, x, y) for x in range(largura)])
+
+    def atualizar(self):
+        """Avança um tick processando só as células com transição vencida; retorna (ruins, bons)."""
+        self.agora += 1
+        for celula, tipo, versao in self.agenda.vencidos(self.agora):
+            celula._disparar(tipo, versao)
+        return self.contagem[-1], self.contagem[1]
@@ -0,0 +1,86 @@
+"""
+Cache das superfícies de texto do HUD.
+
+Font.render rasteriza o texto inteiro a cada chamada, mesmo quando nada
+mudou desde o quadro anterior. Aqui cada superfície renderizada fica guardada
+por (fonte, texto, cor, antialias), com descarte LRU, e os números são
+compostos dígito a dígito: um placar que muda só cola glifos já prontos.
+"""
+import re
+from collections import OrderedDict
+
+import pygame
+
+# Sequências sem dígito ficam inteiras; cada dígito vira um pedaço próprio
+_PEDACOS = re.compile(r"\d|\D+")
+
+
+class CacheTexto:
+    """Superfícies de texto renderizadas, com descarte do uso menos recente."""
+    def __init__(self, capacidade=256):
+        self.capacidade = capacidade
+        self.superficies = OrderedDict() # (fonte, texto, cor, antialias, composto) -> Surface
+        self.acertos = 0 # Consultas a render/composto; os pedaços de um composto não contam
+        self.falhas = 0
+        self.rasterizacoes = 0 # Chamadas a Font.render
+
+    def __len__(self):
+        return len(self.superficies)
+
+    def _buscar(self, chave, contar=True):
+        superficie = self.superficies.get(chave)
+        if superficie is None:
+            if contar:
+                self.falhas += 1
+        else:
+            self.superficies.move_to_end(chave)
+            if contar:
+                self.acertos += 1
+        return superficie
+
+    def _guardar(self, chave, superficie):
+        self.superficies[chave] = superficie
+        if len(self.superficies) > self.capacidade:
+            self.superficies.popitem(last=False)
+        return superficie
+
+    def render(self, fonte, texto, cor, antialias=True, contar=True):
+        """
+        Como fonte.render(texto, antialias, cor), mas só rasteriza na primeira vez.
+        contar=False não entra na taxa de acertos (pedaços de um composto).
+        """
+        chave = (fonte, texto, cor, antialias, False)
+        superficie = self._buscar(chave, contar)
+        if superficie is None:
+            self.rasterizacoes += 1
+            superficie = self._guardar(chave, fonte.render(texto, antialias, cor))
+        return superficie
+
+    def composto(self, fonte, texto, cor, antialias=True):
+        """
+        Para textos que mudam com frequência (contadores, placares): a superfície
+        é montada colando glifos de dígitos e trechos fixos já em cache, então um
+        valor novo não passa pelo rasterizador. Entre os pedaços não há kerning.
+        """
+        chave = (fonte, texto, cor, antialias, True)
+        superficie = self._buscar(chave)
+        if superficie is not None:
+            return superficie
+        pedacos = [self.render(fonte, pedaco, cor, antialias, contar=False) for pedaco in _PEDACOS.findall(texto)]
+        superficie = pygame.Surface((sum(p.get_width() for p in pedacos), fonte.get_height()), pygame.SRCALPHA)
+        x = 0
+        for pedaco in pedacos:
+            # Os pedaços não se sobrepõem e o fundo é (0, 0, 0, 0): o máximo copia o glifo sem misturar
+            superficie.blit(pedaco, (x, 0), special_flags=pygame.BLEND_RGBA_MAX)
+            x += pedaco.get_width()
+        return self._guardar(chave, superficie)
+
+    def taxa_acertos(self):
+        """Fração das consultas atendidas sem montar nem rasterizar nada."""
+        total = self.acertos + self.falhas
+        return self.acertos / total if total else 0.0
+
+    def relatorio(self):
+        return (f"Cache de texto: {self.taxa_acertos():.1%} de acertos "
+                f"({self.acertos} acertos, {self.falhas} falhas, {self.rasterizacoes} rasterizações, "
+                f"{len(self)} superfícies)")
@@ -0,0 +1,127 @@
+"""
+Espectador de O Jardineiro do Tempo: mostra um jardim transmitido por outro
+processo (main.py --transmitir), refazendo o estado a partir das diferenças.
+
+Uso:
+    python src/main.py --transmitir 127.0.0.1:8766
+    python src/espectador.py 127.0.0.1:8766
+
+ENDERECO é HOST:PORTA ou unix:CAMINHO (conecta ao jogo) ou o caminho de um
+arquivo ou pipe nomeado com a transmissão; "-" lê da entrada padrão.
+"""
+import argparse
+import queue
+import socket
+import sys
+import threading
+
+import pygame
+
+import main as jardim
+from grade_vetorizada import ESTADOS
+from subsistemas import janela
+from transmissao import CABECALHO, Espelho, ler_quadro
+
+
+def abrir(endereco):
+    """Arquivo binário de onde vêm os quadros."""
+    if endereco == "-":
+        return sys.stdin.buffer
+    if endereco.startswith("unix:"):
+        conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conexao.connect(endereco[len("unix:"):])
+        return conexao.makefile("rb")
+    if ":" in endereco:
+        host, porta = endereco.rsplit(":", 1)
+        return socket.create_connection((host, int(porta))).makefile("rb")
+    return open(endereco, "rb")
+
+
+def receber(arquivo, fila):
+    """Thread de leitura: põe na fila cada quadro lido e None quando a transmissão acaba."""
+    try:
+        while (quadro := ler_quadro(arquivo)) is not None:
+            fila.put(quadro)
+    except OSError:
+        pass
+    fila.put(None)
+
+
+def desenhar(tela, espelho, atlas):
+    """Desenha o espelho como Jogo.desenhar desenha o jardim (a parte que cabe na tela)."""
+    tela.fill(jardim.COR_FUNDO)
+    largura, altura = espelho.largura, espelho.altura
+    sequencia = []
+    for y in range(min(altura, jardim.GRID_ALTURA)):
+        for x in range(min(largura, jardim.GRID_LARGURA)):
+            codigo, erva, raio = espelho.celula(y * largura + x)
+            raio = min(atlas.raio_max, raio)
+            raio -= raio % atlas.passo_raio
+            dx, dy, area = atlas.areas[ESTADOS[codigo], raio, erva]
+            celula = jardim.rect_da_celula(x, y)
+            sequencia.append((atlas.superficie, (celula.x + dx, celula.y + dy), area))
+    tela.blits(sequencia, doreturn=False)
+
+    beleza, max_beleza, energia, max_energia, pontuacao, game_over, jx, jy = espelho.painel
+    tela.fill((0, 150, 0), (jx, jy, 30, 30)) # Jardineiro
+    for indice in espelho.pragas:
+        x, y = indice % largura, indice // largura
+        if x < jardim.GRID_LARGURA and y < jardim.GRID_ALTURA:
+            tela.fill(jardim.COR_PRAGA, jardim.rect_da_praga(x, y))
+
+    pygame.draw.rect(tela, (100, 100, 100), (jardim.LARGURA_TELA - 150, 35, 140, 10))
+    pygame.draw.rect(tela, (0, 255, 0), (jardim.LARGURA_TELA - 150, 35, int(140 * beleza / max_beleza), 10))
+    fonte = jardim.FONTES.pronta("pequena")
+    if fonte is None:
+        return
+    textos = jardim.TEXTOS
+    tela.blit(textos.composto(fonte, f"Energia: {energia}/{max_energia}", (255, 255, 255)), (10, 10))
+    tela.blit(textos.composto(fonte, f"Beleza: {int(beleza)}%", (255, 255, 255)), (jardim.LARGURA_TELA - 150, 10))
+    tela.blit(textos.composto(fonte, f"Pontos: {pontuacao}", (255, 255, 255)), (10, 40))
+    tela.blit(textos.composto(fonte, f"Tick {espelho.tick}", (200, 200, 200)), (10, jardim.ALTURA_TELA - 30))
+    if game_over:
+        texto = textos.render(jardim.FONTES.obter("media"), "GAME OVER", (255, 0, 0))
+        tela.blit(texto, (jardim.LARGURA_TELA // 2 - texto.get_width() // 2, jardim.ALTURA_TELA // 2 - 50))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Espectador de {jardim.TITULO}")
+    parser.add_argument("endereco", help="HOST:PORTA, unix:CAMINHO, arquivo ou pipe com a transmissão (- = entrada padrão)")
+    args = parser.parse_args()
+
+    fila = queue.Queue()
+    threading.Thread(target=receber, args=(abrir(args.endereco), fila), daemon=True).start()
+    titulo = f"{jardim.TITULO} - espectador"
+    tela = janela((jardim.LARGURA_TELA, jardim.ALTURA_TELA), titulo)
+    atlas = jardim.AtlasTiles()
+    jardim.FONTES.carregar_ao_fundo()
+    espelho = Espelho()
+    relogio = pygame.time.Clock()
+    recebidos = 0
+    com_texto = False # Se a fonte já estava carregada no último desenho
+    rodando = True
+    while rodando:
+        for evento in pygame.event.get():
+            if evento.type == pygame.QUIT:
+                rodando = False
+        mudou = False
+        while not fila.empty():
+            quadro = fila.get_nowait()
+            if quadro is None:
+                pygame.display.set_caption(f"{titulo} - transmissão encerrada")
+                break
+            espelho.aplicar(*quadro)
+            recebidos += CABECALHO.size + len(quadro[2])
+            mudou = True
+        fonte_pronta = jardim.FONTES.pronta("pequena") is not None
+        if espelho.painel is not None and (mudou or fonte_pronta != com_texto):
+            com_texto = fonte_pronta
+            desenhar(tela, espelho, atlas)
+            pygame.display.flip()
+        relogio.tick(jardim.FPS)
+    print(f"{recebidos} bytes recebidos até o tick {espelho.tick}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
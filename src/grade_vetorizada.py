@@ -0,0 +1,319 @@
+"""
+Grade do jardim em estrutura de arrays (NumPy).
+
+Em vez de uma matriz de objetos Tile, cada campo do tile vira um array
+do tamanho da grade, e o tempo natural (crescimento, murchamento, ervas
+daninhas e saldo de beleza) é calculado para a grade inteira de uma vez.
+"""
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError: # NumPy é opcional: sem ele o jogo usa a grade de objetos Tile
+    np = None
+
+# Códigos dos estados, na ordem de ESTADOS
+VAZIO, SEMENTE, CRESCENDO, MADURO, MURCHO = range(5)
+ESTADOS = ("vazio", "semente", "crescendo", "maduro", "murcho")
+CODIGOS = {nome: codigo for codigo, nome in enumerate(ESTADOS)}
+
+
+def avancar_tempo(estado, tempo, erva, contador, tempo_max_crescimento, tempo_murchar, limite_erva_daninha):
+    """
+    Aplica um tick de tempo natural (o mesmo que Tile.update) a arrays da grade.
+    Os arrays podem ser fatias; são alterados no lugar.
+    Retorna (tiles que tiram beleza, tiles que dão beleza).
+    """
+    crescendo = (estado == SEMENTE) | (estado == CRESCENDO)
+    maduro = estado == MADURO
+    tempo += crescendo | maduro
+
+    amadurece = crescendo & (tempo >= tempo_max_crescimento)
+    estado[amadurece] = MADURO
+    tempo[amadurece] = tempo_max_crescimento
+    estado[maduro & (tempo > tempo_murchar)] = MURCHO
+
+    # Ervas daninhas: o contador só anda em tiles plantados e ainda limpos
+    conta = (estado != VAZIO) & ~erva
+    contador += conta
+    nasce = conta & (contador > limite_erva_daninha)
+    erva |= nasce
+    contador[nasce] = 0
+
+    ruins = (estado == MURCHO) | erva
+    bons = (estado == MADURO) & ~ruins
+    return int(np.count_nonzero(ruins)), int(np.count_nonzero(bons))
+
+
+def aplicar_efeito_tempo(estado, tempo, erva, contador, mascara, fator, tempo_max_crescimento, tempo_murchar):
+    """
+    Aplica a ferramenta temporal (o mesmo que Tile.aplicar_efeito_tempo) às
+    células de `mascara` em arrays da grade, que podem ser fatias; são
+    alterados no lugar.
+    """
+    passo = fator * 5
+    crescendo = mascara & ((estado == SEMENTE) | (estado == CRESCENDO))
+    maduro = mascara & (estado == MADURO)
+    tempo[crescendo | maduro] += passo
+
+    amadurece = crescendo & (tempo >= tempo_max_crescimento)
+    estado[amadurece] = MADURO
+    tempo[amadurece] = tempo_max_crescimento
+    volta = crescendo & (tempo < 0)
+    estado[volta] = VAZIO
+    tempo[volta] = 0
+    estado[maduro & (tempo > tempo_murchar)] = MURCHO
+    estado[maduro & (tempo < tempo_max_crescimento)] = CRESCENDO
+
+    # Acelerar mata a erva daninha; reverter faz o contador regredir
+    com_erva = mascara & erva
+    if fator > 0:
+        erva[com_erva] = False
+        contador[com_erva] = 0
+    elif fator < 0:
+        contador[com_erva] -= passo
+        some = com_erva & (contador < 0)
+        erva[some] = False
+        contador[some] = 0
+
+
+@lru_cache(maxsize=None)
+def mascara_efeito(deslocamentos):
+    """Máscara booleana (2r+1, 2r+1), centrada em (r, r), das células (dx, dy) de `deslocamentos` (tupla)."""
+    r = max(max(abs(dx), abs(dy)) for dx, dy in deslocamentos)
+    mascara = np.zeros((2 * r + 1, 2 * r + 1), dtype=bool)
+    for dx, dy in deslocamentos:
+        mascara[dy + r, dx + r] = True
+    mascara.flags.writeable = False # Compartilhada por todos os usos
+    return mascara
+
+
+class CelulaVetorizada:
+    """Visão de uma célula: os atributos do Tile leem e escrevem nos arrays da grade."""
+    def __init__(self, grade, x, y):
+        self.grade = grade
+        self.grid_x = x
+        self.grid_y = y
+
+    @property
+    def estado(self):
+        return ESTADOS[self.grade.estado[self.grid_y, self.grid_x]]
+
+    @estado.setter
+    def estado(self, valor):
+        self.grade.estado[self.grid_y, self.grid_x] = CODIGOS[valor]
+        self.grade.marcar(self.grid_x, self.grid_y)
+
+    @property
+    def tem_erva_daninha(self):
+        return bool(self.grade.erva[self.grid_y, self.grid_x])
+
+    @tem_erva_daninha.setter
+    def tem_erva_daninha(self, valor):
+        self.grade.erva[self.grid_y, self.grid_x] = valor
+        self.grade.marcar(self.grid_x, self.grid_y)
+
+    @property
+    def tempo_crescimento(self):
+        return int(self.grade.tempo[self.grid_y, self.grid_x])
+
+    @tempo_crescimento.setter
+    def tempo_crescimento(self, valor):
+        self.grade.tempo[self.grid_y, self.grid_x] = valor
+
+    @property
+    def contador_erva_daninha(self):
+        return int(self.grade.contador[self.grid_y, self.grid_x])
+
+    @contador_erva_daninha.setter
+    def contador_erva_daninha(self, valor):
+        self.grade.contador[self.grid_y, self.grid_x] = valor
+
+    @property
+    def tempo_max_crescimento(self):
+        return self.grade.tempo_max_crescimento
+
+    @property
+    def tempo_murchar(self):
+        return self.grade.tempo_murchar
+
+    @property
+    def limite_erva_daninha(self):
+        return self.grade.limite_erva_daninha
+
+
+class GradeVetorizada:
+    """
+    Grade com estado, tempo de crescimento e contador de erva daninha em arrays.
+    grade[y][x] devolve uma célula (classe_celula) compatível com Tile, criada
+    sob demanda, para o código que trabalha tile a tile.
+    """
+    def __init__(self, largura, altura, tempo_max_crescimento=100, tempo_murchar=150,
+                 limite_erva_daninha=300, classe_celula=CelulaVetorizada):
+        if np is None:
+            raise RuntimeError("A grade vetorizada precisa do NumPy (pip install numpy).")
+        self.largura = largura
+        self.altura = altura
+        self.tempo_max_crescimento = tempo_max_crescimento
+        self.tempo_murchar = tempo_murchar
+        self.limite_erva_daninha = limite_erva_daninha
+        self.classe_celula = classe_celula
+
+        self.estado = np.zeros((altura, largura), dtype=np.int8)
+        self.tempo = np.zeros((altura, largura), dtype=np.int32)
+        self.erva = np.zeros((altura, largura), dtype=bool)
+        self.contador = np.zeros((altura, largura), dtype=np.int32)
+        self._linhas = [None] * altura
+
+    def __len__(self):
+        return self.altura
+
+    def __getitem__(self, y):
+        linha = self._linhas[y]
+        if linha is None:
+            linha = [self.classe_celula(self, x, y) for x in range(self.largura)]
+            self._linhas[y] = linha
+        return linha
+
+    def __iter__(self):
+        for y in range(self.altura):
+            yield self[y]
+
+    def marcar(self, x, y):
+        """Avisa que o estado da célula (x, y) foi alterado por fora do tick."""
+
+    def marcar_area(self, x0, y0, x1, y1):
+        """Como marcar(), para o retângulo [x0, x1) x [y0, y1) alterado direto nos arrays."""
+
+    def ocupadas(self):
+        """Índices (y * largura + x) das células plantadas ou com erva daninha, as únicas que mudam sozinhas."""
+        return np.flatnonzero((self.estado != VAZIO) | self.erva)
+
+    def aplicar_efeito(self, cx, cy, deslocamentos, fator):
+        """
+        Ferramenta temporal nas células (cx + dx, cy + dy): uma única atualização
+        sobre a fatia da grade que cobre a área, com a máscara da forma
+        recortada nas bordas. deslocamentos: tupla de (dx, dy).
+        """
+        mascara = mascara_efeito(deslocamentos)
+        r = mascara.shape[0] // 2
+        x0, y0 = max(0, cx - r), max(0, cy - r)
+        x1, y1 = min(self.largura, cx + r + 1), min(self.altura, cy + r + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        mascara = mascara[y0 - cy + r:y1 - cy + r, x0 - cx + r:x1 - cx + r]
+        fatia = np.s_[y0:y1, x0:x1]
+        aplicar_efeito_tempo(self.estado[fatia], self.tempo[fatia], self.erva[fatia], self.contador[fatia],
+                             mascara, fator, self.tempo_max_crescimento, self.tempo_murchar)
+        self.marcar_area(x0, y0, x1, y1)
+
+    def importar_planos(self, estado, tempo, erva, contador):
+        """
+        Substitui todo o conteúdo da grade pelos planos dados (arrays de largura*altura).
+        Arrays graváveis, como os de um arquivo aberto com mmap, passam a ser os
+        próprios arrays da grade, sem cópia; os somente-leitura são copiados.
+        """
+        for nome, plano in (("estado", estado), ("tempo", tempo), ("erva", erva), ("contador", contador)):
+            plano = plano.reshape(self.altura, self.largura)
+            if not plano.flags.writeable or plano.dtype != getattr(self, nome).dtype:
+                plano = plano.astype(getattr(self, nome).dtype)
+            setattr(self, nome, plano)
+
+    def atualizar(self):
+        """Um tick de tempo natural na grade inteira; retorna (ruins, bons) para a beleza."""
+        return avancar_tempo(self.estado, self.tempo, self.erva, self.contador,
+                             self.tempo_max_crescimento, self.tempo_murchar, self.limite_erva_daninha)
+
+
+class GradeEmBlocos(GradeVetorizada):
+    """
+    Grade vetorizada dividida em blocos quadrados, para jardins muito grandes.
+    Só os blocos com algum tile plantado ou com erva daninha ficam no conjunto
+    de ativos; um bloco todo vazio não muda com o tempo e não custa nada por tick.
+    """
+    def __init__(self, largura, altura, tempo_max_crescimento=100, tempo_murchar=150,
+                 limite_erva_daninha=300, classe_celula=CelulaVetorizada, tamanho_bloco=32):
+        super().__init__(largura, altura, tempo_max_crescimento, tempo_murchar,
+                         limite_erva_daninha, classe_celula)
+        self.tamanho_bloco = tamanho_bloco
+        self.ativos = set() # (bloco_x, bloco_y)
+
+        # Os arrays ganham uma borda vazia até um múltiplo do bloco, para que
+        # cada um tenha também uma visão 4D (bloco_y, y, bloco_x, x)
+        t = tamanho_bloco
+        self.blocos_y = -(-altura // t)
+        self.blocos_x = -(-largura // t)
+        self._blocos = {}
+        for nome in ("estado", "tempo", "erva", "contador"):
+            cheio = np.zeros((self.blocos_y * t, self.blocos_x * t), dtype=getattr(self, nome).dtype)
+            setattr(self, nome, cheio[:altura, :largura])
+            self._blocos[nome] = cheio.reshape(self.blocos_y, t, self.blocos_x, t)
+
+    def marcar(self, x, y):
+        self.ativos.add((x // self.tamanho_bloco, y // self.tamanho_bloco))
+
+    def _refazer_ativos(self):
+        """Recalcula o conjunto de ativos varrendo todos os blocos."""
+        b = self._blocos
+        vivos = b["estado"].any(axis=(1, 3)) | b["erva"].any(axis=(1, 3))
+        by, bx = np.nonzero(vivos)
+        self.ativos = set(zip(bx.tolist(), by.tolist()))
+
+    def importar_planos(self, estado, tempo, erva, contador):
+        """Copia os planos para os arrays com borda (que não podem ser trocados) e refaz os ativos."""
+        for nome, plano in (("estado", estado), ("tempo", tempo), ("erva", erva), ("contador", contador)):
+            getattr(self, nome)[...] = plano.reshape(self.altura, self.largura)
+        self._refazer_ativos()
+
+    def ocupadas(self):
+        """Como em GradeVetorizada, procurando só nos blocos ativos (fora de ordem)."""
+        t = self.tamanho_bloco
+        if 2 * len(self.ativos) * t * t >= self.largura * self.altura:
+            return super().ocupadas() # Como em atualizar: com muitos ativos, a grade inteira sai mais barato
+        if not self.ativos:
+            return np.empty(0, dtype=np.int64)
+        b = self._blocos
+        bx, by = np.array(list(self.ativos)).T
+        k, y, x = np.nonzero((b["estado"][by, :, bx, :] != VAZIO) | b["erva"][by, :, bx, :])
+        return (by[k] * t + y) * self.largura + bx[k] * t + x
+
+    def marcar_area(self, x0, y0, x1, y1):
+        t = self.tamanho_bloco
+        for by in range(y0 // t, (y1 - 1) // t + 1):
+            for bx in range(x0 // t, (x1 - 1) // t + 1):
+                self.ativos.add((bx, by))
+
+    def atualizar(self):
+        """
+        Um tick de tempo natural apenas nos blocos ativos; retorna (ruins, bons).
+        Os blocos ativos são copiados juntos para um array (k, bloco, bloco), avançados
+        numa única chamada e escritos de volta, então o custo é proporcional a k.
+        """
+        if not self.ativos:
+            return 0, 0
+        b = self._blocos
+        t = self.tamanho_bloco
+        if 2 * len(self.ativos) * t * t >= self.largura * self.altura:
+            # Com mais da metade do jardim ativa, copiar blocos custa mais que
+            # avançar a grade inteira; o conjunto de ativos é então refeito
+            ruins, bons = super().atualizar()
+            self._refazer_ativos()
+            return ruins, bons
+
+        bx, by = np.array(list(self.ativos)).T
+        estado = b["estado"][by, :, bx, :]
+        tempo = b["tempo"][by, :, bx, :]
+        erva = b["erva"][by, :, bx, :]
+        contador = b["contador"][by, :, bx, :]
+        ruins, bons = avancar_tempo(estado, tempo, erva, contador, self.tempo_max_crescimento,
+                                    self.tempo_murchar, self.limite_erva_daninha)
+        b["estado"][by, :, bx, :] = estado
+        b["tempo"][by, :, bx, :] = tempo
+        b["erva"][by, :, bx, :] = erva
+        b["contador"][by, :, bx, :] = contador
+
+        # Sai do conjunto o bloco que ficou todo vazio e sem erva daninha
+        vivos = estado.any(axis=(1, 2)) | erva.any(axis=(1, 2))
+        if not vivos.all():
+            self.ativos.difference_update(zip(bx[~vivos].tolist(), by[~vivos].tolist()))
+        return ruins, bons
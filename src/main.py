@@ -1,21 +1,41 @@
+import time
+INICIO = time.perf_counter() # Começo da importação, para o relatório de partida a frio
+
 import pygame
 import sys
 import random
 
+from agenda import CelulaAgendada, GradeAgendada, classe_beleza
+import salvamento
+from cache_texto import CacheTexto
+from grade_vetorizada import CODIGOS, ESTADOS, CelulaVetorizada, GradeVetorizada, GradeEmBlocos
+from pragas_vetorizadas import EnxamePragas
+from perfil import Perfilador, despejo_jsonl
+import subsistemas
+from subsistemas import Fontes, TempoPartida
+from transmissao import Emissor, Transmissor
+
 # --- Configurações Globais ---
 TITULO = "O Jardineiro do Tempo"
 LARGURA_TELA = 640
 ALTURA_TELA = 480
 FPS = 60
+TICKS_POR_SEGUNDO = 60 # Taxa fixa da simulação, independente do FPS
+MAX_SUBPASSOS = 5 # Máximo de ticks recuperados por frame quando há atraso
 COR_FUNDO = (20, 20, 30) # Cor de fundo escura
 
 # Configurações da Grade
 TAMANHO_CELULA = 30
-GRID_LARGURA = 16
+GRID_LARGURA = 16 # Tamanho padrão e área visível; jardins maiores são simulados fora da tela
 GRID_ALTURA = 16
 MARGEM_X = (LARGURA_TELA - GRID_LARGURA * TAMANHO_CELULA) // 2
 MARGEM_Y = (ALTURA_TELA - GRID_ALTURA * TAMANHO_CELULA) // 2
 
+# Tempos das plantas (em ticks)
+TEMPO_MAX_CRESCIMENTO = 100 # Para atingir a maturidade
+TEMPO_MURCHAR = 150 # Para murchar após a maturidade
+LIMITE_ERVA_DANINHA = 300 # Para a erva daninha aparecer e se espalhar
+
 # Cores
 COR_SOLO = (100, 60, 40)
 COR_SEMENTE = (150, 150, 0)
@@ -24,42 +44,91 @@ COR_MADURO = (255, 0, 255) # Flor roxa
 COR_MURCHO = (50, 50, 50)
 COR_ERVA_DANINHA = (100, 100, 0)
 COR_PRAGA = (255, 0, 0) # Vermelho para a praga
+CORES_PLANTA = {"semente": COR_SEMENTE, "crescendo": COR_CRESCENDO, "maduro": COR_MADURO, "murcho": COR_MURCHO}
+
+# Ações do jardineiro (Jogo.executar) por tecla
+TECLAS_ACOES = {pygame.K_e: "interagir", pygame.K_z: "acelerar", pygame.K_x: "reverter"}
 
 # --- Inicialização do Pygame ---
-pygame.init()
-TELA = pygame.display.set_mode((LARGURA_TELA, ALTURA_TELA))
-pygame.display.set_caption(TITULO)
+# Sob demanda: importar o jogo não abre janela; abrir_janela() cria a TELA
+TELA = None
+AREA_TELA = pygame.Rect(0, 0, LARGURA_TELA, ALTURA_TELA)
 RELOGIO = pygame.time.Clock()
 
+def abrir_janela():
+    """Abre a janela do jogo na primeira chamada e a retorna."""
+    global TELA
+    TELA = subsistemas.janela((LARGURA_TELA, ALTURA_TELA), TITULO)
+    return TELA
+
 # --- Fontes ---
-try:
-    FONTE_PEQUENA = pygame.font.Font(None, 24)
-    FONTE_MEDIA = pygame.font.Font(None, 36)
-except pygame.error:
-    print("Aviso: Não foi possível carregar a fonte padrão. Usando fallback.")
-    FONTE_PEQUENA = pygame.font.SysFont(None, 24)
-    FONTE_MEDIA = pygame.font.SysFont(None, 36)
+# Abertas no primeiro uso, ou ao fundo enquanto o primeiro quadro é desenhado
+FONTES = Fontes({"pequena": (None, 24), "media": (None, 36)})
+TEXTOS = CacheTexto()
 
 # --- Classes do Jogo ---
 
+def rect_da_celula(x, y):
+    """Retângulo na tela da célula (x, y) da grade."""
+    return pygame.Rect(
+        MARGEM_X + x * TAMANHO_CELULA,
+        MARGEM_Y + y * TAMANHO_CELULA,
+        TAMANHO_CELULA,
+        TAMANHO_CELULA
+    )
+
+def rect_da_praga(x, y):
+    """Retângulo na tela do desenho de uma praga na célula (x, y)."""
+    rect = pygame.Rect(0, 0, 15, 15)
+    rect.center = rect_da_celula(x, y).center
+    return rect
+
+def deslocamentos_efeito(raio, circular=False):
+    """
+    Células (dx, dy) em volta do jardineiro atingidas pela ferramenta temporal:
+    o quadrado (2*raio+1)x(2*raio+1), ou só o disco de raio `raio` se circular.
+    """
+    return tuple((dx, dy) for dy in range(-raio, raio + 1) for dx in range(-raio, raio + 1)
+                 if not circular or dx * dx + dy * dy <= (raio + 0.5) ** 2)
+
+def na_grade(grid, x, y):
+    """Indica se (x, y) é uma célula da grade, qualquer que seja o tamanho dela."""
+    return 0 <= y < len(grid) and 0 <= x < len(grid[y])
+
 class Tile:
     """Representa uma célula do jardim."""
-    def __init__(self, x, y):
+    def __init__(self, x, y, grade=None):
+        self.grade = grade # GradeTiles avisada das mudanças de estado e de erva daninha (ou None)
         self.grid_x = x
         self.grid_y = y
-        self.rect = pygame.Rect(
-            MARGEM_X + x * TAMANHO_CELULA,
-            MARGEM_Y + y * TAMANHO_CELULA,
-            TAMANHO_CELULA,
-            TAMANHO_CELULA
-        )
-        self.estado = "vazio" # "vazio", "semente", "crescendo", "maduro", "murcho"
-        self.tem_erva_daninha = False
+        self.rect = rect_da_celula(x, y)
+        self._estado = "vazio" # "vazio", "semente", "crescendo", "maduro", "murcho"
+        self._erva = False
         self.tempo_crescimento = 0 # Contador para o crescimento
-        self.tempo_max_crescimento = 100 # Tempo (em ticks) para atingir a maturidade
-        self.tempo_murchar = 150 # Tempo (em ticks) para murchar após a maturidade
+        self.tempo_max_crescimento = TEMPO_MAX_CRESCIMENTO
+        self.tempo_murchar = TEMPO_MURCHAR
         self.contador_erva_daninha = 0
-        self.limite_erva_daninha = 300 # Tempo para a erva daninha aparecer e se espalhar
+        self.limite_erva_daninha = LIMITE_ERVA_DANINHA
+
+    @property
+    def estado(self):
+        return self._estado
+
+    @estado.setter
+    def estado(self, valor):
+        if self.grade is not None:
+            self.grade.mudou(self, self._estado, self._erva, valor, self._erva)
+        self._estado = valor
+
+    @property
+    def tem_erva_daninha(self):
+        return self._erva
+
+    @tem_erva_daninha.setter
+    def tem_erva_daninha(self, valor):
+        if self.grade is not None:
+            self.grade.mudou(self, self._estado, self._erva, self._estado, valor)
+        self._erva = valor
 
     def aplicar_efeito_tempo(self, fator):
         """
@@ -96,19 +165,20 @@ class Tile:
 
     def update(self):
         """Atualização natural do tempo (crescimento e murchamento)."""
-        if self.estado == "semente" or self.estado == "crescendo":
+        estado = self.estado # Lido uma vez: estado é uma propriedade
+        if estado == "semente" or estado == "crescendo":
             self.tempo_crescimento += 1
             if self.tempo_crescimento >= self.tempo_max_crescimento:
-                self.estado = "maduro"
+                estado = self.estado = "maduro"
                 self.tempo_crescimento = self.tempo_max_crescimento
         
-        elif self.estado == "maduro":
+        elif estado == "maduro":
             self.tempo_crescimento += 1
             if self.tempo_crescimento > self.tempo_murchar:
-                self.estado = "murcho"
+                estado = self.estado = "murcho"
         
         # Lógica de crescimento de ervas daninhas
-        if self.estado != "vazio" and not self.tem_erva_daninha:
+        if estado != "vazio" and not self.tem_erva_daninha:
             self.contador_erva_daninha += 1
             if self.contador_erva_daninha > self.limite_erva_daninha:
                 self.tem_erva_daninha = True
@@ -119,25 +189,137 @@ class Tile:
         pygame.draw.rect(superficie, COR_SOLO, self.rect, 1)
 
         # Desenha o estado da planta
-        cor_planta = None
-        if self.estado == "semente":
-            cor_planta = COR_SEMENTE
-        elif self.estado == "crescendo":
-            cor_planta = COR_CRESCENDO
-        elif self.estado == "maduro":
-            cor_planta = COR_MADURO
-        elif self.estado == "murcho":
-            cor_planta = COR_MURCHO
-        
-        if cor_planta:
-            # O tamanho do círculo representa o estágio de crescimento
-            raio = int(TAMANHO_CELULA * (self.tempo_crescimento / self.tempo_murchar) / 2)
-            pygame.draw.circle(superficie, cor_planta, self.rect.center, raio)
+        self.desenhar_planta(superficie)
         
         # Desenha a erva daninha
         if self.tem_erva_daninha:
             pygame.draw.rect(superficie, COR_ERVA_DANINHA, self.rect, 2) # Borda amarela/verde ao redor da célula
 
+    def raio_planta(self):
+        """O tamanho do círculo representa o estágio de crescimento."""
+        return int(TAMANHO_CELULA * (self.tempo_crescimento / self.tempo_murchar) / 2)
+
+    def desenhar_planta(self, superficie):
+        """Desenha só o círculo da planta (que pode passar um pouco da célula)."""
+        cor_planta = CORES_PLANTA.get(self.estado)
+        if cor_planta:
+            pygame.draw.circle(superficie, cor_planta, self.rect.center, self.raio_planta())
+
+class GradeTiles(list):
+    """
+    Matriz de objetos Tile (grade[y][x]) com a contagem de tiles por efeito na
+    beleza (-1 murcho ou com erva daninha, 1 maduro, 0 neutro), mantida pelos
+    próprios tiles a cada transição: o saldo de beleza de um tick sai da
+    contagem, sem percorrer a grade. Do mesmo jeito, `ocupados` guarda os
+    tiles plantados ou com erva daninha, os únicos que mudam de aparência.
+    """
+    def __init__(self, largura, altura, limite_erva_daninha=LIMITE_ERVA_DANINHA):
+        super().__init__()
+        self.largura = largura
+        self.altura = altura
+        self.contagem = {-1: 0, 0: largura * altura, 1: 0}
+        self.ocupados = set()
+        for y in range(altura):
+            linha = []
+            for x in range(largura):
+                tile = Tile(x, y, self)
+                tile.limite_erva_daninha = limite_erva_daninha
+                linha.append(tile)
+            self.append(linha)
+
+    def mudou(self, tile, estado, erva, novo_estado, nova_erva):
+        """O tile passou de (estado, erva) para (novo_estado, nova_erva)."""
+        antes = classe_beleza(estado, erva)
+        depois = classe_beleza(novo_estado, nova_erva)
+        if antes != depois:
+            self.contagem[antes] -= 1
+            self.contagem[depois] += 1
+        if novo_estado != "vazio" or nova_erva:
+            self.ocupados.add(tile)
+        else:
+            self.ocupados.discard(tile)
+
+    def atualizar(self):
+        """Um tick de tempo natural em cada tile; retorna (ruins, bons) para a beleza."""
+        for linha in self:
+            for tile in linha:
+                tile.update()
+        return self.contagem[-1], self.contagem[1]
+
+class TileVetorizado(CelulaVetorizada, Tile):
+    """Tile cujo estado mora nos arrays de uma GradeVetorizada."""
+    def __init__(self, grade, x, y):
+        super().__init__(grade, x, y)
+        self.rect = rect_da_celula(x, y)
+
+class TileAgendado(CelulaAgendada, Tile):
+    """Tile de uma GradeAgendada: transições por evento em vez de contagem a cada tick."""
+    def __init__(self, grade, x, y):
+        super().__init__(grade, x, y)
+        self.rect = rect_da_celula(x, y)
+
+class AtlasTiles:
+    """
+    Atlas com o desenho pronto de cada combinação (estado, raio do círculo, erva daninha),
+    renderizado uma vez numa única superfície. Desenhar a grade vira uma chamada a
+    Surface.blits em vez de um draw.rect/draw.circle por tile.
+    """
+    COR_TRANSPARENTE = (1, 2, 3) # Colorkey: não aparece em nenhum desenho de tile
+
+    def __init__(self, passo_raio=1, raio_max=TAMANHO_CELULA * 2 // 3):
+        """
+        passo_raio: resolução dos estágios de crescimento, em pixels de raio (1 = exato).
+        raio_max: maior raio pré-desenhado; uma planta murcha acelerada passa de
+        tempo_murchar e seu círculo sai da célula, por isso cada quadro do atlas tem margem.
+        """
+        self.passo_raio = passo_raio
+        self.raio_max = raio_max
+        self.margem = max(0, raio_max - TAMANHO_CELULA // 2 + 1)
+        self.lado = TAMANHO_CELULA + 2 * self.margem
+        raios = range(0, raio_max + 1, passo_raio)
+        estados = ["vazio"] + list(CORES_PLANTA)
+
+        self.superficie = pygame.Surface((self.lado * len(raios), self.lado * 2 * len(estados)))
+        self.superficie.fill(self.COR_TRANSPARENTE)
+        self.areas = {} # (estado, raio, erva) -> (deslocamento x, deslocamento y, retângulo no atlas)
+        for i, estado in enumerate(estados):
+            for j, raio in enumerate(raios):
+                for erva in (False, True):
+                    celula = pygame.Rect(j * self.lado + self.margem, (2 * i + erva) * self.lado + self.margem,
+                                         TAMANHO_CELULA, TAMANHO_CELULA)
+                    # Só o retângulo realmente desenhado entra no blit
+                    area = self._desenhar(celula, estado, raio, erva)
+                    self.areas[estado, raio, erva] = (area.x - celula.x, area.y - celula.y, area)
+        # Já no formato da tela e com colorkey RLE: o blit pula as partes transparentes
+        self.superficie = self.superficie.convert()
+        self.superficie.set_colorkey(self.COR_TRANSPARENTE)
+
+    def _desenhar(self, rect, estado, raio, erva):
+        """Mesmos traços de Tile.desenhar, numa célula do atlas; retorna a área pintada."""
+        area = pygame.draw.rect(self.superficie, COR_SOLO, rect, 1)
+        if estado in CORES_PLANTA:
+            area.union_ip(pygame.draw.circle(self.superficie, CORES_PLANTA[estado], rect.center, raio))
+        if erva:
+            pygame.draw.rect(self.superficie, COR_ERVA_DANINHA, rect, 2)
+        return area
+
+    def chave(self, tile):
+        """(estado, raio quantizado, erva daninha) do tile."""
+        raio = 0
+        if tile.estado != "vazio":
+            raio = min(self.raio_max, tile.raio_planta())
+            raio -= raio % self.passo_raio
+        return (tile.estado, raio, tile.tem_erva_daninha)
+
+    def sequencia(self, tiles):
+        """Itens (superfície, destino, área) para Surface.blits, na ordem dos tiles."""
+        sup = self.superficie
+        areas = self.areas
+        for tile in tiles:
+            x, y = tile.rect.topleft
+            dx, dy, area = areas[self.chave(tile)]
+            yield sup, (x + dx, y + dy), area
+
 class Jardineiro(pygame.sprite.Sprite):
     """Representa o jogador, o Jardineiro do Tempo."""
     def __init__(self):
@@ -147,25 +329,38 @@ class Jardineiro(pygame.sprite.Sprite):
         self.image.fill((0, 150, 0)) # Verde para o jardineiro
         self.rect = self.image.get_rect()
         self.rect.center = (LARGURA_TELA // 2, ALTURA_TELA // 2)
+        self.pos_anterior = self.rect.topleft # Posição no tick anterior (interpolação)
         self.velocidade = 3
         self.energia_temporal = 100 # Recurso para usar a ferramenta
         self.max_energia = 100
+        self.comando = None # Direção (dx, dy) dada por um bot; None = teclado
 
     def update(self):
-        """Processa a entrada do teclado para movimento e regenera energia."""
-        keys = pygame.key.get_pressed()
+        """Processa a entrada do teclado (ou o comando do bot) para movimento e regenera energia."""
+        if self.comando is None and not pygame.display.get_init():
+            esquerda = direita = cima = baixo = False # Sem janela e sem bot: fica parado
+        elif self.comando is None:
+            keys = pygame.key.get_pressed()
+            esquerda = keys[pygame.K_LEFT] or keys[pygame.K_a]
+            direita = keys[pygame.K_RIGHT] or keys[pygame.K_d]
+            cima = keys[pygame.K_UP] or keys[pygame.K_w]
+            baixo = keys[pygame.K_DOWN] or keys[pygame.K_s]
+        else:
+            dx, dy = self.comando
+            esquerda, direita, cima, baixo = dx < 0, dx > 0, dy < 0, dy > 0
         movendo = False
+        self.pos_anterior = self.rect.topleft
         
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if esquerda:
             self.rect.x -= self.velocidade
             movendo = True
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        if direita:
             self.rect.x += self.velocidade
             movendo = True
-        if keys[pygame.K_UP] or keys[pygame.K_w]:
+        if cima:
             self.rect.y -= self.velocidade
             movendo = True
-        if keys[pygame.K_DOWN] or keys[pygame.K_s]:
+        if baixo:
             self.rect.y += self.velocidade
             movendo = True
 
@@ -174,7 +369,7 @@ class Jardineiro(pygame.sprite.Sprite):
             self.energia_temporal += 0.5
         
         # Mantém o jardineiro dentro dos limites da tela
-        self.rect.clamp_ip(TELA.get_rect())
+        self.rect.clamp_ip(AREA_TELA)
 
     def get_grid_pos(self):
         """Retorna a posição do jardineiro na grade."""
@@ -185,7 +380,7 @@ class Jardineiro(pygame.sprite.Sprite):
     def tentar_plantar(self, grid):
         """Tenta plantar uma semente na célula atual."""
         gx, gy = self.get_grid_pos()
-        if 0 <= gx < GRID_LARGURA and 0 <= gy < GRID_ALTURA:
+        if na_grade(grid, gx, gy):
             tile = grid[gy][gx]
             if tile.estado == "vazio":
                 tile.estado = "semente"
@@ -196,7 +391,7 @@ class Jardineiro(pygame.sprite.Sprite):
     def tentar_remover_erva_daninha(self, grid):
         """Tenta remover a erva daninha na célula atual."""
         gx, gy = self.get_grid_pos()
-        if 0 <= gx < GRID_LARGURA and 0 <= gy < GRID_ALTURA:
+        if na_grade(grid, gx, gy):
             tile = grid[gy][gx]
             if tile.tem_erva_daninha:
                 tile.tem_erva_daninha = False
@@ -207,19 +402,24 @@ class Jardineiro(pygame.sprite.Sprite):
     def tentar_colher(self, grid, jogo):
         """Tenta colher uma planta madura na célula atual."""
         gx, gy = self.get_grid_pos()
-        if 0 <= gx < GRID_LARGURA and 0 <= gy < GRID_ALTURA:
+        if na_grade(grid, gx, gy):
             tile = grid[gy][gx]
             if tile.estado == "maduro":
                 tile.estado = "vazio"
                 tile.tempo_crescimento = 0
                 jogo.pontuacao += 10 # Ganha 10 pontos por colheita
-                jogo.medidor_beleza = min(jogo.max_beleza, jogo.medidor_beleza + 5) # Aumenta a beleza
+                jogo.medidor_beleza = min(jogo.max_beleza, jogo.medidor_beleza + jogo.ganho_beleza_colheita)
                 return True
         return False
 
 class Praga(pygame.sprite.Sprite):
-    """Representa uma praga que se move e come plantas."""
-    def __init__(self, grid_x, grid_y):
+    """
+    Representa uma praga que se move e come plantas.
+    Anda a cada velocidade_movimento ticks da simulação, no tick em que
+    tick % velocidade_movimento == fase; fases diferentes espalham os
+    movimentos das pragas entre os ticks.
+    """
+    def __init__(self, grid_x, grid_y, fase=0):
         super().__init__()
         self.tamanho = 15
         self.image = pygame.Surface([self.tamanho, self.tamanho])
@@ -230,6 +430,7 @@ class Praga(pygame.sprite.Sprite):
         self._atualizar_posicao_tela()
         self.tempo_vida = 100 # Tempo de vida da praga (em ticks)
         self.velocidade_movimento = 60 # Move a cada 60 ticks
+        self.fase = fase % self.velocidade_movimento
 
     def _atualizar_posicao_tela(self):
         """Calcula a posição na tela a partir da posição na grade."""
@@ -237,6 +438,16 @@ class Praga(pygame.sprite.Sprite):
         tile_y = MARGEM_Y + self.grid_y * TAMANHO_CELULA
         self.rect.center = (tile_x + TAMANHO_CELULA // 2, tile_y + TAMANHO_CELULA // 2)
 
+    def mover(self, grid_x, grid_y):
+        """Muda a praga de célula, mantendo em dia o índice dos GrupoPragas em que ela está."""
+        antes = (self.grid_x, self.grid_y)
+        self.grid_x = grid_x
+        self.grid_y = grid_y
+        self._atualizar_posicao_tela()
+        for grupo in self.groups():
+            if isinstance(grupo, GrupoPragas):
+                grupo.mover(self, antes)
+
     def aplicar_efeito_tempo(self, fator):
         """Acelerar mata, reverter rejuvenesce/move para trás."""
         self.tempo_vida -= fator * 5 # Acelerar diminui, reverter aumenta
@@ -246,74 +457,206 @@ class Praga(pygame.sprite.Sprite):
             self.tempo_vida = 200 # Limite de vida
 
     def update(self, grid, jogo):
-        """Atualização natural (movimento e alimentação)."""
+        """Atualização natural (movimento e alimentação); a perda de beleza é somada pelo Jogo."""
         self.tempo_vida -= 1
         if self.tempo_vida <= 0:
             self.kill()
             return
 
-        # Pragas diminuem a beleza
-        jogo.medidor_beleza = max(0, jogo.medidor_beleza - 0.01)
-
-        # Movimento lento
-        if pygame.time.get_ticks() % self.velocidade_movimento == 0:
+        # Movimento lento, no tick da fase desta praga
+        if jogo.tick % self.velocidade_movimento == self.fase:
             direcoes = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-            dx, dy = random.choice(direcoes)
+            dx, dy = jogo.rng.choice(direcoes)
             
             novo_gx = self.grid_x + dx
             novo_gy = self.grid_y + dy
 
-            if 0 <= novo_gx < GRID_LARGURA and 0 <= novo_gy < GRID_ALTURA:
-                self.grid_x = novo_gx
-                self.grid_y = novo_gy
-                self._atualizar_posicao_tela()
+            if na_grade(grid, novo_gx, novo_gy):
+                self.mover(novo_gx, novo_gy)
                 
                 # Alimentação: come a planta
                 tile = grid[self.grid_y][self.grid_x]
                 if tile.estado != "vazio":
                     tile.estado = "vazio"
                     tile.tempo_crescimento = 0
-                    print("Praga comeu a planta!")
+                    jogo.avisar("Praga comeu a planta!")
+
+class GrupoPragas(pygame.sprite.Group):
+    """
+    Grupo de pragas com índice espacial: para cada célula da grade, as pragas
+    que estão nela. O índice acompanha add, remove, kill() e Praga.mover, então
+    perguntar pelas pragas de uma célula ou de uma área custa proporcional às
+    células consultadas, e não ao número de pragas.
+    """
+    def __init__(self, *pragas):
+        self.celulas = {} # (grid_x, grid_y) -> set de pragas
+        super().__init__(*pragas)
+
+    def add_internal(self, praga, layer=None):
+        super().add_internal(praga, layer)
+        self._indexar(praga)
+
+    def remove_internal(self, praga):
+        super().remove_internal(praga)
+        self._desindexar(praga, (praga.grid_x, praga.grid_y))
+
+    def _indexar(self, praga):
+        celula = (praga.grid_x, praga.grid_y)
+        pragas = self.celulas.get(celula)
+        if pragas is None:
+            pragas = self.celulas[celula] = set()
+        pragas.add(praga)
+
+    def _desindexar(self, praga, celula):
+        pragas = self.celulas[celula]
+        pragas.discard(praga)
+        if not pragas:
+            del self.celulas[celula]
+
+    def mover(self, praga, antes):
+        """Chamado por Praga.mover: a praga saiu da célula `antes`."""
+        self._desindexar(praga, antes)
+        self._indexar(praga)
+
+    def em(self, x, y):
+        """Pragas na célula (x, y)."""
+        return self.celulas.get((x, y), ())
+
+    def na_area(self, x0, y0, x1, y1):
+        """Pragas nas células [x0, x1) x [y0, y1)."""
+        if (x1 - x0) * (y1 - y0) > len(self.celulas):
+            # Área com mais células que as ocupadas: sai mais barato olhar só as ocupadas
+            return [praga for (x, y), pragas in self.celulas.items()
+                    if x0 <= x < x1 and y0 <= y < y1 for praga in pragas]
+        celulas = self.celulas
+        encontradas = []
+        for y in range(y0, y1):
+            for x in range(x0, x1):
+                pragas = celulas.get((x, y))
+                if pragas:
+                    encontradas.extend(pragas)
+        return encontradas
+
+class EnxamePragasNaTela(EnxamePragas):
+    """EnxamePragas que se desenha como os sprites Praga, uma vez por célula visível ocupada."""
+    def __init__(self, semente=None):
+        super().__init__(semente=semente)
+        self.imagem = pygame.Surface([15, 15])
+        self.imagem.fill(COR_PRAGA)
+
+    def draw(self, superficie):
+        for x, y in self.ocupadas(GRID_LARGURA, GRID_ALTURA):
+            superficie.blit(self.imagem, rect_da_praga(x, y))
 
 class Jogo:
     """Classe principal para gerenciar o loop do jogo."""
-    def __init__(self):
+    def __init__(self, tipo_grade="objetos", largura=GRID_LARGURA, altura=GRID_ALTURA, atlas=None,
+                 arquivo_salvo="jardim.sav", raio_efeito=1, efeito_circular=False, pragas_vetorizadas=False,
+                 limite_erva_daninha=LIMITE_ERVA_DANINHA, perfil=None, semente=None, avisar=print):
+        """
+        tipo_grade: "objetos" (um Tile por célula), "vetorizada" (arrays do NumPy),
+        "blocos" (arrays atualizados só nos blocos com plantas, para jardins grandes)
+        ou "agendada" (cada tile só é processado no tick da sua próxima transição).
+        atlas: AtlasTiles para desenhar a grade com Surface.blits (None = desenho direto).
+        arquivo_salvo: onde F5 salva e de onde F9 carrega o jardim.
+        raio_efeito, efeito_circular: área da ferramenta temporal (1 = 3x3, 2 = 5x5, 4 = 9x9),
+        quadrada ou em disco.
+        pragas_vetorizadas: pragas em arrays (EnxamePragas), tratadas todas juntas a
+        cada tick; precisa de uma grade em arrays ("vetorizada" ou "blocos").
+        limite_erva_daninha: ticks de uma planta até nascer erva daninha no tile.
+        perfil: Perfilador das fases de rodar() (None = sem medição); F3 mostra a sobreposição.
+        semente: semente dos sorteios do jardim (pragas), que saem do gerador
+        próprio do Jogo; várias instâncias no mesmo processo não interferem
+        umas nas outras.
+        avisar: recebe as mensagens do jogo ("Plantio!", "GAME OVER...").
+        """
         self.rodando = True
         self.game_over = False
+        self.rng = random.Random(semente)
+        self.avisar = avisar
         self.todos_sprites = pygame.sprite.Group()
-        self.pragas = pygame.sprite.Group()
+        self.pragas_vetorizadas = pragas_vetorizadas
+        self.pragas = EnxamePragasNaTela(self.rng.getrandbits(64)) if pragas_vetorizadas else GrupoPragas()
         self.jardineiro = Jardineiro()
         self.todos_sprites.add(self.jardineiro)
+        self.tipo_grade = tipo_grade
+        self.atlas = atlas
+        self.arquivo_salvo = arquivo_salvo
+        self.largura = largura
+        self.altura = altura
+        self.limite_erva_daninha = limite_erva_daninha
+        self.perfil = perfil
         self.grid = self._inicializar_grid()
+        if pragas_vetorizadas and not isinstance(self.grid, GradeVetorizada):
+            raise ValueError("As pragas vetorizadas precisam de uma grade em arrays (vetorizada ou blocos).")
         self.custo_temporal = 5 # Custo de energia por uso da ferramenta
+        self.raio_efeito = raio_efeito
+        self.efeito_circular = efeito_circular
+        self.deslocamentos_efeito = deslocamentos_efeito(raio_efeito, efeito_circular)
+        self.tick = 0 # Ticks de simulação já processados
         self.contador_praga = 0
         self.limite_praga = 500 # Tempo para uma nova praga aparecer
+        self.pragas_criadas = 0 # Dá a fase de movimento de cada praga nova, em rodízio
         self.medidor_beleza = 50.0 # Começa com 50/100 (float para precisão)
         self.max_beleza = 100.0
         self.pontuacao = 0 # Pontuação total (colheitas)
+        # Taxas da beleza, por tick (as perdas e o ganho do maduro são por tile ou praga)
+        self.perda_beleza_ruim = 0.005 # Tile murcho ou com erva daninha
+        self.ganho_beleza_maduro = 0.001
+        self.perda_beleza_praga = 0.01
+        self.ganho_beleza_colheita = 5 # Por colheita, de uma vez
 
     def _inicializar_grid(self):
-        """Cria a matriz de objetos Tile."""
-        grid = []
-        for y in range(GRID_ALTURA):
-            linha = []
-            for x in range(GRID_LARGURA):
-                linha.append(Tile(x, y))
-            grid.append(linha)
-        return grid
+        """Cria a matriz de objetos Tile (ou uma grade vetorizada)."""
+        if self.tipo_grade == "vetorizada":
+            return GradeVetorizada(self.largura, self.altura, TEMPO_MAX_CRESCIMENTO, TEMPO_MURCHAR,
+                                   self.limite_erva_daninha, classe_celula=TileVetorizado)
+        if self.tipo_grade == "blocos":
+            return GradeEmBlocos(self.largura, self.altura, TEMPO_MAX_CRESCIMENTO, TEMPO_MURCHAR,
+                                 self.limite_erva_daninha, classe_celula=TileVetorizado)
+        if self.tipo_grade == "agendada":
+            return GradeAgendada(self.largura, self.altura, TEMPO_MAX_CRESCIMENTO, TEMPO_MURCHAR,
+                                 self.limite_erva_daninha, classe_celula=TileAgendado)
+        return GradeTiles(self.largura, self.altura, self.limite_erva_daninha)
+
+    def reiniciar(self):
+        """
+        Começa uma partida nova com a mesma configuração. A semente da nova
+        partida sai do gerador atual, então a mesma semente inicial reproduz
+        também as partidas depois de reiniciar.
+        """
+        self.__init__(self.tipo_grade, self.largura, self.altura, self.atlas, self.arquivo_salvo,
+                      self.raio_efeito, self.efeito_circular, self.pragas_vetorizadas, self.limite_erva_daninha,
+                      self.perfil, semente=self.rng.getrandbits(64), avisar=self.avisar)
+
+    def celulas_efeito(self):
+        """Células da grade na área da ferramenta temporal, em volta do jardineiro."""
+        gx, gy = self.jardineiro.get_grid_pos()
+        return [(gx + dx, gy + dy) for dx, dy in self.deslocamentos_efeito
+                if 0 <= gx + dx < self.largura and 0 <= gy + dy < self.altura]
 
     def _aplicar_efeito_temporal(self, fator):
-        """Aplica o efeito temporal em uma área 3x3 ao redor do jardineiro."""
+        """Aplica o efeito temporal nas plantas e nas pragas da área ao redor do jardineiro."""
         if self.jardineiro.energia_temporal >= self.custo_temporal:
             self.jardineiro.energia_temporal -= self.custo_temporal
             
             gx, gy = self.jardineiro.get_grid_pos()
-            
-            # Itera sobre a área 3x3
-            for y in range(gy - 1, gy + 2):
-                for x in range(gx - 1, gx + 2):
-                    if 0 <= x < GRID_LARGURA and 0 <= y < GRID_ALTURA:
-                        self.grid[y][x].aplicar_efeito_tempo(fator)
+            if isinstance(self.grid, GradeVetorizada):
+                # Grade em arrays: uma atualização em fatia para a área toda
+                self.grid.aplicar_efeito(gx, gy, self.deslocamentos_efeito, fator)
+            else:
+                for x, y in self.celulas_efeito():
+                    self.grid[y][x].aplicar_efeito_tempo(fator)
+
+            # Pragas na área: todas de uma vez no enxame, ou pelo índice de células
+            if self.pragas_vetorizadas:
+                self.pragas.aplicar_efeito(gx, gy, self.deslocamentos_efeito, fator)
+                return True
+            r = self.raio_efeito
+            area = set(self.deslocamentos_efeito)
+            for praga in self.pragas.na_area(gx - r, gy - r, gx + r + 1, gy + r + 1):
+                if (praga.grid_x - gx, praga.grid_y - gy) in area:
+                    praga.aplicar_efeito_tempo(fator)
             return True
         return False
 
@@ -325,109 +668,191 @@ class Jogo:
             if evento.type == pygame.KEYDOWN:
                 if evento.key == pygame.K_ESCAPE:
                     self.rodando = False
+
+                # Salvar/Carregar (F5/F9)
+                if evento.key == pygame.K_F5:
+                    self.salvar(self.arquivo_salvo)
+                    self.avisar(f"Jardim salvo em {self.arquivo_salvo}")
+                if evento.key == pygame.K_F3 and self.perfil:
+                    self.perfil.visivel = not self.perfil.visivel
+                if evento.key == pygame.K_F9:
+                    try:
+                        self.carregar(self.arquivo_salvo)
+                        self.avisar(f"Jardim carregado de {self.arquivo_salvo}")
+                    except (OSError, ValueError) as erro:
+                        self.avisar(f"Não foi possível carregar o jardim: {erro}")
                 
                 if not self.game_over:
-                    # Interação (Plantar/Colher)
-                    if evento.key == pygame.K_e:
-                        if self.jardineiro.tentar_colher(self.grid, self):
-                            print("Colheita!")
-                        elif self.jardineiro.tentar_remover_erva_daninha(self.grid):
-                            print("Erva Daninha Removida!")
-                        elif self.jardineiro.tentar_plantar(self.grid):
-                            print("Plantio!")
-
-                    # Acelerar Tempo (K_z)
-                    if evento.key == pygame.K_z:
-                        if self._aplicar_efeito_temporal(10): # Fator de aceleração alto
-                            print("Tempo Acelerado!")
-                    
-                    # Reverter Tempo (K_x)
-                    if evento.key == pygame.K_x:
-                        if self._aplicar_efeito_temporal(-10): # Fator de reversão alto
-                            print("Tempo Revertido!")
+                    if evento.key in TECLAS_ACOES:
+                        self.executar(TECLAS_ACOES[evento.key])
                 else:
                     # Lógica para reiniciar o jogo (ex: tecla R)
                     if evento.key == pygame.K_r:
-                        self.__init__() # Reinicia o jogo
-                        print("Jogo Reiniciado!")
+                        self.reiniciar()
+                        self.avisar("Jogo Reiniciado!")
+
+    def executar(self, acao):
+        """
+        Uma ação do jardineiro: "interagir" (colher, remover erva daninha ou plantar),
+        "acelerar" ou "reverter" o tempo. Retorna se a ação teve efeito.
+        """
+        if acao == "interagir":
+            if self.jardineiro.tentar_colher(self.grid, self):
+                self.avisar("Colheita!")
+            elif self.jardineiro.tentar_remover_erva_daninha(self.grid):
+                self.avisar("Erva Daninha Removida!")
+            elif self.jardineiro.tentar_plantar(self.grid):
+                self.avisar("Plantio!")
+            else:
+                return False
+            return True
+        if acao == "acelerar":
+            if self._aplicar_efeito_temporal(10): # Fator de aceleração alto
+                self.avisar("Tempo Acelerado!")
+                return True
+            return False
+        if acao == "reverter":
+            if self._aplicar_efeito_temporal(-10): # Fator de reversão alto
+                self.avisar("Tempo Revertido!")
+                return True
+            return False
+        raise ValueError(f"ação desconhecida: {acao!r}")
+
+    def somar_beleza(self, saldo, ticks=1):
+        """
+        Aplica à beleza o saldo de um tick (já somado sobre tiles e pragas), `ticks`
+        vezes, com o limite [0, max_beleza] conferido uma única vez: com o saldo
+        constante o sinal não muda, então só o último limite importaria.
+        """
+        self.medidor_beleza = min(self.max_beleza, max(0, self.medidor_beleza + saldo * ticks))
 
     def atualizar(self):
         """Atualiza o estado de todos os objetos do jogo."""
         if not self.game_over:
             self.todos_sprites.update()
-            self.pragas.update(self.grid, self) # Passa a grade e o objeto Jogo para a praga interagir
-            
-            # Atualiza a grade (tempo natural)
-            for linha in self.grid:
-                for tile in linha:
-                    tile.update()
-                    # Lógica de perda/ganho de beleza por tile
-                    if tile.estado == "murcho" or tile.tem_erva_daninha:
-                        self.medidor_beleza = max(0, self.medidor_beleza - 0.005)
-                    elif tile.estado == "maduro":
-                        self.medidor_beleza = min(self.max_beleza, self.medidor_beleza + 0.001)
+            if self.pragas_vetorizadas:
+                # Todas as pragas num só passo
+                vivas, comidas = self.pragas.atualizar(self.grid, self.tick)
+                if comidas:
+                    self.avisar(f"Pragas comeram {comidas} plantas!")
+            else:
+                self.pragas.update(self.grid, self) # Passa a grade e o objeto Jogo para a praga interagir
+                vivas = len(self.pragas) # As que morreram de velhice neste tick já saíram do grupo
+
+            # Atualiza a grade (tempo natural); toda grade devolve quantos tiles tiram e dão beleza
+            ruins, bons = self.grid.atualizar()
+            self.somar_beleza(self.ganho_beleza_maduro * bons - self.perda_beleza_ruim * ruins
+                              - self.perda_beleza_praga * vivas)
             
             # Lógica de surgimento de pragas
             self.contador_praga += 1
             if self.contador_praga > self.limite_praga:
                 self.contador_praga = 0
                 # Tenta criar uma praga em uma célula aleatória
-                gx = random.randint(0, GRID_LARGURA - 1)
-                gy = random.randint(0, GRID_ALTURA - 1)
-                nova_praga = Praga(gx, gy)
-                self.pragas.add(nova_praga)
+                gx = self.rng.randint(0, self.largura - 1)
+                gy = self.rng.randint(0, self.altura - 1)
+                if self.pragas_vetorizadas:
+                    self.pragas.adicionar(gx, gy, fase=self.pragas_criadas)
+                else:
+                    nova_praga = Praga(gx, gy, self.pragas_criadas)
+                    self.pragas.add(nova_praga)
+                self.pragas_criadas += 1
                 # Não adicionamos ao todos_sprites para evitar o erro de argumento no update()
-                print("Nova Praga apareceu!")
+                self.avisar("Nova Praga apareceu!")
 
             # Checagem de Game Over
             if self.medidor_beleza <= 0:
                 self.game_over = True
-                print("GAME OVER: A beleza do jardim se esvaiu.")
+                self.avisar("GAME OVER: A beleza do jardim se esvaiu.")
+            self.tick += 1
+
+    # --- Salvamento ---
 
-    def desenhar(self):
-        """Desenha todos os elementos na tela."""
+    def capturar(self):
+        """Snapshot compacto do jogo (bytes), para desfazer em memória ou gravar em disco."""
+        j = self.jardineiro
+        if self.pragas_vetorizadas:
+            pragas = self.pragas.registros()
+        else:
+            pragas = [(p.grid_x, p.grid_y, p.tempo_vida, p.fase) for p in self.pragas]
+        if isinstance(self.grid, GradeVetorizada):
+            planos = (self.grid.tempo, self.grid.contador, self.grid.estado, self.grid.erva)
+        else:
+            tiles = [tile for linha in self.grid for tile in linha]
+            planos = ([tile.tempo_crescimento for tile in tiles], [tile.contador_erva_daninha for tile in tiles],
+                      [CODIGOS[tile.estado] for tile in tiles], [tile.tem_erva_daninha for tile in tiles])
+        return salvamento.empacotar(salvamento.Snapshot(
+            self.largura, self.altura, j.energia_temporal, self.medidor_beleza, self.pontuacao,
+            self.contador_praga, self.limite_praga, j.rect.topleft, self.game_over, pragas,
+            self.tick, self.pragas_criadas, *planos))
+
+    def restaurar(self, dados):
+        """Volta ao estado de um snapshot (bytes de capturar() ou um arquivo mapeado)."""
+        s = salvamento.desempacotar(dados)
+        if (s.largura, s.altura) != (self.largura, self.altura):
+            self.largura, self.altura = s.largura, s.altura
+            self.grid = self._inicializar_grid()
+
+        if isinstance(self.grid, GradeVetorizada):
+            self.grid.importar_planos(s.estado, s.tempo, s.erva, s.contador)
+        else:
+            # Os tiles existentes são reaproveitados; só os campos mudam
+            tiles = (tile for linha in self.grid for tile in linha)
+            for tile, tempo, contador, estado, erva in zip(tiles, s.tempo.tolist(), s.contador.tolist(),
+                                                           s.estado.tolist(), s.erva.tolist()):
+                tile.tempo_crescimento = tempo
+                tile.contador_erva_daninha = contador
+                tile.tem_erva_daninha = bool(erva)
+                tile.estado = ESTADOS[estado]
+
+        j = self.jardineiro
+        j.energia_temporal = s.energia
+        j.rect.topleft = j.pos_anterior = s.jardineiro
+        self.medidor_beleza = s.beleza
+        self.pontuacao = s.pontuacao
+        self.contador_praga = s.contador_praga
+        self.limite_praga = s.limite_praga
+        self.game_over = s.game_over
+        self.tick = s.tick
+        self.pragas_criadas = s.pragas_criadas
+        self.pragas.empty()
+        for gx, gy, vida, fase in s.pragas:
+            if self.pragas_vetorizadas:
+                self.pragas.adicionar(gx, gy, vida, fase)
+                continue
+            praga = Praga(gx, gy, fase)
+            praga.tempo_vida = vida
+            self.pragas.add(praga)
+
+    def salvar(self, caminho):
+        salvamento.salvar(caminho, self.capturar())
+
+    def carregar(self, caminho):
+        """Carrega um jardim salvo; o arquivo é mapeado na memória em vez de lido de uma vez."""
+        self.restaurar(salvamento.mapear(caminho))
+
+    def desenhar(self, alpha=1.0):
+        """
+        Desenha todos os elementos na TELA; apresentar() leva o quadro à janela.
+        alpha: fração do próximo tick já decorrida, usada para interpolar o jardineiro.
+        """
         TELA.fill(COR_FUNDO)
         
-        # 1. Desenha a área de efeito temporal (3x3 ao redor do jardineiro)
-        gx, gy = self.jardineiro.get_grid_pos()
-        for y in range(gy - 1, gy + 2):
-            for x in range(gx - 1, gx + 2):
-                if 0 <= x < GRID_LARGURA and 0 <= y < GRID_ALTURA:
-                    tile_rect = self.grid[y][x].rect
-                    # Desenha um contorno suave para indicar a área de efeito
-                    pygame.draw.rect(TELA, (255, 255, 255), tile_rect, 2) # Sem alpha, Pygame não suporta alpha em draw.rect simples
-
-        # 2. Desenha a grade
-        for linha in self.grid:
-            for tile in linha:
-                tile.desenhar(TELA)
+        # 1. Desenha a área de efeito temporal ao redor do jardineiro
+        for x, y in self.celulas_efeito():
+            tile_rect = self.grid[y][x].rect
+            # Desenha um contorno suave para indicar a área de efeito
+            pygame.draw.rect(TELA, (255, 255, 255), tile_rect, 2) # Sem alpha, Pygame não suporta alpha em draw.rect simples
+
+        # 2. Desenha a grade (só a parte que cabe na tela)
+        self.desenhar_tiles(tile for y in range(min(self.altura, GRID_ALTURA)) for tile in self.grid[y][:GRID_LARGURA])
 
         # 3. Desenha o jardineiro e as pragas
-        self.todos_sprites.draw(TELA) # Desenha o Jardineiro
+        TELA.blit(self.jardineiro.image, self.posicao_jardineiro(alpha)) # Desenha o Jardineiro
         self.pragas.draw(TELA) # Desenha as Pragas
 
         # 4. Desenha a UI
-        # Energia Temporal
-        energia_texto = FONTE_PEQUENA.render(f"Energia: {int(self.jardineiro.energia_temporal)}/{int(self.jardineiro.max_energia)}", True, (255, 255, 255))
-        TELA.blit(energia_texto, (10, 10))
-        
-        # Medidor de Beleza
-        beleza_texto = FONTE_PEQUENA.render(f"Beleza: {int(self.medidor_beleza)}%", True, (255, 255, 255))
-        TELA.blit(beleza_texto, (LARGURA_TELA - 150, 10))
-        
-        # Barra de Beleza (Visual)
-        pygame.draw.rect(TELA, (100, 100, 100), (LARGURA_TELA - 150, 35, 140, 10))
-        largura_beleza = int(140 * (self.medidor_beleza / self.max_beleza))
-        pygame.draw.rect(TELA, (0, 255, 0), (LARGURA_TELA - 150, 35, largura_beleza, 10))
-
-        # Pontuação
-        pontuacao_texto = FONTE_PEQUENA.render(f"Pontos: {self.pontuacao}", True, (255, 255, 255))
-        TELA.blit(pontuacao_texto, (10, 40))
-
-        # Instruções
-        if not self.game_over:
-            instrucoes_texto = FONTE_PEQUENA.render("Mover: WASD | Interagir: E | Acelerar: Z | Reverter: X", True, (200, 200, 200))
-            TELA.blit(instrucoes_texto, (LARGURA_TELA // 2 - instrucoes_texto.get_width() // 2, ALTURA_TELA - 30))
+        self.desenhar_ui()
         
         # Tela de Game Over
         if self.game_over:
@@ -435,28 +860,399 @@ class Jogo:
             fundo_game_over.fill((0, 0, 0, 180)) # Fundo semi-transparente
             TELA.blit(fundo_game_over, (0, 0))
 
-            texto_go = FONTE_MEDIA.render("GAME OVER", True, (255, 0, 0))
-            texto_pontos = FONTE_PEQUENA.render(f"Pontuação Final: {self.pontuacao}", True, (255, 255, 255))
-            texto_reiniciar = FONTE_PEQUENA.render("Pressione R para Reiniciar", True, (255, 255, 255))
+            fonte_media = FONTES.obter("media")
+            fonte_pequena = FONTES.obter("pequena")
+            texto_go = TEXTOS.render(fonte_media, "GAME OVER", (255, 0, 0))
+            texto_pontos = TEXTOS.render(fonte_pequena, f"Pontuação Final: {self.pontuacao}", (255, 255, 255))
+            texto_reiniciar = TEXTOS.render(fonte_pequena, "Pressione R para Reiniciar", (255, 255, 255))
 
             TELA.blit(texto_go, (LARGURA_TELA // 2 - texto_go.get_width() // 2, ALTURA_TELA // 2 - 50))
             TELA.blit(texto_pontos, (LARGURA_TELA // 2 - texto_pontos.get_width() // 2, ALTURA_TELA // 2 + 10))
             TELA.blit(texto_reiniciar, (LARGURA_TELA // 2 - texto_reiniciar.get_width() // 2, ALTURA_TELA // 2 + 50))
-        
+
+    def apresentar(self):
+        """Envia o quadro desenhado à janela."""
         pygame.display.flip()
 
-    def rodar(self):
-        """O loop principal do jogo."""
+    def desenhar_tiles(self, tiles):
+        """Desenha as células na ordem dada, pelo atlas (um único blits) se houver."""
+        if self.atlas:
+            TELA.blits(self.atlas.sequencia(tiles), doreturn=False)
+        else:
+            for tile in tiles:
+                tile.desenhar(TELA)
+
+    def posicao_jardineiro(self, alpha=1.0):
+        """Canto superior esquerdo do jardineiro interpolado entre o tick anterior e o atual."""
+        ax, ay = self.jardineiro.pos_anterior
+        x = ax + (self.jardineiro.rect.x - ax) * alpha
+        y = ay + (self.jardineiro.rect.y - ay) * alpha
+        return round(x), round(y)
+
+    def desenhar_ui(self):
+        """Desenha os textos e a barra de beleza por cima do jardim (os textos só depois que a fonte carregou)."""
+        # Barra de Beleza (Visual)
+        pygame.draw.rect(TELA, (100, 100, 100), (LARGURA_TELA - 150, 35, 140, 10))
+        largura_beleza = int(140 * (self.medidor_beleza / self.max_beleza))
+        pygame.draw.rect(TELA, (0, 255, 0), (LARGURA_TELA - 150, 35, largura_beleza, 10))
+
+        fonte = FONTES.pronta("pequena")
+        if fonte is None:
+            return
+
+        # Energia Temporal
+        TELA.blit(TEXTOS.composto(fonte, f"Energia: {int(self.jardineiro.energia_temporal)}/{int(self.jardineiro.max_energia)}", (255, 255, 255)), (10, 10))
+        
+        # Medidor de Beleza
+        TELA.blit(TEXTOS.composto(fonte, f"Beleza: {int(self.medidor_beleza)}%", (255, 255, 255)), (LARGURA_TELA - 150, 10))
+
+        # Pontuação
+        TELA.blit(TEXTOS.composto(fonte, f"Pontos: {self.pontuacao}", (255, 255, 255)), (10, 40))
+
+        # Instruções
+        if not self.game_over:
+            instrucoes_texto = TEXTOS.render(fonte, "Mover: WASD | Interagir: E | Acelerar: Z | Reverter: X", (200, 200, 200))
+            TELA.blit(instrucoes_texto, (LARGURA_TELA // 2 - instrucoes_texto.get_width() // 2, ALTURA_TELA - 30))
+
+    def rodar(self, renderizador=None, partida=None, transmissor=None):
+        """
+        O loop principal do jogo.
+        A simulação avança em ticks de duração fixa (acumulador); o desenho
+        acontece uma vez por frame, interpolado entre os dois últimos ticks.
+        renderizador: objeto com desenhar(alpha), apresentar() e cobrir(area)
+        no lugar dos métodos do Jogo.
+        partida: TempoPartida que recebe a marca do primeiro quadro e é concluído.
+        transmissor: Transmissor que manda aos espectadores o que mudou nos ticks de cada frame.
+        """
+        abrir_janela()
+        desenhar = renderizador.desenhar if renderizador else self.desenhar
+        apresentar = renderizador.apresentar if renderizador else self.apresentar
+        perfil = self.perfil
+        passo_ms = 1000 / TICKS_POR_SEGUNDO
+        acumulado = 0.0
         while self.rodando:
+            acumulado += RELOGIO.tick(FPS)
+            if perfil:
+                perfil.comecar()
             self.processar_eventos()
-            self.atualizar()
-            self.desenhar()
-            RELOGIO.tick(FPS)
+            if perfil:
+                perfil.marcar("eventos")
 
+            passos = 0
+            while acumulado >= passo_ms and passos < MAX_SUBPASSOS:
+                self.atualizar()
+                acumulado -= passo_ms
+                passos += 1
+            if acumulado >= passo_ms:
+                acumulado %= passo_ms # Descarta o atraso que não deu para recuperar
+            if transmissor and passos:
+                transmissor.enviar(self)
+            if perfil:
+                perfil.marcar("atualizar")
+
+            desenhar(acumulado / passo_ms)
+            if perfil:
+                if perfil.visivel:
+                    area = perfil.desenhar(TELA, FONTES.obter("pequena"))
+                    if renderizador:
+                        renderizador.cobrir(area)
+                perfil.marcar("desenhar")
+            apresentar()
+            if perfil:
+                perfil.terminar("apresentar")
+            if partida:
+                partida.marcar("primeiro quadro")
+                partida.concluir()
+                partida = None
+
+        if perfil:
+            print(perfil.relatorio())
+        print(TEXTOS.relatorio())
+        if transmissor:
+            print(transmissor.relatorio())
+            transmissor.fechar()
         pygame.quit()
         sys.exit()
 
+class RenderizadorRetangulos:
+    """
+    Desenho em modo retido com retângulos sujos.
+    Guarda o que foi desenhado no quadro anterior (tiles, sprites e valores da UI)
+    e, a cada quadro, redesenha só as regiões que mudaram, enviando apenas elas
+    com pygame.display.update(rects) em vez de display.flip().
+    """
+    def __init__(self, jogo):
+        self.jogo = jogo
+        self.grid = None # Grade desenhada por último (muda ao reiniciar)
+        self.game_over = None
+        self.com_texto = False # Se a fonte já estava carregada no último quadro completo
+        self.tiles = {} # (x, y) -> chave do último desenho da célula
+        self.sprites = {} # sprite (ou célula de praga do enxame) -> (imagem, retângulo onde foi desenhada)
+        self.ui = [] # Chaves dos valores mostrados em cada região da UI
+        self.regioes = None # Regiões a enviar à tela neste quadro (None = a tela toda)
+        self.cobertas = [] # Regiões desenhadas por cima do quadro por outros (cobrir)
+        self.pixels_enviados = 0 # Pixels enviados à tela no último quadro
+        self.total_pixels = 0
+        self.quadros = 0
+        self._marca = (time.perf_counter(), 0, 0) # Sem pygame.init, pygame.time.get_ticks fica em 0
+
+    def _regioes_ui(self):
+        """(região da tela, valor mostrado nela) para cada elemento da UI."""
+        jogo = self.jogo
+        return [
+            (pygame.Rect(10, 10, 200, 24), int(jogo.jardineiro.energia_temporal)),
+            (pygame.Rect(LARGURA_TELA - 150, 10, 150, 40), (int(jogo.medidor_beleza), int(140 * (jogo.medidor_beleza / jogo.max_beleza)))),
+            (pygame.Rect(10, 40, 200, 24), jogo.pontuacao),
+            (pygame.Rect(0, ALTURA_TELA - 30, LARGURA_TELA, 24), None), # Instruções (fixas)
+        ]
+
+    def _chave_tile(self, tile, na_area):
+        """Tudo o que muda a aparência de uma célula."""
+        if self.jogo.atlas:
+            return self.jogo.atlas.chave(tile) + (na_area,)
+        raio = 0
+        if tile.estado != "vazio":
+            raio = tile.raio_planta()
+        return (tile.estado, raio, tile.tem_erva_daninha, na_area)
+
+    def _extensao_tile(self, tile, chave):
+        """Retângulo ocupado pelo desenho da célula: o círculo de uma planta murcha passa da borda."""
+        raio = chave[1] if chave else 0
+        cx, cy = tile.rect.center
+        return tile.rect.union(pygame.Rect(cx - raio, cy - raio, 2 * raio + 1, 2 * raio + 1))
+
+    def _visiveis(self):
+        return min(self.jogo.largura, GRID_LARGURA), min(self.jogo.altura, GRID_ALTURA)
+
+    def _sprites(self, alpha):
+        jogo = self.jogo
+        j = jogo.jardineiro
+        sprites = {j: (j.image, j.image.get_rect(topleft=jogo.posicao_jardineiro(alpha)))}
+        if jogo.pragas_vetorizadas:
+            for celula in jogo.pragas.ocupadas(GRID_LARGURA, GRID_ALTURA):
+                sprites[celula] = (jogo.pragas.imagem, rect_da_praga(*celula))
+        else:
+            for praga in jogo.pragas:
+                sprites[praga] = (praga.image, praga.rect.copy())
+        return sprites
+
+    def _area_efeito(self):
+        return set(self.jogo.celulas_efeito())
+
+    def _celulas_em(self, area):
+        """Intervalos [x0, x1) e [y0, y1) das células visíveis que cruzam `area`."""
+        largura, altura = self._visiveis()
+        x0 = max(0, (area.left - MARGEM_X) // TAMANHO_CELULA)
+        x1 = min(largura, (area.right - 1 - MARGEM_X) // TAMANHO_CELULA + 1)
+        y0 = max(0, (area.top - MARGEM_Y) // TAMANHO_CELULA)
+        y1 = min(altura, (area.bottom - 1 - MARGEM_Y) // TAMANHO_CELULA + 1)
+        return x0, x1, y0, y1
+
+    def _alinhar(self, area):
+        """
+        Estende `area` para cobrir inteiras as células que ela toca. O pygame desenha
+        o contorno de um draw.rect recortado na borda do recorte, então uma célula
+        nunca pode ser redesenhada só em parte.
+        """
+        x0, x1, y0, y1 = self._celulas_em(area)
+        if x0 >= x1 or y0 >= y1:
+            return area
+        return area.union(pygame.Rect(
+            MARGEM_X + x0 * TAMANHO_CELULA,
+            MARGEM_Y + y0 * TAMANHO_CELULA,
+            (x1 - x0) * TAMANHO_CELULA,
+            (y1 - y0) * TAMANHO_CELULA
+        ))
+
+    def _repintar(self, area, alpha):
+        """Redesenha tudo o que cruza `area`, na mesma ordem de Jogo.desenhar."""
+        jogo = self.jogo
+        TELA.set_clip(area)
+        TELA.fill(COR_FUNDO, area)
+
+        x0, x1, y0, y1 = self._celulas_em(area)
+        for x, y in self._area_efeito():
+            if x0 <= x < x1 and y0 <= y < y1:
+                pygame.draw.rect(TELA, (255, 255, 255), jogo.grid[y][x].rect, 2)
+
+        # As vizinhas da área entram só com o círculo, que pode invadi-la
+        largura, altura = self._visiveis()
+        linhas = range(max(0, y0 - 1), min(altura, y1 + 1))
+        colunas = range(max(0, x0 - 1), min(largura, x1 + 1))
+        if jogo.atlas:
+            # Pelo atlas cada vizinha é um blit inteiro, que o recorte limita à área
+            jogo.desenhar_tiles(jogo.grid[y][x] for y in linhas for x in colunas)
+        else:
+            for y in linhas:
+                linha = jogo.grid[y]
+                for x in colunas:
+                    if x0 <= x < x1 and y0 <= y < y1:
+                        linha[x].desenhar(TELA)
+                    else:
+                        linha[x].desenhar_planta(TELA)
+
+        for imagem, rect in self.sprites.values():
+            if rect.colliderect(area):
+                TELA.blit(imagem, rect)
+
+        if any(regiao.colliderect(area) for regiao, _ in self._regioes_ui()):
+            jogo.desenhar_ui()
+        TELA.set_clip(None)
+
+    def _redesenhar_tudo(self, alpha):
+        """Quadro completo (início, reinício ou game over): desenha tudo e anota o estado."""
+        jogo = self.jogo
+        jogo.desenhar(alpha)
+        self.regioes = None
+        self.grid = jogo.grid
+        self.game_over = jogo.game_over
+        self.com_texto = FONTES.pronta("pequena") is not None
+        self.sprites = self._sprites(alpha)
+        self.ui = [valor for _, valor in self._regioes_ui()]
+        efeito = self._area_efeito()
+        largura, altura = self._visiveis()
+        self.tiles = {}
+        for y in range(altura):
+            linha = jogo.grid[y]
+            for x in range(largura):
+                self.tiles[x, y] = self._chave_tile(linha[x], (x, y) in efeito)
+        return LARGURA_TELA * ALTURA_TELA
+
+    def _desenhar_sujos(self, alpha, cobertas):
+        jogo = self.jogo
+        sujos = list(cobertas) # O que foi desenhado por cima no quadro anterior sai agora
+
+        # Células cuja aparência mudou
+        efeito = self._area_efeito()
+        largura, altura = self._visiveis()
+        for y in range(altura):
+            linha = jogo.grid[y]
+            for x in range(largura):
+                tile = linha[x]
+                chave = self._chave_tile(tile, (x, y) in efeito)
+                antiga = self.tiles.get((x, y))
+                if antiga != chave:
+                    self.tiles[x, y] = chave
+                    sujos.append(self._extensao_tile(tile, chave).union(self._extensao_tile(tile, antiga)))
+
+        # Sprites que se moveram, surgiram ou sumiram: posição antiga e nova
+        sprites = self._sprites(alpha)
+        for sprite, (imagem, rect) in sprites.items():
+            antigo = self.sprites.get(sprite)
+            if antigo is None or antigo[1] != rect:
+                sujos.append(rect)
+                if antigo is not None:
+                    sujos.append(antigo[1])
+        for sprite, (imagem, antigo) in self.sprites.items():
+            if sprite not in sprites:
+                sujos.append(antigo)
+        self.sprites = sprites
+
+        # Regiões da UI cujo valor mudou
+        ui = self._regioes_ui()
+        for i, (regiao, valor) in enumerate(ui):
+            if self.ui[i] != valor:
+                sujos.append(regiao)
+        self.ui = [valor for _, valor in ui]
+
+        tela = TELA.get_rect()
+        sujos = [self._alinhar(rect).clip(tela) for rect in sujos]
+        for rect in sujos:
+            self._repintar(rect, alpha)
+        self.regioes = sujos
+        return sum(rect.w * rect.h for rect in sujos)
+
+    def desenhar(self, alpha=1.0):
+        """Substitui Jogo.desenhar no loop, com o mesmo resultado na tela."""
+        jogo = self.jogo
+        cobertas, self.cobertas = self.cobertas, []
+        com_texto = FONTES.pronta("pequena") is not None
+        if jogo.grid is not self.grid or jogo.game_over != self.game_over or com_texto != self.com_texto:
+            self.pixels_enviados = self._redesenhar_tudo(alpha)
+        elif jogo.game_over:
+            self.pixels_enviados = 0 # Tela de game over parada
+            self.regioes = []
+        else:
+            self.pixels_enviados = self._desenhar_sujos(alpha, cobertas)
+        self.total_pixels += self.pixels_enviados
+        self.quadros += 1
+
+        # Média de pixels por quadro no título da janela, uma vez por segundo
+        agora = time.perf_counter()
+        inicio, pixels, quadros = self._marca
+        if agora - inicio >= 1 and self.quadros > quadros:
+            media = (self.total_pixels - pixels) // (self.quadros - quadros)
+            pygame.display.set_caption(f"{TITULO} - {media} pixels/quadro")
+            self._marca = (agora, self.total_pixels, self.quadros)
+
+    def apresentar(self):
+        """Envia à tela só as regiões redesenhadas (ou a tela toda num quadro completo)."""
+        if self.regioes is None:
+            pygame.display.flip()
+        elif self.regioes:
+            pygame.display.update(self.regioes)
+
+    def cobrir(self, area):
+        """
+        `area` foi desenhada por cima do quadro fora do renderizador (a sobreposição
+        do perfilador): vai à tela neste quadro e é repintada no próximo.
+        """
+        self.cobertas.append(area)
+        if self.regioes is not None:
+            self.regioes.append(area)
+
 # --- Execução do Jogo ---
 if __name__ == "__main__":
-    jogo = Jogo()
-    jogo.rodar()
+    import argparse
+    parser = argparse.ArgumentParser(description=TITULO)
+    parser.add_argument("--grade", choices=["objetos", "vetorizada", "blocos", "agendada"], default="objetos",
+                        help="Armazenamento da grade (padrão: objetos)")
+    parser.add_argument("--largura", type=int, default=GRID_LARGURA, help="Largura do jardim em células")
+    parser.add_argument("--altura", type=int, default=GRID_ALTURA, help="Altura do jardim em células")
+    parser.add_argument("--retangulos-sujos", action="store_true",
+                        help="Redesenha e envia à tela só as regiões que mudaram")
+    parser.add_argument("--atlas", type=int, metavar="PASSO", nargs="?", const=1,
+                        help="Desenha a grade por um atlas pré-renderizado, com o raio das plantas "
+                             "quantizado em PASSO pixels (padrão: 1, exato)")
+    parser.add_argument("--raio-efeito", type=int, default=1,
+                        help="Raio da ferramenta temporal: 1 = 3x3, 2 = 5x5, 4 = 9x9 (padrão: 1)")
+    parser.add_argument("--efeito-circular", action="store_true", help="Ferramenta temporal em disco, não em quadrado")
+    parser.add_argument("--pragas-vetorizadas", action="store_true",
+                        help="Pragas em arrays, todas tratadas num só passo (com --grade vetorizada ou blocos)")
+    parser.add_argument("--arquivo", default="jardim.sav",
+                        help="Arquivo do salvamento (F5 salva, F9 carrega; padrão: jardim.sav)")
+    parser.add_argument("--carregar", action="store_true", help="Começa carregando o jardim de --arquivo")
+    parser.add_argument("--perfil", action="store_true",
+                        help="Mede o tempo de cada fase do quadro (F3 mostra médias e p99)")
+    parser.add_argument("--orcamento", type=float, default=1000 / FPS, metavar="MS",
+                        help="Com --perfil, duração máxima de um quadro (padrão: 1000/FPS)")
+    parser.add_argument("--despejo", default="perfil.jsonl", metavar="ARQ",
+                        help="Com --perfil, onde gravar os últimos quadros quando um passa do orçamento")
+    parser.add_argument("--tempo-partida", metavar="ARQ", nargs="?", const="",
+                        help="Mostra quanto a partida a frio levou até o primeiro quadro "
+                             "(importação, janela, fontes); com ARQ, acrescenta o resultado em JSONL")
+    parser.add_argument("--transmitir", metavar="ENDERECO",
+                        help="Transmite o jardim em diferenças binárias para src/espectador.py: "
+                             "HOST:PORTA ou unix:CAMINHO (espectadores conectam) ou o caminho de um arquivo ou pipe")
+    args = parser.parse_args()
+    partida = TempoPartida(INICIO, TITULO, args.tempo_partida or None) if args.tempo_partida is not None else None
+    if partida:
+        partida.marcar("importação")
+    abrir_janela() # Antes do atlas, que converte as superfícies para o formato da tela
+    if partida:
+        partida.marcar("janela")
+    FONTES.carregar_ao_fundo(partida and (lambda: partida.marcar("fontes")))
+    if args.pragas_vetorizadas and args.grade not in ("vetorizada", "blocos"):
+        parser.error("--pragas-vetorizadas precisa de --grade vetorizada ou blocos")
+    perfil = None
+    if args.perfil:
+        perfil = Perfilador(("eventos", "atualizar", "desenhar", "apresentar"), orcamento_ms=args.orcamento,
+                            ao_estourar=despejo_jsonl(args.despejo))
+    jogo = Jogo(args.grade, args.largura, args.altura, AtlasTiles(args.atlas) if args.atlas else None,
+                args.arquivo, args.raio_efeito, args.efeito_circular, args.pragas_vetorizadas, perfil=perfil)
+    if args.carregar:
+        jogo.carregar(args.arquivo)
+    if partida:
+        partida.marcar("jogo")
+    transmissor = Transmissor(args.transmitir, Emissor(TAMANHO_CELULA, args.atlas or 1)) if args.transmitir else None
+    jogo.rodar(RenderizadorRetangulos(jogo) if args.retangulos_sujos else None, partida, transmissor)
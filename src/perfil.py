@@ -0,0 +1,145 @@
+"""
+Perfilador de quadros: quanto tempo cada fase do loop (eventos, simulação,
+desenho, envio à tela) leva em cada quadro.
+
+Os tempos (perf_counter_ns) ficam num buffer circular com os últimos N
+quadros, de onde saem a média e o p99 de cada fase, mostrados numa
+sobreposição que liga e desliga com F3. Quando um quadro passa do
+orçamento, um gancho recebe o perfilador; despejo_jsonl() grava os últimos
+N quadros num arquivo.
+
+Desligado, o perfilador não existe (o loop guarda None), então o custo é
+um teste por fase.
+"""
+import json
+import time
+from array import array
+
+import pygame
+
+COR_TEXTO = (230, 230, 230)
+COR_ESTOURO = (255, 90, 90)
+COR_FUNDO = (10, 10, 10)
+
+
+class Perfilador:
+    """Tempos das fases dos últimos `quadros` quadros, num buffer circular."""
+    def __init__(self, fases, quadros=240, orcamento_ms=None, ao_estourar=None):
+        """
+        fases: nomes das fases, na ordem do loop.
+        orcamento_ms: duração máxima de um quadro (sem contar a espera do
+        Clock.tick); ao passar dela, ao_estourar(perfilador) é chamado, no máximo
+        uma vez a cada `quadros` quadros, para que cada despejo traga quadros novos.
+        """
+        self.fases = tuple(fases)
+        self.indices = {fase: k for k, fase in enumerate(self.fases)}
+        self.quadros = quadros
+        self.orcamento_ns = None if orcamento_ms is None else int(orcamento_ms * 1e6)
+        self.ao_estourar = ao_estourar
+        colunas = len(self.fases) + 1 # Cada fase e o total
+        self.buffer = array("q", bytes(8 * colunas * quadros))
+        self.contagem = 0 # Quadros medidos desde o início
+        self.estouros = 0
+        self.visivel = False
+        self._atual = [0] * len(self.fases)
+        self._inicio = 0
+        self._marca = 0
+        self._ultimo_despejo = -quadros
+        self._superficie = None # Sobreposição renderizada, refeita algumas vezes por segundo
+
+    def comecar(self):
+        """Início de um quadro."""
+        self._inicio = self._marca = time.perf_counter_ns()
+
+    def marcar(self, fase):
+        """Soma o tempo desde a última marca à fase `fase` (que acabou de terminar)."""
+        agora = time.perf_counter_ns()
+        self._atual[self.indices[fase]] += agora - self._marca
+        self._marca = agora
+
+    def terminar(self, fase):
+        """Marca a última fase e fecha o quadro no buffer."""
+        self.marcar(fase)
+        total = self._marca - self._inicio
+        colunas = len(self.fases) + 1
+        linha = (self.contagem % self.quadros) * colunas
+        atual = self._atual
+        for k, valor in enumerate(atual):
+            self.buffer[linha + k] = valor
+            atual[k] = 0
+        self.buffer[linha + colunas - 1] = total
+        self.contagem += 1
+        if self.orcamento_ns is not None and total > self.orcamento_ns:
+            self.estouros += 1
+            if self.ao_estourar and self.contagem - self._ultimo_despejo >= self.quadros:
+                self._ultimo_despejo = self.contagem
+                self.ao_estourar(self)
+
+    def ultimos(self):
+        """Linhas (ns por fase..., total) dos quadros no buffer, do mais antigo ao mais recente."""
+        colunas = len(self.fases) + 1
+        n = min(self.contagem, self.quadros)
+        primeiro = self.contagem - n
+        linhas = []
+        for q in range(primeiro, self.contagem):
+            k = (q % self.quadros) * colunas
+            linhas.append(self.buffer[k:k + colunas].tolist())
+        return linhas
+
+    def estatisticas(self):
+        """{fase: (média ms, p99 ms)} nos quadros do buffer, com "total" no fim."""
+        linhas = self.ultimos()
+        resultado = {}
+        for k, fase in enumerate(self.fases + ("total",)):
+            valores = sorted(linha[k] for linha in linhas) or [0]
+            p99 = valores[min(len(valores) - 1, int(0.99 * len(valores)))]
+            resultado[fase] = (sum(valores) / len(valores) / 1e6, p99 / 1e6)
+        return resultado
+
+    def relatorio(self):
+        linhas = [f"Perfil dos últimos {min(self.contagem, self.quadros)} quadros "
+                  f"({self.estouros} acima do orçamento em {self.contagem}):"]
+        for fase, (media, p99) in self.estatisticas().items():
+            linhas.append(f"  {fase:<12} média {media:7.3f} ms   p99 {p99:7.3f} ms")
+        return "\n".join(linhas)
+
+    def desenhar(self, superficie, fonte, posicao=(10, 70), intervalo=15):
+        """
+        Desenha a sobreposição com média e p99 de cada fase; o texto é refeito a
+        cada `intervalo` quadros. Retorna o retângulo ocupado.
+        """
+        if self._superficie is None or self.contagem % intervalo == 0:
+            estatisticas = self.estatisticas()
+            textos = [fonte.render(f"{'fase':<11}{'média':>8}{'p99':>8}", True, COR_TEXTO)]
+            for fase, (media, p99) in estatisticas.items():
+                estourou = fase == "total" and self.orcamento_ns is not None and p99 * 1e6 > self.orcamento_ns
+                textos.append(fonte.render(f"{fase:<11}{media:>8.2f}{p99:>8.2f}", True,
+                                           COR_ESTOURO if estourou else COR_TEXTO))
+            largura = max(t.get_width() for t in textos) + 8
+            altura = sum(t.get_height() for t in textos) + 8
+            # Fundo opaco: desenhar de novo por cima do quadro anterior dá o mesmo resultado
+            self._superficie = pygame.Surface((largura, altura))
+            self._superficie.fill(COR_FUNDO)
+            y = 4
+            for texto in textos:
+                self._superficie.blit(texto, (4, y))
+                y += texto.get_height()
+        return superficie.blit(self._superficie, posicao)
+
+
+def despejo_jsonl(caminho):
+    """
+    Gancho ao_estourar que acrescenta a `caminho` uma linha JSON com os últimos
+    quadros do buffer (em ms por fase), do mais antigo ao que estourou.
+    """
+    def despejar(perfil):
+        registro = {
+            "quadro": perfil.contagem - 1,
+            "orcamento_ms": perfil.orcamento_ns / 1e6,
+            "fases": list(perfil.fases) + ["total"],
+            "quadros": [[round(v / 1e6, 4) for v in linha] for linha in perfil.ultimos()],
+        }
+        with open(caminho, "a", encoding="utf-8") as arquivo:
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        print(f"Quadro {registro['quadro']} passou do orçamento; últimos quadros em {caminho}")
+    return despejar
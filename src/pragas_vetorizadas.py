@@ -0,0 +1,169 @@
+"""
+Pragas em arrays (NumPy), para jardins com muitas pragas.
+
+Em vez de um Sprite com Surface por praga, posição e tempo de vida ficam em
+arrays, e cada tick trata todas as pragas de uma vez: envelhecimento, passeio
+aleatório (as direções são sorteadas juntas e os passos para fora da grade
+descartados numa única máscara), alimentação por escrita com índices nos
+arrays da grade vetorizada e perda de beleza somada num único valor.
+"""
+try:
+    import numpy as np
+except ImportError: # NumPy é opcional: sem ele o jogo usa as pragas como sprites
+    np = None
+
+from grade_vetorizada import VAZIO, mascara_efeito
+
+# Passos do passeio aleatório, os mesmos de Praga.update
+DIRECOES = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
+class EnxamePragas:
+    """
+    Pragas guardadas em arrays contíguos (x, y, vida, fase), com as mesmas
+    regras da Praga: perdem 1 de vida por tick, andam uma célula a cada
+    velocidade_movimento ticks, no tick da sua fase (ficando paradas se o
+    passo sai da grade), e comem a planta da célula para onde andaram.
+    """
+    def __init__(self, capacidade=64, vida=100, vida_max=200, semente=None):
+        if np is None:
+            raise RuntimeError("As pragas vetorizadas precisam do NumPy (pip install numpy).")
+        self.n = 0
+        self.x = np.empty(capacidade, dtype=np.int32)
+        self.y = np.empty(capacidade, dtype=np.int32)
+        self.vida = np.empty(capacidade, dtype=np.int32)
+        self.fase = np.empty(capacidade, dtype=np.int16)
+        self.criadas = 0 # Total já adicionado; dá as fases em rodízio
+        self.vida_inicial = vida
+        self.vida_max = vida_max
+        self.velocidade_movimento = 60 # Ticks entre movimentos, como em Praga
+        self.rng = np.random.default_rng(semente)
+        self._dx = np.array([dx for dx, dy in DIRECOES], dtype=np.int32)
+        self._dy = np.array([dy for dx, dy in DIRECOES], dtype=np.int32)
+        self._dono = None # Rascunho do tamanho da grade, para contar células distintas
+
+    def __len__(self):
+        return self.n
+
+    def _reservar(self, quantidade):
+        if self.n + quantidade <= len(self.x):
+            return
+        cap = max(2 * len(self.x), self.n + quantidade)
+        for nome in ("x", "y", "vida", "fase"):
+            antigo = getattr(self, nome)
+            novo = np.empty(cap, dtype=antigo.dtype)
+            novo[:self.n] = antigo[:self.n]
+            setattr(self, nome, novo)
+
+    def adicionar(self, grid_x, grid_y, vida=None, fase=None):
+        """Uma praga nova na célula (grid_x, grid_y)."""
+        self.adicionar_varias([grid_x], [grid_y], None if vida is None else [vida],
+                              None if fase is None else [fase])
+
+    def adicionar_varias(self, grid_x, grid_y, vida=None, fase=None):
+        """
+        Várias pragas de uma vez (sequências ou arrays do mesmo tamanho).
+        Sem fase dada, as fases seguem em rodízio pela ordem de criação, para
+        que os movimentos se espalhem por igual entre os ticks.
+        """
+        k = len(grid_x)
+        self._reservar(k)
+        n = self.n
+        self.x[n:n + k] = grid_x
+        self.y[n:n + k] = grid_y
+        self.vida[n:n + k] = self.vida_inicial if vida is None else vida
+        if fase is None:
+            fase = np.arange(self.criadas, self.criadas + k)
+        self.fase[n:n + k] = np.asarray(fase) % self.velocidade_movimento
+        self.criadas += k
+        self.n = n + k
+
+    def empty(self):
+        self.n = 0
+
+    def registros(self):
+        """(grid_x, grid_y, vida, fase) de cada praga, como no salvamento."""
+        n = self.n
+        return list(zip(self.x[:n].tolist(), self.y[:n].tolist(), self.vida[:n].tolist(), self.fase[:n].tolist()))
+
+    def _compactar(self, fica):
+        m = int(np.count_nonzero(fica))
+        for arr in (self.x, self.y, self.vida, self.fase):
+            arr[:m] = arr[:self.n][fica]
+        self.n = m
+
+    def atualizar(self, grade, tick):
+        """
+        O tick `tick` da simulação para todas as pragas na grade vetorizada `grade`;
+        andam só as pragas cuja fase é a deste tick.
+        Retorna (pragas vivas, plantas comidas); cada praga viva custa beleza.
+        """
+        if self.n == 0:
+            return 0, 0
+        vida = self.vida[:self.n]
+        vida -= 1
+        morre = vida <= 0
+        if morre.any():
+            self._compactar(~morre)
+        n = self.n
+        movem = np.flatnonzero(self.fase[:n] == tick % self.velocidade_movimento)
+        if len(movem) == 0:
+            return n, 0
+
+        direcao = self.rng.integers(0, len(DIRECOES), len(movem), dtype=np.int8)
+        nx = self.x[movem] + np.take(self._dx, direcao)
+        ny = self.y[movem] + np.take(self._dy, direcao)
+        anda = (nx >= 0) & (nx < grade.largura) & (ny >= 0) & (ny < grade.altura)
+        ax = nx[anda]
+        ay = ny[anda]
+        self.x[movem[anda]] = ax
+        self.y[movem[anda]] = ay
+
+        # Alimentação: quem andou come a planta da célula nova
+        plantada = grade.estado[ay, ax] != VAZIO
+        ax = ax[plantada]
+        ay = ay[plantada]
+        grade.estado[ay, ax] = VAZIO
+        grade.tempo[ay, ax] = 0
+        return n, self._distintas(ay * grade.largura + ax, grade.largura * grade.altura)
+
+    def _distintas(self, celulas, total):
+        """
+        Quantas células diferentes há em `celulas` (índices lineares), sem ordenar:
+        cada posição escreve seu número no rascunho e só a última escrita de cada
+        célula se reconhece ao ler de volta.
+        """
+        if self._dono is None or len(self._dono) < total:
+            self._dono = np.empty(total, dtype=np.int32)
+        ordem = np.arange(len(celulas), dtype=np.int32)
+        self._dono[celulas] = ordem
+        return int(np.count_nonzero(self._dono[celulas] == ordem))
+
+    def aplicar_efeito(self, cx, cy, deslocamentos, fator):
+        """
+        Ferramenta temporal nas pragas das células (cx + dx, cy + dy): acelerar
+        envelhece (e mata), reverter rejuvenesce até vida_max, como em Praga.
+        """
+        n = self.n
+        mascara = mascara_efeito(deslocamentos)
+        r = mascara.shape[0] // 2
+        dx = self.x[:n] - (cx - r)
+        dy = self.y[:n] - (cy - r)
+        dentro = np.nonzero((dx >= 0) & (dx <= 2 * r) & (dy >= 0) & (dy <= 2 * r))[0]
+        atingidas = dentro[mascara[dy[dentro], dx[dentro]]]
+        if len(atingidas) == 0:
+            return
+        vida = self.vida[:n]
+        vida[atingidas] = np.minimum(vida[atingidas] - fator * 5, self.vida_max)
+        morre = vida <= 0
+        if morre.any():
+            self._compactar(~morre)
+
+    def ocupadas(self, largura, altura):
+        """Células (x, y) de [0, largura) x [0, altura) com ao menos uma praga."""
+        n = self.n
+        x = self.x[:n]
+        y = self.y[:n]
+        visivel = (x < largura) & (y < altura)
+        contagem = np.bincount(y[visivel] * largura + x[visivel], minlength=largura * altura)
+        return [(int(i % largura), int(i // largura)) for i in np.flatnonzero(contagem)]
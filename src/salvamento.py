@@ -0,0 +1,139 @@
+"""
+Formato de salvamento do jardim.
+
+Um snapshot (em memória ou num arquivo) tem um cabeçalho fixo com os dados
+do Jogo, a lista de pragas e quatro planos da grade, com um valor por tile
+em ordem de linha: tempo de crescimento (int32), contador de erva daninha
+(int32), código do estado (int8) e erva daninha (uint8), tudo little-endian.
+Os planos ficam alinhados no arquivo, então um jardim enorme pode ser aberto
+com mmap e usado direto pela grade vetorizada: as páginas só são lidas do
+disco quando a simulação chega nelas.
+"""
+import array
+import mmap
+import struct
+import sys
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError: # Sem NumPy os planos são lidos e escritos com array/memoryview
+    np = None
+
+MAGICO = b"JARD"
+VERSAO = 2
+INICIO = struct.Struct("<4sH") # Mágico e versão, iguais em todas as versões
+# Mágico, versão, largura, altura, energia, beleza, pontuação, contador e limite
+# de praga, posição do jardineiro, game over, número de pragas e, desde a
+# versão 2, tick da simulação e pragas já criadas (para as fases de movimento)
+CABECALHOS = {
+    1: struct.Struct("<4sH2xIIddqiiiiB3xI"),
+    2: struct.Struct("<4sH2xIIddqiiiiB3xIqI4x"),
+}
+# grid_x, grid_y, tempo_vida e, desde a versão 2, a fase de movimento
+PRAGAS = {
+    1: struct.Struct("<iii"),
+    2: struct.Struct("<iiii"),
+}
+
+Snapshot = namedtuple("Snapshot", "largura altura energia beleza pontuacao contador_praga limite_praga "
+                                  "jardineiro game_over pragas tick pragas_criadas tempo contador estado erva")
+Snapshot.__doc__ = """
+Conteúdo de um salvamento; pragas são (grid_x, grid_y, tempo_vida, fase) e
+os planos são sequências de largura*altura valores.
+"""
+
+
+def _bytes_int32(plano):
+    if np is not None and isinstance(plano, np.ndarray):
+        return np.ascontiguousarray(plano, dtype="<i4").tobytes()
+    valores = array.array("i", plano)
+    if sys.byteorder == "big":
+        valores.byteswap()
+    return valores.tobytes()
+
+
+def _bytes_int8(plano):
+    if np is not None and isinstance(plano, np.ndarray):
+        return np.ascontiguousarray(plano, dtype=np.int8).tobytes()
+    return array.array("b", plano).tobytes()
+
+
+def empacotar(s):
+    """Serializa um Snapshot em bytes."""
+    partes = [CABECALHOS[VERSAO].pack(MAGICO, VERSAO, s.largura, s.altura, s.energia, s.beleza, s.pontuacao,
+                                      s.contador_praga, s.limite_praga, s.jardineiro[0], s.jardineiro[1],
+                                      s.game_over, len(s.pragas), s.tick, s.pragas_criadas)]
+    partes.extend(PRAGAS[VERSAO].pack(*praga) for praga in s.pragas)
+    partes.append(_bytes_int32(s.tempo))
+    partes.append(_bytes_int32(s.contador))
+    partes.append(_bytes_int8(s.estado))
+    partes.append(_bytes_int8(s.erva))
+    return b"".join(partes)
+
+
+def _plano(dados, deslocamento, n, tipo):
+    """n valores de um plano, sem cópia quando possível (NumPy ou memoryview sobre os dados)."""
+    if np is not None:
+        dtype = {"i": "<i4", "b": np.int8, "?": bool}[tipo]
+        return np.frombuffer(dados, dtype=dtype, count=n, offset=deslocamento)
+    tamanho = 4 if tipo == "i" else 1
+    visao = memoryview(dados)[deslocamento:deslocamento + n * tamanho]
+    if tipo == "i" and sys.byteorder == "big":
+        valores = array.array("i", visao.tobytes())
+        valores.byteswap()
+        return valores
+    return visao.cast("B" if tipo == "?" else tipo)
+
+
+def desempacotar(dados):
+    """
+    Lê um Snapshot de bytes, bytearray ou mmap. Os planos são visões sobre
+    `dados` (arrays do NumPy, se disponível), não cópias.
+    Salvamentos da versão 1 começam no tick 0, e cada praga recebe como fase
+    a sua posição na lista, o que espalha os movimentos.
+    """
+    if len(dados) < INICIO.size:
+        raise ValueError("dados curtos demais para um salvamento do jardim")
+    magico, versao = INICIO.unpack_from(dados)
+    if magico != MAGICO:
+        raise ValueError("não é um salvamento do jardim")
+    if versao not in CABECALHOS:
+        raise ValueError(f"versão de salvamento {versao} não suportada (até {VERSAO})")
+    cabecalho = CABECALHOS[versao]
+    if len(dados) < cabecalho.size:
+        raise ValueError("salvamento truncado")
+    campos = cabecalho.unpack_from(dados)
+    (_, _, largura, altura, energia, beleza, pontuacao, contador_praga, limite_praga,
+     jx, jy, game_over, n_pragas) = campos[:13]
+    tick, pragas_criadas = campos[13:] if versao >= 2 else (0, n_pragas)
+
+    pos = cabecalho.size
+    praga = PRAGAS[versao]
+    pragas = [praga.unpack_from(dados, pos + k * praga.size) for k in range(n_pragas)]
+    if versao == 1:
+        pragas = [(x, y, vida, k) for k, (x, y, vida) in enumerate(pragas)]
+    pos += n_pragas * praga.size
+    n = largura * altura
+    if len(dados) < pos + 10 * n:
+        raise ValueError("salvamento truncado")
+    tempo = _plano(dados, pos, n, "i")
+    contador = _plano(dados, pos + 4 * n, n, "i")
+    estado = _plano(dados, pos + 8 * n, n, "b")
+    erva = _plano(dados, pos + 9 * n, n, "?")
+    return Snapshot(largura, altura, energia, beleza, pontuacao, contador_praga, limite_praga,
+                    (jx, jy), bool(game_over), pragas, tick, pragas_criadas, tempo, contador, estado, erva)
+
+
+def salvar(caminho, dados):
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(dados)
+
+
+def mapear(caminho):
+    """
+    Abre um arquivo salvo com mmap em modo cópia-na-escrita: nada é lido
+    antes de ser usado, e alterar os planos não altera o arquivo.
+    """
+    with open(caminho, "rb") as arquivo:
+        return mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_COPY)
@@ -0,0 +1,417 @@
+"""
+Servidor de sessões de O Jardineiro do Tempo: muitos jardins num só processo.
+
+Cada sessão é um Jogo sem janela (os sorteios saem do gerador do próprio
+Jogo e as mensagens vão para a sessão, sem estado global), e um único
+agendador asyncio avança todas no mesmo relógio de TICKS_POR_SEGUNDO.
+Clientes conectam por TCP e trocam uma mensagem JSON por linha: entram numa
+sessão (criada se não existir), mandam comandos, que vão para a fila da
+sessão e são aplicados no tick seguinte, e recebem, a cada tick em que algo
+muda, só os campos que mudaram.
+
+Uma sessão sem clientes e sem comandos há `ociosa_apos` segundos dorme: o
+agendador para de avançá-la e só anota o tick em que ela dormiu. Quando
+alguém volta, ela recupera os ticks devidos antes de aplicar comandos; como
+a simulação de cada sessão só depende dela mesma, o resultado é o de tê-la
+avançado em tempo real. A recuperação tem um orçamento por tick do
+agendador, dividido entre todas as sessões que acordaram (na ordem em que
+acordaram), então muitos jardins voltando juntos não travam o loop. Jardins
+ociosos custam só memória, relatada por sessão.
+
+Protocolo (cliente -> servidor):
+    {"sessao": "nome"}                entra na sessão (e a cria)
+    {"mover": [dx, dy]}               direção do jardineiro, -1, 0 ou 1 (0, 0 para)
+    {"acao": "interagir"}             também "acelerar", "reverter" e "reiniciar" (no game over)
+    {"memoria": true}                 relatório de memória do servidor
+Servidor -> cliente: o estado completo ao entrar, depois {"tick": n, ...}
+só com o que mudou; "tiles" traz [índice, código] das células alteradas
+(código = 2 * estado + erva daninha, índice = y * largura + x).
+
+Uso:
+    python src/servidor.py --porta 8765 --sessoes 5000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import time
+import types
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError: # Sem NumPy as sessões usam a grade agendada e pragas em sprites
+    np = None
+
+import main as jardim
+from grade_vetorizada import CODIGOS, GradeVetorizada
+
+ACOES = ("interagir", "acelerar", "reverter")
+LIMITE_BUFFER = 1 << 20 # Bytes pendentes para um cliente antes de desconectá-lo por lentidão
+
+# Não entram na memória de uma sessão: são do processo, compartilhados por todas
+COMPARTILHADOS = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                  types.MethodType, asyncio.AbstractEventLoop)
+
+
+def tamanho_profundo(obj):
+    """
+    Bytes dos objetos alcançáveis a partir de `obj` (pelo gc), contando os
+    pixels das Surfaces e a memória dos arrays do NumPy por trás das visões.
+    """
+    vistos = set()
+    pilha = [obj]
+    total = 0
+    while pilha:
+        o = pilha.pop()
+        if id(o) in vistos or isinstance(o, COMPARTILHADOS):
+            continue
+        vistos.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, pygame.Surface):
+            total += o.get_pitch() * o.get_height()
+        elif np is not None and isinstance(o, np.ndarray) and o.base is not None:
+            pilha.append(o.base)
+        pilha.extend(gc.get_referents(o))
+    return total
+
+
+def instantaneo(jogo):
+    """Estado visível do jogo, nos campos do protocolo (tiles como lista de códigos)."""
+    grade = jogo.grid
+    if isinstance(grade, GradeVetorizada):
+        tiles = (grade.estado.astype(np.int16) * 2 + grade.erva).ravel().tolist()
+    else:
+        tiles = [CODIGOS[tile.estado] * 2 + tile.tem_erva_daninha for linha in grade for tile in linha]
+    if jogo.pragas_vetorizadas:
+        pragas = sorted([x, y] for x, y, _, _ in jogo.pragas.registros())
+    else:
+        pragas = sorted([p.grid_x, p.grid_y] for p in jogo.pragas)
+    j = jogo.jardineiro
+    return {
+        "tick": jogo.tick,
+        "largura": jogo.largura,
+        "altura": jogo.altura,
+        "beleza": round(jogo.medidor_beleza, 1),
+        "energia": int(j.energia_temporal),
+        "pontuacao": jogo.pontuacao,
+        "game_over": jogo.game_over,
+        "jardineiro": list(j.rect.topleft),
+        "pragas": pragas,
+        "tiles": tiles,
+    }
+
+
+def diferenca(anterior, atual):
+    """Campos de `atual` que mudaram desde `anterior`; None se só o tick mudou."""
+    saida = {}
+    for campo, valor in atual.items():
+        if campo == "tiles":
+            mudaram = [[i, c] for i, (a, c) in enumerate(zip(anterior["tiles"], valor)) if a != c]
+            if mudaram:
+                saida["tiles"] = mudaram
+        elif campo != "tick" and anterior[campo] != valor:
+            saida[campo] = valor
+    if not saida:
+        return None
+    saida["tick"] = atual["tick"]
+    return saida
+
+
+def _linha(mensagem):
+    return (json.dumps(mensagem, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+
+
+class Sessao:
+    """Um jardim do servidor: o Jogo, a fila de comandos e os clientes que o acompanham."""
+    def __init__(self, nome, semente, opcoes_jogo):
+        self.nome = nome
+        self.mensagens = [] # Avisos do Jogo desde o último envio
+        self.jogo = jardim.Jogo(semente=semente, avisar=self.mensagens.append, **opcoes_jogo)
+        self.jogo.jardineiro.comando = (0, 0) # Parado até um cliente mandar mover
+        self.comandos = asyncio.Queue(maxsize=64) # Cheia, o leitor do cliente espera
+        self.clientes = set() # StreamWriters
+        self.estado = None # Último estado enviado, base das diferenças
+        self.ultima_atividade = float("-inf")
+        self.dormiu_em = None # Tick global em que dormiu (None = ativa)
+        self.devidos = 0 # Ticks a recuperar depois de acordar
+
+    def aplicar(self, comando):
+        jogo = self.jogo
+        if "mover" in comando:
+            jogo.jardineiro.comando = tuple(comando["mover"])
+        acao = comando.get("acao")
+        if acao == "reiniciar":
+            if jogo.game_over:
+                jogo.reiniciar()
+                jogo.jardineiro.comando = (0, 0)
+        elif acao is not None:
+            jogo.executar(acao)
+
+    def recuperar(self, ticks):
+        """Avança `ticks` dos ticks devidos, sem comandos nem envio."""
+        jogo = self.jogo
+        for _ in range(ticks):
+            jogo.atualizar()
+        self.devidos -= ticks
+        self.mensagens.clear() # Avisos do tempo em que ninguém olhava
+
+    def avancar(self):
+        """Um tick do agendador: aplica os comandos e avança o jogo."""
+        jogo = self.jogo
+        while not self.comandos.empty():
+            self.aplicar(self.comandos.get_nowait())
+        jogo.atualizar()
+        if self.clientes:
+            self.enviar_diferenca()
+        else:
+            self.mensagens.clear()
+
+    def enviar_diferenca(self):
+        atual = instantaneo(self.jogo)
+        mensagem = diferenca(self.estado, atual) if self.estado else atual
+        self.estado = atual
+        if self.mensagens:
+            mensagem = mensagem or {"tick": atual["tick"]}
+            mensagem["mensagens"] = self.mensagens[:]
+            self.mensagens.clear()
+        if mensagem:
+            self.transmitir(_linha(mensagem))
+
+    def transmitir(self, dados):
+        for escritor in list(self.clientes):
+            if escritor.transport.get_write_buffer_size() > LIMITE_BUFFER:
+                self.clientes.discard(escritor) # Cliente lento demais: perde a conexão
+                escritor.close()
+            else:
+                escritor.write(dados)
+
+    def memoria(self):
+        """Bytes desta sessão: o Jogo, a base das diferenças e os avisos pendentes."""
+        return tamanho_profundo((self.jogo, self.estado, self.mensagens))
+
+
+class Servidor:
+    """As sessões e o agendador que as avança, todas no mesmo relógio."""
+    def __init__(self, opcoes_jogo, tps=jardim.TICKS_POR_SEGUNDO, ociosa_apos=5.0, lote=240, semente=0):
+        """
+        opcoes_jogo: argumentos de Jogo para cada sessão (grade, tamanho, pragas).
+        ociosa_apos: segundos sem clientes nem comandos até a sessão dormir.
+        lote: máximo de ticks devidos recuperados por tick do agendador, somando
+        todas as sessões que acordaram.
+        """
+        self.opcoes_jogo = opcoes_jogo
+        self.tps = tps
+        self.ociosa_apos = ociosa_apos
+        self.lote = lote
+        self.semente = semente
+        self.sessoes = {}
+        self.ativas = {} # nome -> Sessao avançada a cada tick; as outras dormem
+        self.tick = 0
+        self.segundos_ticks = 0.0 # Tempo gasto nos ticks desde o último relatório
+        self.ticks_medidos = 0
+
+    def sessao(self, nome):
+        """A sessão `nome`, criada (dormindo) se ainda não existe."""
+        sessao = self.sessoes.get(nome)
+        if sessao is None:
+            sessao = self.sessoes[nome] = Sessao(nome, f"{self.semente}:{nome}", self.opcoes_jogo)
+            sessao.dormiu_em = self.tick
+        return sessao
+
+    def acordar(self, sessao):
+        sessao.ultima_atividade = time.monotonic()
+        if sessao.dormiu_em is not None:
+            sessao.devidos += self.tick - sessao.dormiu_em
+            sessao.dormiu_em = None
+            self.ativas[sessao.nome] = sessao
+
+    def avancar(self):
+        """Um tick do agendador em todas as sessões ativas; as ociosas vão dormir."""
+        self.tick += 1
+        agora = time.monotonic()
+        dormir = []
+        restante = self.lote # Ticks devidos que ainda cabem neste tick
+        for nome, sessao in self.ativas.items():
+            if sessao.devidos:
+                n = min(sessao.devidos, restante)
+                sessao.recuperar(n)
+                restante -= n
+                if sessao.devidos:
+                    sessao.devidos += 1 # Este tick também fica para depois
+                    continue
+            elif (not sessao.clientes and sessao.comandos.empty()
+                    and agora - sessao.ultima_atividade > self.ociosa_apos):
+                dormir.append(nome)
+                continue
+            sessao.avancar()
+        for nome in dormir:
+            sessao = self.ativas.pop(nome)
+            sessao.dormiu_em = self.tick
+            sessao.estado = None
+
+    async def agendar(self):
+        """Loop do agendador: passo fixo de 1/tps, descartando o atraso que não der para recuperar."""
+        passo = 1 / self.tps
+        proximo = time.monotonic()
+        while True:
+            inicio = time.perf_counter()
+            self.avancar()
+            self.segundos_ticks += time.perf_counter() - inicio
+            self.ticks_medidos += 1
+            proximo += passo
+            espera = proximo - time.monotonic()
+            if espera < -jardim.MAX_SUBPASSOS * passo:
+                proximo = time.monotonic()
+            await asyncio.sleep(max(0.0, espera))
+
+    def relatorio_memoria(self, amostra=200):
+        """Memória por sessão, medida numa amostra de até `amostra` sessões."""
+        sessoes = list(self.sessoes.values())
+        passo = max(1, len(sessoes) // amostra)
+        medidas = [s.memoria() for s in sessoes[::passo]]
+        relatorio = {"sessoes": len(sessoes), "ativas": len(self.ativas)}
+        if medidas:
+            media = sum(medidas) / len(medidas)
+            relatorio.update(bytes_por_sessao=round(media), bytes_max=max(medidas),
+                             total_estimado=round(media * len(sessoes)))
+        residente = _memoria_residente()
+        if residente is not None:
+            relatorio["rss"] = residente
+        return relatorio
+
+    def relatorio(self):
+        """Uma linha com sessões, custo do tick e memória, para o log periódico."""
+        ms = 1e3 * self.segundos_ticks / max(1, self.ticks_medidos)
+        self.segundos_ticks = 0.0
+        self.ticks_medidos = 0
+        memoria = self.relatorio_memoria(amostra=50)
+        linha = (f"tick {self.tick}: {memoria['sessoes']} sessões ({memoria['ativas']} ativas), "
+                 f"{ms:.3f} ms/tick")
+        if "bytes_por_sessao" in memoria:
+            linha += f", {memoria['bytes_por_sessao'] / 1024:.1f} KiB/sessão"
+        if "rss" in memoria:
+            linha += f", RSS {memoria['rss'] / 2 ** 20:.0f} MiB"
+        return linha
+
+    async def atender(self, leitor, escritor):
+        """Conversa com um cliente: entrada numa sessão e comandos, uma linha JSON cada."""
+        sessao = None
+        try:
+            async for linha in leitor:
+                try:
+                    mensagem = json.loads(linha)
+                    if not isinstance(mensagem, dict):
+                        raise ValueError
+                except ValueError:
+                    escritor.write(_linha({"erro": "esperava um objeto JSON por linha"}))
+                    continue
+                if "sessao" in mensagem:
+                    if sessao is not None:
+                        sessao.clientes.discard(escritor)
+                    sessao = self.sessao(str(mensagem["sessao"]))
+                    self.acordar(sessao)
+                    if sessao.devidos:
+                        sessao.estado = None # O estado completo vai a todos quando ela se recuperar
+                    else:
+                        if not sessao.clientes:
+                            sessao.estado = instantaneo(sessao.jogo) # Sem clientes a base ficou para trás
+                        escritor.write(_linha(sessao.estado)) # Base completa; as diferenças seguem dela
+                    sessao.clientes.add(escritor)
+                elif mensagem.get("memoria"):
+                    escritor.write(_linha(self.relatorio_memoria()))
+                elif sessao is None:
+                    escritor.write(_linha({"erro": "entre numa sessão antes: {\"sessao\": \"nome\"}"}))
+                else:
+                    erro = _validar(mensagem)
+                    if erro:
+                        escritor.write(_linha({"erro": erro}))
+                        continue
+                    self.acordar(sessao)
+                    await sessao.comandos.put(mensagem)
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            if sessao is not None:
+                sessao.clientes.discard(escritor)
+                sessao.ultima_atividade = time.monotonic()
+            escritor.close()
+
+
+def _validar(comando):
+    """Mensagem de erro para um comando inválido, ou None."""
+    if "mover" in comando:
+        mover = comando["mover"]
+        if not (isinstance(mover, list) and len(mover) == 2 and all(v in (-1, 0, 1) for v in mover)):
+            return "mover espera [dx, dy] com -1, 0 ou 1"
+    acao = comando.get("acao")
+    if acao is not None and acao not in ACOES + ("reiniciar",):
+        return f"ação desconhecida: {acao!r}"
+    if "mover" not in comando and acao is None:
+        return "comando desconhecido"
+    return None
+
+
+def _memoria_residente():
+    """Memória residente do processo em bytes (Linux), ou None."""
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+async def servir(args):
+    opcoes_jogo = {"tipo_grade": args.grade, "largura": args.largura, "altura": args.altura,
+                   "pragas_vetorizadas": args.grade in ("vetorizada", "blocos")}
+    servidor = Servidor(opcoes_jogo, ociosa_apos=args.ociosa_apos, lote=args.lote, semente=args.semente)
+    inicio = time.perf_counter()
+    for k in range(args.sessoes):
+        servidor.sessao(f"jardim-{k}")
+    if args.sessoes:
+        print(f"{args.sessoes} jardins criados em {time.perf_counter() - inicio:.2f} s")
+    tcp = await asyncio.start_server(servidor.atender, args.host, args.porta)
+    print(f"Servindo em {args.host}:{args.porta}")
+    agendador = asyncio.create_task(servidor.agendar())
+    async with tcp:
+        while True:
+            await asyncio.sleep(args.relatorio)
+            if agendador.done():
+                agendador.result() # Propaga o erro do agendador
+            print(servidor.relatorio(), flush=True)
+
+
+def main():
+    grade_padrao = "vetorizada" if np is not None else "agendada"
+    parser = argparse.ArgumentParser(description="Servidor de sessões de O Jardineiro do Tempo")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--sessoes", type=int, default=0, metavar="N",
+                        help="Cria N jardins (jardim-0 ... jardim-N-1) ao iniciar, dormindo")
+    parser.add_argument("--grade", choices=["objetos", "vetorizada", "blocos", "agendada"], default=grade_padrao,
+                        help=f"Armazenamento da grade de cada jardim (padrão: {grade_padrao}; "
+                             "com vetorizada ou blocos as pragas também ficam em arrays)")
+    parser.add_argument("--largura", type=int, default=jardim.GRID_LARGURA)
+    parser.add_argument("--altura", type=int, default=jardim.GRID_ALTURA)
+    parser.add_argument("--ociosa-apos", type=float, default=5.0, metavar="SEG",
+                        help="Segundos sem clientes nem comandos até um jardim dormir (padrão: 5)")
+    parser.add_argument("--lote", type=int, default=240,
+                        help="Ticks devidos recuperados por tick, somando os jardins que acordaram (padrão: 240)")
+    parser.add_argument("--semente", type=int, default=0, help="Semente base dos jardins")
+    parser.add_argument("--relatorio", type=float, default=10.0, metavar="SEG",
+                        help="Intervalo do relatório de sessões e memória (padrão: 10)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
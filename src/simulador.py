@@ -0,0 +1,350 @@
+"""
+Simulador sem janela de O Jardineiro do Tempo, para varreduras de balanceamento.
+
+Roda Jogo.atualizar por N ticks com o jardineiro guiado por um bot (ou por um
+roteiro de comandos) em vez do teclado, para cada combinação dos parâmetros
+pedidos e várias sementes. As simulações são distribuídas entre os núcleos
+com multiprocessing, e cada resultado (tick do game over, pontuação, curva
+da beleza) é escrito em CSV ou JSONL assim que fica pronto.
+
+Uso:
+    python src/simulador.py --politica jardineiro,parado --limite-praga 250,500,1000 \\
+        --sementes 8 --ticks 36000 --saida resultados.csv
+"""
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+# Importar o main não abre janela; se algo pedir vídeo ou som, ficam nos drivers falsos
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+# Sem isto o SDL transforma SIGTERM em evento de QUIT e Pool.terminate não encerra os processos
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+import main as jardim
+
+# Parâmetros de balanceamento que podem ser varridos: atributo do Jogo -> tipo
+PARAMETROS = {
+    "limite_praga": int,
+    "limite_erva_daninha": int,
+    "custo_temporal": float,
+    "perda_beleza_ruim": float,
+    "ganho_beleza_maduro": float,
+    "perda_beleza_praga": float,
+    "ganho_beleza_colheita": float,
+}
+ACOES = ("interagir", "acelerar", "reverter")
+
+
+def _sinal(v):
+    return (v > 0) - (v < 0)
+
+
+class PoliticaParada:
+    """Não faz nada: mede quanto tempo o jardim dura sozinho."""
+    def __call__(self, jogo):
+        return (0, 0), ()
+
+
+class PoliticaAleatoria:
+    """Anda em direções sorteadas e interage de vez em quando."""
+    def __init__(self, semente):
+        self.rng = random.Random(semente)
+        self.direcao = (0, 0)
+
+    def __call__(self, jogo):
+        if jogo.tick % 30 == 0:
+            self.direcao = (self.rng.randint(-1, 1), self.rng.randint(-1, 1))
+        return self.direcao, ("interagir",) if self.rng.random() < 0.05 else ()
+
+
+class PoliticaJardineiro:
+    """
+    Bot guloso: vai até a célula com trabalho mais urgente (colher, depois
+    tirar erva daninha, depois plantar), desempatando pela mais próxima, e
+    age quando chega. Com acelerar=True também usa a ferramenta temporal
+    nas plantas em crescimento quando a energia está cheia.
+    """
+    def __init__(self, acelerar=False):
+        self.acelerar = acelerar
+        self.alvo = None
+
+    def _prioridade(self, tile):
+        if tile.estado == "maduro":
+            return 0
+        if tile.tem_erva_daninha:
+            return 1
+        if tile.estado == "vazio":
+            return 2
+        return None
+
+    def _escolher(self, jogo, gx, gy):
+        # Só as células visíveis: o jardineiro não sai da tela
+        melhor = None
+        for y in range(min(jogo.altura, jardim.GRID_ALTURA)):
+            linha = jogo.grid[y]
+            for x in range(min(jogo.largura, jardim.GRID_LARGURA)):
+                prioridade = self._prioridade(linha[x])
+                if prioridade is not None:
+                    chave = (prioridade, abs(x - gx) + abs(y - gy))
+                    if melhor is None or chave < melhor[0]:
+                        melhor = (chave, (x, y))
+        return melhor and melhor[1]
+
+    def __call__(self, jogo):
+        j = jogo.jardineiro
+        gx, gy = j.get_grid_pos()
+        tile = jogo.grid[gy][gx] if jardim.na_grade(jogo.grid, gx, gy) else None
+        if tile is not None and self._prioridade(tile) is not None:
+            self.alvo = None
+            return (0, 0), ("interagir",)
+        if (self.acelerar and tile is not None and tile.estado in ("semente", "crescendo")
+                and j.energia_temporal >= j.max_energia):
+            return (0, 0), ("acelerar",)
+        if self.alvo is None or self._prioridade(jogo.grid[self.alvo[1]][self.alvo[0]]) is None:
+            self.alvo = self._escolher(jogo, gx, gy)
+            if self.alvo is None:
+                return (0, 0), ()
+        return (_sinal(self.alvo[0] - gx), _sinal(self.alvo[1] - gy)), ()
+
+
+class PoliticaRoteiro:
+    """
+    Segue um roteiro de comandos por tick: "mover DX DY" (mantido até o
+    próximo), "parar" e as ações "interagir", "acelerar" e "reverter".
+    """
+    def __init__(self, comandos):
+        self.comandos = {}
+        for tick, comando, argumentos in comandos:
+            self.comandos.setdefault(tick, []).append((comando, argumentos))
+        self.direcao = (0, 0)
+
+    def __call__(self, jogo):
+        acoes = []
+        for comando, argumentos in self.comandos.get(jogo.tick, ()):
+            if comando == "mover":
+                self.direcao = argumentos
+            elif comando == "parar":
+                self.direcao = (0, 0)
+            else:
+                acoes.append(comando)
+        return self.direcao, acoes
+
+
+POLITICAS = {
+    "parado": lambda semente: PoliticaParada(),
+    "aleatorio": PoliticaAleatoria,
+    "jardineiro": lambda semente: PoliticaJardineiro(),
+    "acelerador": lambda semente: PoliticaJardineiro(acelerar=True),
+}
+
+
+def ler_roteiro(caminho):
+    """
+    Lê um roteiro: uma linha "TICK COMANDO [DX DY]" por comando, com # para
+    comentários. Retorna [(tick, comando, argumentos)].
+    """
+    comandos = []
+    with open(caminho, encoding="utf-8") as arquivo:
+        for numero, linha in enumerate(arquivo, 1):
+            partes = linha.split("#", 1)[0].split()
+            if not partes:
+                continue
+            try:
+                tick = int(partes[0])
+                comando = partes[1]
+                if comando == "mover":
+                    dx, dy = (int(v) for v in partes[2:])
+                    argumentos = (_sinal(dx), _sinal(dy))
+                elif comando == "parar" or comando in ACOES:
+                    if len(partes) != 2:
+                        raise ValueError
+                    argumentos = ()
+                else:
+                    raise ValueError
+            except (ValueError, IndexError):
+                raise ValueError(f"{caminho}:{numero}: comando inválido: {linha.strip()!r}") from None
+            comandos.append((tick, comando, argumentos))
+    return comandos
+
+
+def _calar(mensagem):
+    """As mensagens do jogo ("Plantio!", "Nova Praga apareceu!") não interessam aqui."""
+
+
+def simular(tarefa):
+    """
+    Uma partida sem janela. `tarefa` é um dicionário com politica, semente,
+    ticks, amostra (ticks entre pontos da curva de beleza), grade, largura,
+    altura, pragas_vetorizadas, roteiro e os PARAMETROS a mudar no Jogo.
+    Retorna o dicionário do resultado.
+    """
+    parametros = {nome: tarefa[nome] for nome in PARAMETROS if tarefa.get(nome) is not None}
+    extras = {}
+    if "limite_erva_daninha" in parametros:
+        extras["limite_erva_daninha"] = parametros["limite_erva_daninha"]
+    jogo = jardim.Jogo(tarefa["grade"], tarefa["largura"], tarefa["altura"],
+                       pragas_vetorizadas=tarefa["pragas_vetorizadas"], semente=tarefa["semente"],
+                       avisar=_calar, **extras)
+    for nome, valor in parametros.items():
+        setattr(jogo, nome, valor)
+    if tarefa["politica"] == "roteiro":
+        politica = PoliticaRoteiro(tarefa["roteiro"])
+    else:
+        politica = POLITICAS[tarefa["politica"]](tarefa["semente"])
+
+    amostra = tarefa["amostra"]
+    curva = []
+    beleza_min = jogo.medidor_beleza
+    inicio = time.perf_counter()
+    while jogo.tick < tarefa["ticks"] and not jogo.game_over:
+        if jogo.tick % amostra == 0:
+            curva.append(round(jogo.medidor_beleza, 3))
+        direcao, acoes = politica(jogo)
+        jogo.jardineiro.comando = direcao
+        for acao in acoes:
+            jogo.executar(acao)
+        jogo.atualizar()
+        beleza_min = min(beleza_min, jogo.medidor_beleza)
+    segundos = time.perf_counter() - inicio
+    curva.append(round(jogo.medidor_beleza, 3))
+
+    resultado = {"politica": tarefa["politica"], "semente": tarefa["semente"]}
+    resultado.update((nome, tarefa.get(nome)) for nome in PARAMETROS)
+    resultado.update(
+        ticks=jogo.tick,
+        game_over=jogo.game_over,
+        tick_game_over=jogo.tick if jogo.game_over else None,
+        pontuacao=jogo.pontuacao,
+        beleza_final=round(jogo.medidor_beleza, 3),
+        beleza_min=round(beleza_min, 3),
+        pragas=len(jogo.pragas),
+        segundos=round(segundos, 3),
+        curva_beleza=curva,
+    )
+    return resultado
+
+
+def tarefas(args):
+    """Todas as combinações de política, parâmetros e semente pedidas na linha de comando."""
+    nomes = list(PARAMETROS)
+    valores = [getattr(args, nome) or [None] for nome in nomes]
+    for politica, combinacao, semente in itertools.product(
+            args.politica, itertools.product(*valores), range(args.semente_inicial, args.semente_inicial + args.sementes)):
+        tarefa = dict(zip(nomes, combinacao))
+        tarefa.update(politica=politica, semente=semente, ticks=args.ticks, amostra=args.amostra,
+                      grade=args.grade, largura=args.largura, altura=args.altura,
+                      pragas_vetorizadas=args.pragas_vetorizadas, roteiro=args.roteiro)
+        yield tarefa
+
+
+def resultados(lista, processos):
+    """Os resultados de `lista`, na ordem em que ficam prontos."""
+    if processos <= 1:
+        yield from map(simular, lista)
+        return
+    with multiprocessing.Pool(min(processos, len(lista))) as pool:
+        yield from pool.imap_unordered(simular, lista)
+
+
+class SaidaCSV:
+    """Uma linha por resultado; a curva de beleza vai numa coluna, com os valores separados por espaço."""
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+        self.escritor = None
+
+    def escrever(self, resultado):
+        linha = dict(resultado, curva_beleza=" ".join(map(str, resultado["curva_beleza"])))
+        if self.escritor is None:
+            self.escritor = csv.DictWriter(self.arquivo, fieldnames=list(linha))
+            self.escritor.writeheader()
+        self.escritor.writerow(linha)
+        self.arquivo.flush()
+
+
+class SaidaJSONL:
+    """Um objeto JSON por linha."""
+    def __init__(self, arquivo):
+        self.arquivo = arquivo
+
+    def escrever(self, resultado):
+        self.arquivo.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+        self.arquivo.flush()
+
+
+def _lista(tipo):
+    """Tipo do argparse para listas separadas por vírgula ("250,500,1000")."""
+    def converter(texto):
+        return [tipo(valor) for valor in texto.split(",")]
+    return converter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=f"Simulador sem janela de {jardim.TITULO}")
+    parser.add_argument("--politica", type=_lista(str), default=["jardineiro"],
+                        help=f"Políticas do jardineiro, separadas por vírgula: {', '.join(POLITICAS)} "
+                             "ou roteiro (padrão: jardineiro)")
+    parser.add_argument("--roteiro", metavar="ARQ", help="Roteiro de comandos para a política roteiro")
+    parser.add_argument("--ticks", type=int, default=36000,
+                        help="Ticks por partida, se não houver game over antes (padrão: 36000 = 10 min)")
+    parser.add_argument("--sementes", type=int, default=4, help="Partidas por combinação de parâmetros (padrão: 4)")
+    parser.add_argument("--semente-inicial", type=int, default=0)
+    parser.add_argument("--amostra", type=int, default=60,
+                        help="Ticks entre os pontos da curva de beleza (padrão: 60)")
+    parser.add_argument("--grade", choices=["objetos", "vetorizada", "blocos", "agendada"], default="objetos")
+    parser.add_argument("--largura", type=int, default=jardim.GRID_LARGURA)
+    parser.add_argument("--altura", type=int, default=jardim.GRID_ALTURA)
+    parser.add_argument("--pragas-vetorizadas", action="store_true")
+    for nome, tipo in PARAMETROS.items():
+        parser.add_argument("--" + nome.replace("_", "-"), type=_lista(tipo), metavar="V1,V2,...",
+                            help="Valores a varrer (padrão: o do jogo)")
+    parser.add_argument("--processos", type=int, default=os.cpu_count(),
+                        help="Processos simulando em paralelo (padrão: um por núcleo)")
+    parser.add_argument("--saida", default="-", help="Arquivo de resultados, .csv ou .jsonl (padrão: JSONL na saída)")
+    parser.add_argument("--formato", choices=["csv", "jsonl"],
+                        help="Formato da saída (padrão: pela extensão de --saida)")
+    args = parser.parse_args()
+
+    for politica in args.politica:
+        if politica not in POLITICAS and politica != "roteiro":
+            parser.error(f"política desconhecida: {politica}")
+    if "roteiro" in args.politica:
+        if not args.roteiro:
+            parser.error("a política roteiro precisa de --roteiro")
+        try:
+            args.roteiro = ler_roteiro(args.roteiro)
+        except (OSError, ValueError) as erro:
+            parser.error(str(erro))
+    if args.sementes < 1 or args.ticks < 1 or args.amostra < 1:
+        parser.error("--sementes, --ticks e --amostra precisam ser positivos")
+    if args.pragas_vetorizadas and args.grade not in ("vetorizada", "blocos"):
+        parser.error("--pragas-vetorizadas precisa de --grade vetorizada ou blocos")
+    formato = args.formato or ("csv" if args.saida.endswith(".csv") else "jsonl")
+
+    lista = list(tarefas(args))
+    arquivo = sys.stdout if args.saida == "-" else open(args.saida, "w", newline="", encoding="utf-8")
+    saida = SaidaCSV(arquivo) if formato == "csv" else SaidaJSONL(arquivo)
+    inicio = time.perf_counter()
+    ticks = 0
+    try:
+        for feitos, resultado in enumerate(resultados(lista, args.processos), 1):
+            saida.escrever(resultado)
+            ticks += resultado["ticks"]
+            print(f"\r{feitos}/{len(lista)} partidas", end="", file=sys.stderr, flush=True)
+    finally:
+        if arquivo is not sys.stdout:
+            arquivo.close()
+    segundos = time.perf_counter() - inicio
+    print(f"\r{len(lista)} partidas, {ticks} ticks em {segundos:.1f} s ({ticks / max(segundos, 1e-9):,.0f} ticks/s)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Inicialização preguiçosa do pygame, comum aos dois jogos.
+
+Importar um jogo não abre janela nem carrega fontes: em vez de
+pygame.init(), cada subsistema que os jogos usam (vídeo e fontes) é iniciado
+na primeira vez que é pedido; os jogos não têm som, então o mixer nunca é
+iniciado. As fontes podem ser carregadas numa thread enquanto o primeiro
+quadro é desenhado (o SysFont chega a esperar a lista de fontes do
+sistema). TempoPartida mede as etapas da partida a frio
+(importação, janela, fontes, primeiro quadro).
+"""
+import json
+import platform
+import threading
+import time
+
+import pygame
+
+
+def janela(tamanho, titulo):
+    """A superfície da janela; o vídeo é iniciado e a janela aberta na primeira chamada."""
+    superficie = pygame.display.get_surface() if pygame.display.get_init() else None
+    if superficie is None or superficie.get_size() != tuple(tamanho):
+        pygame.display.init()
+        superficie = pygame.display.set_mode(tamanho)
+        pygame.display.set_caption(titulo)
+    return superficie
+
+
+class Fontes:
+    """
+    Fontes do jogo, abertas sob demanda ou numa thread (carregar_ao_fundo).
+    Enquanto a thread não termina, pronta() devolve None (quem desenha pula
+    o texto) e obter() espera por ela; as fontes só são entregues depois que
+    todas foram abertas, então a thread nunca usa o FreeType junto com o
+    desenho. Se a abertura falhar, pronta() e obter() levantam o erro dela.
+    """
+    def __init__(self, especificacoes):
+        """
+        especificacoes: {nome: (fonte do sistema ou None, tamanho)}; None é a
+        fonte padrão do pygame, com SysFont como alternativa se ela falhar.
+        """
+        self.especificacoes = especificacoes
+        self.fontes = {}
+        self._pronto = threading.Event()
+        self._thread = None
+        self._erro = None # Exceção da abertura das fontes, levantada a quem pedir uma
+
+    def _abrir(self, sistema, tamanho):
+        if sistema is not None:
+            return pygame.font.SysFont(sistema, tamanho)
+        try:
+            return pygame.font.Font(None, tamanho)
+        except pygame.error:
+            print("Aviso: Não foi possível carregar a fonte padrão. Usando fallback.")
+            return pygame.font.SysFont(None, tamanho)
+
+    def _carregar(self, ao_terminar=None):
+        try:
+            self.fontes = {nome: self._abrir(*especificacao) for nome, especificacao in self.especificacoes.items()}
+        except Exception as erro:
+            self._erro = erro
+        finally:
+            self._pronto.set() # Mesmo com erro: ninguém fica esperando para sempre
+        if ao_terminar and self._erro is None:
+            ao_terminar()
+
+    def _entregar(self, nome):
+        if self._erro is not None:
+            raise RuntimeError("não foi possível abrir as fontes do jogo") from self._erro
+        return self.fontes[nome]
+
+    def carregar_ao_fundo(self, ao_terminar=None):
+        """Abre as fontes numa thread; ao_terminar() é chamado nela quando acabar."""
+        if self._thread is None and not self._pronto.is_set():
+            pygame.font.init() # Na thread principal; só a abertura das fontes vai para a outra
+            self._thread = threading.Thread(target=self._carregar, args=(ao_terminar,), daemon=True)
+            self._thread.start()
+
+    def pronta(self, nome):
+        """A fonte `nome`, ou None se ainda estiver sendo carregada."""
+        if not self._pronto.is_set():
+            if self._thread is not None:
+                return None
+            self.obter(nome) # Sem carga ao fundo: abre agora
+        return self._entregar(nome)
+
+    def obter(self, nome):
+        """A fonte `nome`, esperando a thread ou abrindo as fontes agora se preciso."""
+        if not self._pronto.is_set():
+            if self._thread is None:
+                pygame.font.init()
+                self._carregar()
+            else:
+                self._pronto.wait()
+        return self._entregar(nome)
+
+
+class TempoPartida:
+    """
+    Etapas da partida a frio, em segundos desde `inicio` (perf_counter no
+    começo do main); concluir() mostra o relatório e, com `arquivo`,
+    acrescenta o resultado nele em JSONL para acompanhar a latência.
+    """
+    def __init__(self, inicio, jogo, arquivo=None):
+        self.inicio = inicio
+        self.jogo = jogo
+        self.arquivo = arquivo
+        self.etapas = [] # (etapa, segundos desde o início); a thread das fontes também marca
+
+    def marcar(self, etapa):
+        self.etapas.append((etapa, time.perf_counter() - self.inicio))
+
+    def relatorio(self):
+        etapas = sorted(self.etapas, key=lambda e: e[1])
+        linhas = [f"Partida a frio de {self.jogo}: {etapas[-1][1] * 1e3:.1f} ms até {etapas[-1][0]}"]
+        anterior = 0.0
+        for etapa, t in etapas:
+            linhas.append(f"  {etapa:<16} {(t - anterior) * 1e3:8.1f} ms   (acumulado {t * 1e3:8.1f} ms)")
+            anterior = t
+        return "\n".join(linhas)
+
+    def concluir(self):
+        print(self.relatorio())
+        if self.arquivo:
+            registro = {
+                "jogo": self.jogo,
+                "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "maquina": platform.node(),
+                "python": platform.python_version(),
+                "pygame": pygame.version.ver,
+                "etapas_ms": {etapa: round(t * 1e3, 2) for etapa, t in sorted(self.etapas, key=lambda e: e[1])},
+            }
+            with open(self.arquivo, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
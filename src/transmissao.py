@@ -0,0 +1,377 @@
+"""
+Transmissão do jardim para espectadores, em diferenças binárias.
+
+O Emissor guarda o último estado enviado de cada célula (código do estado
+com a erva daninha e raio do círculo da planta, o "estágio" que aparece na
+tela) e das pragas (quantas em cada célula), e a cada quadro produz só o que
+mudou: o tamanho do quadro cresce com o número de mudanças, não com o da
+grade. Só uma célula plantada ou com erva daninha tem código ou raio
+diferente de zero, então a cada quadro só são olhadas as que estão ou
+estavam assim, que as grades já conhecem (ocupados, blocos ativos). Um
+espectador que chega recebe antes um quadro completo.
+
+Quadro: CABECALHO (tipo, tick, bytes do corpo) e o corpo, little-endian.
+    COMPLETO: DIMENSOES, PAINEL, um byte de código por célula, um byte de
+        raio por célula (em ordem de linha), o número de pragas (uint32) e a
+        célula de cada uma (uint32, índice y * largura + x).
+    DIFERENCA: o PAINEL, se o tipo tiver COM_PAINEL; CONTAGENS; uma entrada
+        TILE por célula alterada; as células de onde saíram pragas e as
+        células onde entraram (uint32 cada, uma vez por praga).
+Código de uma célula: estado (CODIGOS) | erva daninha << 3.
+
+O Transmissor leva os quadros a um socket (TCP ou unix, com vários
+espectadores) ou a um caminho (arquivo ou pipe nomeado), sem nunca travar o
+jogo: o que o destino não aceita fica num buffer, e quem deixa o buffer
+passar de LIMITE_BUFFER é desligado. O Espelho refaz o estado do lado do
+espectador (src/espectador.py).
+"""
+import os
+import socket
+import struct
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError: # Sem NumPy as diferenças são calculadas célula a célula
+    np = None
+
+from grade_vetorizada import CODIGOS, VAZIO, GradeVetorizada
+
+COMPLETO = 1
+DIFERENCA = 2
+COM_PAINEL = 0x80 # Bit do tipo: a diferença traz o painel
+
+CABECALHO = struct.Struct("<BII") # Tipo, tick e bytes do corpo
+DIMENSOES = struct.Struct("<II") # Largura e altura
+# Beleza e beleza máxima (décimos), energia e energia máxima, pontuação,
+# game over e canto superior esquerdo do jardineiro
+PAINEL = struct.Struct("<hhHHiBhh")
+CONTAGENS = struct.Struct("<III") # Tiles alterados, pragas que saíram e que entraram
+TILE = struct.Struct("<IBB") # Índice da célula, código e raio
+ERVA = 8 # Bit da erva daninha no código
+RAIO_MAX = 255
+LIMITE_BUFFER = 1 << 20 # Bytes pendentes para um destino antes de desligá-lo
+
+if np is not None:
+    TIPO_TILE = np.dtype([("indice", "<u4"), ("codigo", "u1"), ("raio", "u1")])
+
+
+def ler_quadro(arquivo):
+    """(tipo, tick, corpo) do próximo quadro de um arquivo binário; None no fim da transmissão."""
+    cabecalho = arquivo.read(CABECALHO.size)
+    if len(cabecalho) < CABECALHO.size:
+        return None
+    tipo, tick, tamanho = CABECALHO.unpack(cabecalho)
+    corpo = arquivo.read(tamanho)
+    if len(corpo) < tamanho:
+        return None
+    return tipo, tick, corpo
+
+
+def _quadro(tipo, tick, partes):
+    corpo = b"".join(partes)
+    return CABECALHO.pack(tipo, tick & 0xFFFFFFFF, len(corpo)) + corpo
+
+
+def _uint32(valores):
+    if np is not None:
+        return np.asarray(valores, dtype="<u4").tobytes()
+    return struct.pack(f"<{len(valores)}I", *valores)
+
+
+class Emissor:
+    """Último estado transmitido do jogo e os quadros que levam o espectador até o atual."""
+    def __init__(self, tamanho_celula, passo_raio=1):
+        """
+        tamanho_celula: lado da célula na tela, que dá o raio das plantas.
+        passo_raio: resolução dos estágios de crescimento em pixels de raio
+        (como o passo do AtlasTiles); passos maiores mudam menos vezes.
+        """
+        self.tamanho_celula = tamanho_celula
+        self.passo_raio = passo_raio
+        self.dimensoes = None
+        self.painel = None
+        self.codigos = None # Um por célula, do último quadro
+        self.raios = None
+        self.ocupadas = None # Células plantadas ou com erva daninha no último quadro (índices)
+        self.pragas = Counter() # índice da célula -> pragas nela
+
+    def _arrays(self, grade, estado, tempo, erva):
+        """(códigos, raios) uint8 das células dadas pelos seus arrays de uma GradeVetorizada."""
+        raios = (self.tamanho_celula * (tempo / grade.tempo_murchar) / 2).astype(np.int32)
+        np.clip(raios, 0, RAIO_MAX, out=raios)
+        raios[estado == VAZIO] = 0
+        if self.passo_raio > 1:
+            raios -= raios % self.passo_raio
+        return estado.astype(np.uint8) | (erva.astype(np.uint8) << 3), raios.astype(np.uint8)
+
+    def _tile(self, tile):
+        """(código, raio) de um tile de objeto."""
+        raio = 0 if tile.estado == "vazio" else min(RAIO_MAX, max(0, tile.raio_planta()))
+        return CODIGOS[tile.estado] | (ERVA if tile.tem_erva_daninha else 0), raio - raio % self.passo_raio
+
+    def _planos(self, grade):
+        """(códigos, raios) de todas as células, arrays uint8 ou bytearrays."""
+        if isinstance(grade, GradeVetorizada):
+            codigos, raios = self._arrays(grade, grade.estado, grade.tempo, grade.erva)
+            return codigos.ravel(), raios.ravel()
+        codigos = bytearray()
+        raios = bytearray()
+        for linha in grade:
+            for tile in linha:
+                codigo, raio = self._tile(tile)
+                codigos.append(codigo)
+                raios.append(raio)
+        return codigos, raios
+
+    def _ocupadas(self, grade):
+        """
+        Índices das células plantadas ou com erva daninha: array numa grade
+        vetorizada, conjunto numa grade de tiles; None se a grade não sabe
+        quais são.
+        """
+        if isinstance(grade, GradeVetorizada):
+            return grade.ocupadas()
+        ocupados = getattr(grade, "ocupados", None)
+        if ocupados is None:
+            return None
+        largura = grade.largura
+        return {tile.grid_y * largura + tile.grid_x for tile in ocupados}
+
+    def _tiles(self, grade):
+        """
+        (quantidade, bytes) das entradas TILE das células que mudaram desde o
+        último quadro, que passam a ser a base. Só as células ocupadas agora
+        ou no último quadro podem ter mudado; numa grade que não sabe quais
+        são, todas são comparadas.
+        """
+        ocupadas = self._ocupadas(grade)
+        antes, self.ocupadas = self.ocupadas, ocupadas
+        if isinstance(grade, GradeVetorizada):
+            largura = grade.largura
+            # As que deixaram de ser ocupadas agora são zero
+            y, x = np.divmod(antes, largura)
+            vazias = antes[(grade.estado[y, x] == VAZIO) & ~grade.erva[y, x]]
+            y, x = np.divmod(ocupadas, largura)
+            codigos, raios = self._arrays(grade, grade.estado[y, x], grade.tempo[y, x], grade.erva[y, x])
+            muda = (codigos != self.codigos[ocupadas]) | (raios != self.raios[ocupadas])
+            mudaram = np.concatenate([ocupadas[muda], vazias])
+            ordem = np.argsort(mudaram)
+            tiles = np.empty(len(mudaram), dtype=TIPO_TILE)
+            tiles["indice"] = mudaram[ordem]
+            tiles["codigo"] = np.concatenate([codigos[muda], np.zeros(len(vazias), np.uint8)])[ordem]
+            tiles["raio"] = np.concatenate([raios[muda], np.zeros(len(vazias), np.uint8)])[ordem]
+            self.codigos[tiles["indice"]] = tiles["codigo"]
+            self.raios[tiles["indice"]] = tiles["raio"]
+            return len(tiles), tiles.tobytes()
+
+        largura = grade.largura
+        if ocupadas is None or antes is None:
+            candidatas = range(largura * grade.altura)
+        else:
+            candidatas = sorted(ocupadas | antes)
+        mudaram = []
+        for i in candidatas:
+            codigo, raio = self._tile(grade[i // largura][i % largura])
+            if codigo != self.codigos[i] or raio != self.raios[i]:
+                self.codigos[i] = codigo
+                self.raios[i] = raio
+                mudaram.append(TILE.pack(i, codigo, raio))
+        return len(mudaram), b"".join(mudaram)
+
+    def _pragas(self, jogo):
+        largura = jogo.largura
+        if jogo.pragas_vetorizadas:
+            n = jogo.pragas.n
+            indices = jogo.pragas.y[:n].astype(np.int64) * largura + jogo.pragas.x[:n]
+            return Counter(indices.tolist())
+        return Counter({y * largura + x: len(pragas) for (x, y), pragas in jogo.pragas.celulas.items()})
+
+    def _painel(self, jogo):
+        j = jogo.jardineiro
+        return PAINEL.pack(round(jogo.medidor_beleza * 10), round(jogo.max_beleza * 10), int(j.energia_temporal),
+                           int(j.max_energia), jogo.pontuacao, jogo.game_over, j.rect.x, j.rect.y)
+
+    def completo(self, tick):
+        """O quadro completo do último estado transmitido, para um espectador que chega."""
+        n = sum(self.pragas.values())
+        return _quadro(COMPLETO, tick, [DIMENSOES.pack(*self.dimensoes), self.painel, bytes(self.codigos),
+                                        bytes(self.raios), struct.pack("<I", n),
+                                        _uint32(list(self.pragas.elements()))])
+
+    def quadro(self, jogo):
+        """
+        O quadro que leva do último estado transmitido ao atual (e passa a
+        tê-lo como base); None se nada visível mudou. Quando o tamanho do
+        jardim muda, ou na primeira vez, o quadro é completo.
+        """
+        pragas = self._pragas(jogo)
+        painel = self._painel(jogo)
+        dimensoes = (jogo.largura, jogo.altura)
+        if dimensoes != self.dimensoes:
+            self.codigos, self.raios = self._planos(jogo.grid)
+            self.ocupadas = self._ocupadas(jogo.grid)
+            self.dimensoes, self.painel, self.pragas = dimensoes, painel, pragas
+            return self.completo(jogo.tick)
+
+        n_tiles, tiles = self._tiles(jogo.grid)
+        sairam = list((self.pragas - pragas).elements())
+        entraram = list((pragas - self.pragas).elements())
+        com_painel = painel != self.painel
+        if not (n_tiles or sairam or entraram or com_painel):
+            return None
+
+        self.painel, self.pragas = painel, pragas
+        partes = [painel] if com_painel else []
+        partes += [CONTAGENS.pack(n_tiles, len(sairam), len(entraram)), tiles, _uint32(sairam), _uint32(entraram)]
+        return _quadro(DIFERENCA | (COM_PAINEL if com_painel else 0), jogo.tick, partes)
+
+
+class Espelho:
+    """O estado do jardim do lado do espectador, refeito a partir dos quadros."""
+    def __init__(self):
+        self.tick = 0
+        self.largura = self.altura = 0
+        self.codigos = bytearray()
+        self.raios = bytearray()
+        self.pragas = Counter() # índice da célula -> pragas nela
+        self.painel = None # Campos do PAINEL (beleza e máximo já em unidades)
+
+    def _ler_painel(self, corpo, pos):
+        beleza, max_beleza, *resto = PAINEL.unpack_from(corpo, pos)
+        self.painel = (beleza / 10, max_beleza / 10, *resto)
+        return pos + PAINEL.size
+
+    def aplicar(self, tipo, tick, corpo):
+        """Aplica um quadro lido com ler_quadro."""
+        self.tick = tick
+        if tipo == COMPLETO:
+            self.largura, self.altura = DIMENSOES.unpack_from(corpo)
+            pos = self._ler_painel(corpo, DIMENSOES.size)
+            n = self.largura * self.altura
+            self.codigos = bytearray(corpo[pos:pos + n])
+            self.raios = bytearray(corpo[pos + n:pos + 2 * n])
+            pos += 2 * n
+            (n_pragas,) = struct.unpack_from("<I", corpo, pos)
+            self.pragas = Counter(struct.unpack_from(f"<{n_pragas}I", corpo, pos + 4))
+            return
+        if tipo & ~COM_PAINEL != DIFERENCA:
+            raise ValueError(f"tipo de quadro desconhecido: {tipo}")
+        pos = self._ler_painel(corpo, 0) if tipo & COM_PAINEL else 0
+        n_tiles, n_sairam, n_entraram = CONTAGENS.unpack_from(corpo, pos)
+        pos += CONTAGENS.size
+        fim = pos + n_tiles * TILE.size
+        for indice, codigo, raio in TILE.iter_unpack(corpo[pos:fim]):
+            self.codigos[indice] = codigo
+            self.raios[indice] = raio
+        sairam = struct.unpack_from(f"<{n_sairam}I", corpo, fim)
+        entraram = struct.unpack_from(f"<{n_entraram}I", corpo, fim + 4 * n_sairam)
+        self.pragas.subtract(sairam)
+        self.pragas.update(entraram)
+        self.pragas += Counter() # Tira as células que ficaram sem pragas
+
+    def celula(self, indice):
+        """(código do estado, erva daninha, raio) da célula."""
+        codigo = self.codigos[indice]
+        return codigo & (ERVA - 1), bool(codigo & ERVA), self.raios[indice]
+
+
+class _Destino:
+    """Um destino dos quadros com buffer próprio: escreve o que ele aceitar sem bloquear."""
+    def __init__(self, escrever, fechar, nome):
+        self.escrever = escrever # Retorna quantos bytes foram aceitos
+        self.fechar = fechar
+        self.nome = nome
+        self.pendente = bytearray()
+
+    def enviar(self, dados):
+        """Acrescenta `dados` e escreve o que der; False se o destino caiu ou ficou para trás."""
+        self.pendente += dados
+        try:
+            while self.pendente:
+                n = self.escrever(self.pendente)
+                del self.pendente[:n]
+        except BlockingIOError:
+            pass
+        except OSError:
+            return False
+        return len(self.pendente) <= LIMITE_BUFFER
+
+
+class Transmissor:
+    """
+    Manda os quadros de um Emissor a espectadores. endereco:
+    "HOST:PORTA" ou "unix:CAMINHO" escuta espectadores (vários, a qualquer
+    momento); outro texto é um caminho de arquivo ou de pipe nomeado (abrir
+    um pipe espera o leitor chegar).
+    """
+    def __init__(self, endereco, emissor):
+        self.emissor = emissor
+        self.destinos = []
+        self.escuta = None
+        self.bytes_enviados = 0
+        self.quadros = 0
+        self.envios = 0
+        if endereco.startswith("unix:"):
+            caminho = endereco[len("unix:"):]
+            if os.path.exists(caminho):
+                os.unlink(caminho)
+            self.escuta = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.escuta.bind(caminho)
+        elif ":" in endereco:
+            host, porta = endereco.rsplit(":", 1)
+            self.escuta = socket.create_server((host, int(porta)))
+        else:
+            fd = os.open(endereco, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+            os.set_blocking(fd, False)
+            self.destinos.append(_Destino(lambda dados: os.write(fd, dados), lambda: os.close(fd), endereco))
+        if self.escuta is not None:
+            self.escuta.listen()
+            self.escuta.setblocking(False)
+
+    def _aceitar(self):
+        novos = []
+        while self.escuta is not None:
+            try:
+                conexao, origem = self.escuta.accept()
+            except BlockingIOError:
+                break
+            conexao.setblocking(False)
+            novos.append(_Destino(conexao.send, conexao.close, origem or "unix"))
+        return novos
+
+    def enviar(self, jogo):
+        """Um quadro com o que mudou desde o anterior; espectadores novos recebem antes o completo."""
+        quadro = self.emissor.quadro(jogo)
+        self.envios += 1
+        if quadro:
+            self.destinos = self._enviar_a(self.destinos, quadro)
+        novos = self._aceitar()
+        if novos and self.emissor.dimensoes is not None:
+            novos = self._enviar_a(novos, self.emissor.completo(jogo.tick))
+        self.destinos += novos
+
+    def _enviar_a(self, destinos, quadro):
+        """Manda o quadro a cada destino; retorna os que continuam ligados."""
+        self.quadros += 1
+        ligados = []
+        for destino in destinos:
+            self.bytes_enviados += len(quadro)
+            if destino.enviar(quadro):
+                ligados.append(destino)
+            else:
+                print(f"Espectador {destino.nome} desligado (caiu ou ficou para trás)")
+                destino.fechar()
+        return ligados
+
+    def relatorio(self):
+        media = self.bytes_enviados / max(1, self.envios)
+        return (f"Transmissão: {self.quadros} quadros, {self.bytes_enviados} bytes "
+                f"({media:.1f} bytes por envio, {len(self.destinos)} espectadores)")
+
+    def fechar(self):
+        for destino in self.destinos:
+            destino.fechar()
+        self.destinos = []
+        if self.escuta is not None:
+            self.escuta.close()
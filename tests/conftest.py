@@ -0,0 +1,12 @@
+import os
+import sys
+
+# Os jogos rodam sem janela nem som
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Dash or Die fica na raiz e O Jardineiro do Tempo em src/; os dois têm um
+# main.py, e "import main" nos testes é o do jardim
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(RAIZ, "src"), RAIZ]
@@ -0,0 +1,71 @@
+"""Os armazenamentos de inimigos do Dash or Die, passo a passo com as mesmas entradas."""
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from mundos import Mundos
+from world import CIMA, BAIXO, ESQUERDA, DIREITA, DASH, H, W, World
+
+FRAMES = 2000
+
+
+def fugir(mundo, sorteio):
+    """Entrada que foge do inimigo mais perto e dá dash quando ele encosta, para a partida durar."""
+    j = mundo.jogador
+    entrada = 0
+    perto = min(mundo.circulos_inimigos(), key=lambda c: (c[0] - j.x) ** 2 + (c[1] - j.y) ** 2, default=None)
+    if perto is not None:
+        x, y, _ = perto
+        entrada |= ESQUERDA if x > j.x else DIREITA
+        entrada |= CIMA if y > j.y else BAIXO
+        if (x - j.x) ** 2 + (y - j.y) ** 2 < 60 ** 2 and sorteio.random() < 0.5:
+            entrada |= DASH
+    if j.x < 60 or j.x > W - 60:
+        entrada ^= entrada & (ESQUERDA | DIREITA)
+        entrada |= DIREITA if j.x < 60 else ESQUERDA
+    if j.y < 60 or j.y > H - 60:
+        entrada ^= entrada & (CIMA | BAIXO)
+        entrada |= BAIXO if j.y < 60 else CIMA
+    return entrada
+
+
+def inimigos(mundo):
+    return sorted((round(x, 6), round(y, 6), int(r)) for x, y, r in mundo.circulos_inimigos())
+
+
+@pytest.mark.parametrize("semente", range(3))
+def test_enxame_igual_ao_pool(semente):
+    pool, enxame = World(False, semente), World(True, semente)
+    sorteio = random.Random(semente)
+    for _ in range(FRAMES):
+        entrada = fugir(pool, sorteio)
+        vivo = pool.step(entrada)
+        assert enxame.step(entrada) == vivo
+        assert (enxame.score, enxame.frame, enxame.spawn) == (pool.score, pool.frame, pool.spawn)
+        if not vivo: # No frame da morte o pool para no meio do laço e o Enxame já moveu todos
+            break
+        # O pool usa atan2/cos/sin e o Enxame a direção normalizada: as posições só batem no arredondamento
+        assert inimigos(enxame) == inimigos(pool)
+
+
+@pytest.mark.parametrize("separacao", [False, True])
+def test_mundos_igual_a_world(separacao):
+    sementes = list(range(100, 108))
+    mundos = Mundos(len(sementes), sementes, separacao, capacidade=4)
+    mundo = [World(True, semente, separacao) for semente in sementes]
+    sorteio = np.random.default_rng(1)
+    for _ in range(FRAMES):
+        entradas = sorteio.integers(32, size=len(sementes))
+        mundos.step(entradas)
+        for m, w in enumerate(mundo):
+            w.step(int(entradas[m]))
+            j = w.jogador
+            assert (mundos.vivo[m], mundos.score[m], mundos.frame[m], mundos.spawn[m]) == (
+                w.vivo, w.score, w.frame, w.spawn)
+            assert (mundos.jx[m], mundos.jy[m], mundos.dash[m], mundos.inv[m]) == (j.x, j.y, j.dash, j.inv)
+            n = w.inimigos.n
+            assert mundos.quantos[m] == n
+            if not separacao: # Com separação a soma dos empurrões pode diferir no arredondamento
+                assert mundos.assinatura(m) == w.assinatura()
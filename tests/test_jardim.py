@@ -0,0 +1,41 @@
+"""As grades do jardim contra a de objetos (um Tile por célula), tick a tick com as mesmas ações."""
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import main as jardim
+
+TICKS = 600
+ACOES = ("interagir", "interagir", "interagir", "acelerar", "reverter")
+
+
+def estado(jogo):
+    """Tudo o que o jogador vê: tiles, pragas, beleza, pontos e contadores."""
+    tiles = [(t.estado, t.tem_erva_daninha, t.tempo_crescimento, t.contador_erva_daninha)
+             for linha in jogo.grid for t in linha]
+    pragas = sorted((p.grid_x, p.grid_y, p.tempo_vida, p.fase) for p in jogo.pragas)
+    return (tiles, pragas, jogo.medidor_beleza, jogo.pontuacao, jogo.tick, jogo.contador_praga,
+            jogo.pragas_criadas, jogo.game_over, jogo.jardineiro.energia_temporal)
+
+
+def jogar(grade, semente):
+    """Estado do jogo a cada tick, com ações sorteadas em células sorteadas."""
+    jogo = jardim.Jogo(grade, semente=semente, avisar=lambda mensagem: None)
+    jogo.limite_praga = 40 # Pragas desde cedo, para que comam plantas
+    sorteio = random.Random(semente)
+    for _ in range(TICKS):
+        for _ in range(3):
+            celula = jardim.rect_da_celula(sorteio.randrange(jogo.largura), sorteio.randrange(jogo.altura))
+            jogo.jardineiro.rect.center = celula.center
+            jogo.executar(sorteio.choice(ACOES))
+        jogo.atualizar()
+        yield estado(jogo)
+
+
+@pytest.mark.parametrize("semente", range(3))
+@pytest.mark.parametrize("grade", ["vetorizada", "blocos", "agendada"])
+def test_grade_igual_a_objetos(grade, semente):
+    for tick, (esperado, obtido) in enumerate(zip(jogar("objetos", semente), jogar(grade, semente))):
+        assert obtido == esperado, f"{grade} diverge no tick {tick}"
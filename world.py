@@ -0,0 +1,333 @@
+import math
+import random
+import struct
+import zlib
+
+from grade_espacial import GradeEspacial
+
+W, H = 900, 600
+
+# Entrada de um frame: bitmask das teclas relevantes
+CIMA = 1
+BAIXO = 2
+ESQUERDA = 4
+DIREITA = 8
+DASH = 16
+
+RAIO_MAX_INIMIGO = 18
+# Separação entre inimigos: lado das células da grade espacial (a maior
+# distância em que dois inimigos se tocam) e a fração da sobreposição de
+# cada par desfeita por frame
+CELULA = 2 * RAIO_MAX_INIMIGO
+FORCA_SEPARACAO = 0.5
+
+class Jogador:
+    def __init__(self):
+        self.x = W//2
+        self.y = H//2
+        self.xa, self.ya = self.x, self.y
+        self.r = 15
+        self.vel = 4
+        self.dash = 0
+        self.inv = 0
+
+    def mover(self, entrada):
+        self.xa, self.ya = self.x, self.y
+        dx = dy = 0
+        if entrada & CIMA: dy -= 1
+        if entrada & BAIXO: dy += 1
+        if entrada & ESQUERDA: dx -= 1
+        if entrada & DIREITA: dx += 1
+
+        mag = math.hypot(dx, dy)
+        if mag != 0:
+            dx /= mag
+            dy /= mag
+
+        speed = 10 if self.dash > 0 else self.vel
+        self.x += dx * speed
+        self.y += dy * speed
+
+        self.x = max(self.r, min(W - self.r, self.x))
+        self.y = max(self.r, min(H - self.r, self.y))
+
+    def usar_dash(self):
+        if self.dash == 0:
+            self.dash = 12
+            self.inv = 15
+
+    def update(self):
+        if self.dash > 0:
+            self.dash -= 1
+        if self.inv > 0:
+            self.inv -= 1
+
+class Inimigo:
+    __slots__ = ("x", "y", "xa", "ya", "r", "vel")
+
+    def __init__(self, rng=random):
+        self.reiniciar(rng)
+
+    def reiniciar(self, rng=random):
+        """Sorteia borda, raio e velocidade com o gerador do mundo; usado também ao reciclar."""
+        lado = rng.choice(["t","b","l","r"])
+        if lado == "t": self.x, self.y = rng.randint(0,W), -20
+        if lado == "b": self.x, self.y = rng.randint(0,W), H+20
+        if lado == "l": self.x, self.y = -20, rng.randint(0,H)
+        if lado == "r": self.x, self.y = W+20, rng.randint(0,H)
+        self.r = rng.randint(12,RAIO_MAX_INIMIGO)
+        self.vel = rng.uniform(1.5, 3)
+        self.xa, self.ya = self.x, self.y
+
+    def update(self, j):
+        self.xa, self.ya = self.x, self.y
+        ang = math.atan2(j.y - self.y, j.x - self.x)
+        self.x += math.cos(ang) * self.vel
+        self.y += math.sin(ang) * self.vel
+
+class PoolInimigos:
+    """Inimigos num array compacto que recicla os objetos abatidos.
+
+    Os ativos ocupam itens[:n]; remover troca o inimigo com o último ativo
+    (swap-remove, O(1)), e o que sobra em itens[n:] funciona como lista
+    livre, reaproveitada no próximo spawn em vez de alocar outro Inimigo.
+    """
+    __slots__ = ("itens", "n", "alocados", "reciclados", "rng")
+
+    def __init__(self, capacidade=256, rng=random):
+        self.itens = [None] * capacidade
+        self.n = 0
+        self.alocados = 0
+        self.reciclados = 0
+        self.rng = rng
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        itens = self.itens
+        for k in range(self.n):
+            yield itens[k]
+
+    def novo(self):
+        n = self.n
+        if n < self.alocados:
+            i = self.itens[n]
+            i.reiniciar(self.rng)
+            self.reciclados += 1
+        else:
+            if n == len(self.itens):
+                self.itens.extend([None] * len(self.itens))
+            i = self.itens[n] = Inimigo(self.rng)
+            self.alocados += 1
+        self.n = n + 1
+        return i
+
+    def remover(self, k):
+        itens = self.itens
+        ultimo = self.n - 1
+        itens[k], itens[ultimo] = itens[ultimo], itens[k]
+        self.n = ultimo
+
+class World:
+    """Estado completo de uma partida, sem depender do pygame.
+
+    Cada chamada a step() avança exatamente um frame, então o mundo pode
+    ser simulado sem janela e tão rápido quanto a CPU permitir.
+
+    Os inimigos ficam num PoolInimigos, ou num Enxame (NumPy) com
+    vetorizado=True; o resultado de cada frame é o mesmo.
+
+    Todo sorteio sai do gerador próprio do mundo, criado com a semente:
+    a mesma semente e a mesma sequência de entradas reproduzem a partida.
+
+    Com separacao=True (opcional) os inimigos se afastam uns dos outros em
+    vez de se sobrepor. Os pares vêm de uma grade espacial (GradeEspacial no
+    pool, células ordenadas no Enxame), então o custo segue linear no número
+    de inimigos. Nesse modo os dois armazenamentos seguem a mesma regra, mas
+    somam os empurrões em outra ordem: a diferença de arredondamento cresce
+    com os frames e as partidas acabam se separando (placar, inimigos). Só
+    sem separação, o padrão, pool e Enxame dão o mesmo resultado.
+    """
+    def __init__(self, vetorizado=False, semente=None, separacao=False):
+        if semente is None:
+            semente = random.getrandbits(64)
+        self.semente = semente
+        self.rng = random.Random(semente)
+        self.jogador = Jogador()
+        self.vetorizado = vetorizado
+        self.separacao = separacao
+        self.grade = None # Grade espacial do pool, mantida só com separação
+        if vetorizado:
+            from enxame import Enxame
+            self.inimigos = Enxame(rng=self.rng)
+        else:
+            self.inimigos = PoolInimigos(rng=self.rng)
+            if separacao:
+                self.grade = GradeEspacial(CELULA)
+        self.spawn = 0
+        self.score = 0
+        self.frame = 0
+        self.vivo = True
+
+    def step(self, entrada):
+        """Avança um frame com a bitmask de entrada; retorna se o jogador segue vivo."""
+        if not self.vivo:
+            return False
+
+        j = self.jogador
+        if entrada & DASH:
+            j.usar_dash()
+        j.mover(entrada)
+        j.update()
+
+        self.spawn += 1
+        if self.spawn > max(20, 90 - self.score//10):
+            self.inimigos.novo()
+            self.spawn = 0
+
+        if self.vetorizado or self.separacao:
+            if self.vetorizado:
+                abatidos, morreu = self.inimigos.update(j, self.separacao)
+            else:
+                abatidos, morreu = self._atualizar_pool(j)
+            if morreu:
+                self.vivo = False
+                return False
+            self.score += abatidos
+        else:
+            # De trás para frente: o swap-remove só traz para k um inimigo
+            # que já foi atualizado neste frame.
+            pool = self.inimigos
+            itens = pool.itens
+            for k in range(pool.n - 1, -1, -1):
+                i = itens[k]
+                i.update(j)
+                dx = i.x - j.x
+                dy = i.y - j.y
+                soma = i.r + j.r
+                if dx * dx + dy * dy < soma * soma:
+                    if j.inv == 0:
+                        self.vivo = False
+                        return False
+                    else:
+                        pool.remover(k)
+                        self.score += 1
+
+        self.frame += 1
+        return True
+
+    def _atualizar_pool(self, j):
+        """
+        Frame do pool com separação: move todos os inimigos, afasta os que se
+        sobrepõem e só então resolve o toque no jogador, pela grade.
+        Retorna (abatidos, morreu), como Enxame.update.
+        """
+        pool = self.inimigos
+        itens = pool.itens
+        grade = self.grade
+        for k in range(pool.n):
+            i = itens[k]
+            i.update(j)
+            grade.mover(i, i.x, i.y)
+        self._separar()
+
+        tocam = self._tocam(j.x, j.y, j.r)
+        if not tocam:
+            return 0, False
+        if j.inv == 0:
+            return 0, True
+        tocam = set(tocam)
+        for k in range(pool.n - 1, -1, -1):
+            if itens[k] in tocam:
+                grade.remover(itens[k])
+                pool.remover(k)
+        return len(tocam), False
+
+    def _separar(self):
+        """
+        Afasta cada par de inimigos que se sobrepõem ao longo da linha entre
+        os centros, cada um em FORCA_SEPARACAO / 2 da sobreposição. Os
+        empurrões são calculados com as posições de antes e aplicados juntos,
+        então a ordem dos pares não muda o resultado (além do arredondamento).
+        """
+        empurroes = {}
+        fator = FORCA_SEPARACAO / 2
+        for a, b in self.grade.pares():
+            dx = b.x - a.x
+            dy = b.y - a.y
+            soma = a.r + b.r
+            d2 = dx * dx + dy * dy
+            if d2 >= soma * soma:
+                continue
+            if d2 == 0:
+                d, dx = 0.0, 1.0 # Centros iguais: separa no eixo x
+            else:
+                d = math.sqrt(d2) # Raiz só para os pares que se tocam
+                dx /= d
+                dy /= d
+            s = (soma - d) * fator
+            px = s * dx
+            py = s * dy
+            ea = empurroes.get(a)
+            if ea is None:
+                empurroes[a] = [-px, -py]
+            else:
+                ea[0] -= px
+                ea[1] -= py
+            eb = empurroes.get(b)
+            if eb is None:
+                empurroes[b] = [px, py]
+            else:
+                eb[0] += px
+                eb[1] += py
+
+        grade = self.grade
+        for i, (px, py) in empurroes.items():
+            i.x += px
+            i.y += py
+            grade.mover(i, i.x, i.y)
+
+    def _tocam(self, x, y, raio):
+        """Inimigos do pool cujo círculo encosta no círculo (x, y, raio)."""
+        if self.grade is not None:
+            candidatos = self.grade.perto(x, y, raio + RAIO_MAX_INIMIGO)
+        else:
+            candidatos = self.inimigos
+        resultado = []
+        for i in candidatos:
+            dx = i.x - x
+            dy = i.y - y
+            soma = i.r + raio
+            if dx * dx + dy * dy < soma * soma:
+                resultado.append(i)
+        return resultado
+
+    def inimigos_perto(self, x, y, raio):
+        """(x, y, r) dos inimigos que encostam no círculo (x, y, raio), para projéteis, itens e afins."""
+        if self.vetorizado:
+            return self.inimigos.perto(x, y, raio)
+        return [(i.x, i.y, i.r) for i in self._tocam(x, y, raio)]
+
+    def circulos_inimigos(self, alpha=1.0):
+        """(x, y, r) de cada inimigo, independente do armazenamento.
+
+        alpha interpola entre a posição do frame anterior (0) e a atual (1).
+        """
+        if self.vetorizado:
+            return self.inimigos.circulos(alpha)
+        return ((i.xa + (i.x - i.xa) * alpha, i.ya + (i.y - i.ya) * alpha, i.r)
+                for i in self.inimigos)
+
+    def assinatura(self):
+        """CRC32 do estado do frame (jogador, inimigos, placar e relógios), para conferir replays."""
+        j = self.jogador
+        dados = [j.x, j.y, j.dash, j.inv, self.spawn, self.score, self.frame, self.vivo]
+        for circulo in self.circulos_inimigos():
+            dados.extend(circulo)
+        return zlib.crc32(struct.pack(f"<{len(dados)}d", *dados))
+
+    @property
+    def reciclados(self):
+        """Total de alocações de inimigo evitadas por reciclagem."""
+        return self.inimigos.reciclados